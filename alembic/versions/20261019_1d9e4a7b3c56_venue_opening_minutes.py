@@ -0,0 +1,33 @@
+"""venue opening minutes
+
+Revision ID: 1d9e4a7b3c56
+Revises: e5b2c8f4a917
+Create Date: 2026-10-19 20:41:08.377512+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d9e4a7b3c56'
+down_revision: Union[str, Sequence[str], None] = 'e5b2c8f4a917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled from opening_hours by the Python parser: run `make db-backfill-hours` after
+    # upgrading.
+    op.add_column('venues', sa.Column('opening_minutes', postgresql.INT4MULTIRANGE(), nullable=True))
+    op.create_index('ix_venues_opening_minutes', 'venues', ['opening_minutes'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_venues_opening_minutes', table_name='venues', postgresql_using='gist')
+    op.drop_column('venues', 'opening_minutes')
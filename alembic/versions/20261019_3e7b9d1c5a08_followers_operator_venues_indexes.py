@@ -0,0 +1,81 @@
+"""followers and operator_venues indexes
+
+Revision ID: 3e7b9d1c5a08
+Revises: 9a4f3c7e1b62
+Create Date: 2026-10-19 11:20:47.102356+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e7b9d1c5a08'
+down_revision: Union[str, Sequence[str], None] = '9a4f3c7e1b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nothing prevented duplicate pairs before; keep the oldest relationship of each.
+    op.execute(
+        """
+        DELETE FROM followers AS f
+        USING followers AS keep
+        WHERE f.follower_id = keep.follower_id
+            AND f.followed_id = keep.followed_id
+            AND (f.created_at, f.id) > (keep.created_at, keep.id)
+        """
+    )
+    op.drop_constraint(op.f('pk_followers'), 'followers', type_='primary')
+    op.create_primary_key(op.f('pk_followers'), 'followers', ['id'])
+    op.create_unique_constraint(
+        'uq_followers_follower_id_followed_id', 'followers', ['follower_id', 'followed_id']
+    )
+    op.create_index(
+        'ix_followers_follower_id_created_at',
+        'followers',
+        ['follower_id', sa.literal_column('created_at DESC')],
+        unique=False,
+        postgresql_include=['status'],
+    )
+    op.create_index(
+        'ix_followers_followed_id_created_at',
+        'followers',
+        ['followed_id', sa.literal_column('created_at DESC')],
+        unique=False,
+        postgresql_include=['status'],
+    )
+    op.create_index(
+        'ix_followers_pending_followed_id',
+        'followers',
+        ['followed_id', sa.literal_column('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        'ix_followers_status_created_at',
+        'followers',
+        ['status', sa.literal_column('created_at DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_operator_venues_venue_id',
+        'operator_venues',
+        ['venue_id', 'operator_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_operator_venues_venue_id', table_name='operator_venues')
+    op.drop_index('ix_followers_status_created_at', table_name='followers')
+    op.drop_index('ix_followers_pending_followed_id', table_name='followers')
+    op.drop_index('ix_followers_followed_id_created_at', table_name='followers')
+    op.drop_index('ix_followers_follower_id_created_at', table_name='followers')
+    op.drop_constraint('uq_followers_follower_id_followed_id', 'followers', type_='unique')
+    op.drop_constraint(op.f('pk_followers'), 'followers', type_='primary')
+    op.create_primary_key(op.f('pk_followers'), 'followers', ['id', 'follower_id', 'followed_id'])
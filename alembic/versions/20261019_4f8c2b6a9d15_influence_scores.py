@@ -0,0 +1,37 @@
+"""influence scores
+
+Revision ID: 4f8c2b6a9d15
+Revises: d2a7e5f91c36
+Create Date: 2026-10-19 15:31:07.226810+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8c2b6a9d15'
+down_revision: Union[str, Sequence[str], None] = 'd2a7e5f91c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Populate with scripts/compute_influence.py once the migration has run.
+    op.create_table('influence',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_influence_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', name=op.f('pk_influence'))
+    )
+    op.create_index('ix_influence_rank', 'influence', ['rank'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_influence_rank', table_name='influence')
+    op.drop_table('influence')
@@ -0,0 +1,28 @@
+"""venues name unique
+
+Revision ID: 5c1e8a2d7f40
+Revises: cbd6eaf0695b
+Create Date: 2026-10-19 09:12:41.318204+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a2d7f40'
+down_revision: Union[str, Sequence[str], None] = 'cbd6eaf0695b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The model has always declared ``Venues.name`` unique but the initial schema never
+    # created the constraint; bulk upserts use it as their ``ON CONFLICT`` arbiter.
+    op.create_unique_constraint(op.f('uq_venues_name'), 'venues', ['name'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(op.f('uq_venues_name'), 'venues', type_='unique')
@@ -0,0 +1,42 @@
+"""visits
+
+Revision ID: 6e1a9c4d2b87
+Revises: 8b3f6d2a4e71
+Create Date: 2026-10-19 22:47:15.902318+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1a9c4d2b87'
+down_revision: Union[str, Sequence[str], None] = '8b3f6d2a4e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('visits',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('venue_id', sa.UUID(), nullable=False),
+    sa.Column('entered_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('exited_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_visits_user_id_users'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], name=op.f('fk_visits_venue_id_venues'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_visits'))
+    )
+    op.create_index('ix_visits_user_id_venue_id_exited_at', 'visits', ['user_id', 'venue_id', sa.text('exited_at DESC')], unique=False)
+    op.create_index('ix_visits_venue_id_entered_at', 'visits', ['venue_id', sa.text('entered_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_visits_venue_id_entered_at', table_name='visits')
+    op.drop_index('ix_visits_user_id_venue_id_exited_at', table_name='visits')
+    op.drop_table('visits')
@@ -0,0 +1,47 @@
+"""venue search
+
+Revision ID: 7c3e91a5f2d8
+Revises: 4f8c2b6a9d15
+Create Date: 2026-10-19 17:24:51.603318+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e91a5f2d8'
+down_revision: Union[str, Sequence[str], None] = '4f8c2b6a9d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(tags, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(city, '') || ' ' || coalesce(address, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Adding stored generated columns rewrites the table once.
+    op.add_column('venues', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_DOCUMENT, persisted=True), nullable=False))
+    op.add_column('venues', sa.Column('location', geoalchemy2.Geography(geometry_type='POINT', srid=4326, spatial_index=False), sa.Computed('ST_GeogFromText(coordinates)', persisted=True), nullable=True))
+    op.create_index('ix_venues_search_vector', 'venues', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_venues_name_trgm', 'venues', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_venues_location', 'venues', ['location'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_venues_location', table_name='venues', postgresql_using='gist')
+    op.drop_index('ix_venues_name_trgm', table_name='venues', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.drop_index('ix_venues_search_vector', table_name='venues', postgresql_using='gin')
+    op.drop_column('venues', 'location')
+    op.drop_column('venues', 'search_vector')
@@ -0,0 +1,44 @@
+"""points ledger
+
+Revision ID: 8b3f6d2a4e71
+Revises: 1d9e4a7b3c56
+Create Date: 2026-10-19 21:48:52.640193+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3f6d2a4e71'
+down_revision: Union[str, Sequence[str], None] = '1d9e4a7b3c56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('points',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_points_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_points'))
+    )
+    op.create_index('ix_points_user_id', 'points', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fold anything still pending so no awarded points are lost.
+    op.execute(
+        "UPDATE users AS u SET points = u.points + p.delta "
+        "FROM (SELECT user_id, sum(delta)::integer AS delta FROM points GROUP BY user_id) AS p "
+        "WHERE u.id = p.user_id"
+    )
+    op.drop_index('ix_points_user_id', table_name='points')
+    op.drop_table('points')
@@ -0,0 +1,105 @@
+"""users follow counters
+
+Revision ID: 9a4f3c7e1b62
+Revises: 5c1e8a2d7f40
+Create Date: 2026-10-19 10:02:13.540981+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f3c7e1b62'
+down_revision: Union[str, Sequence[str], None] = '5c1e8a2d7f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in ('followers_count', 'following_count', 'pending_requests_count'):
+        op.add_column(
+            'users',
+            sa.Column(column, sa.Integer(), server_default=sa.text('0'), nullable=False),
+        )
+
+    # Keep the counters in step with relationship changes, including rows removed by
+    # ON DELETE CASCADE. Both affected users are touched in a single UPDATE so
+    # concurrent mutual follows lock rows together.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION followers_maintain_counts() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.status = NEW.status THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' AND OLD.status <> 'REJECTED' THEN
+                UPDATE users SET
+                    followers_count = followers_count
+                        - (id = OLD.followed_id AND OLD.status = 'ACCEPTED')::int,
+                    following_count = following_count
+                        - (id = OLD.follower_id AND OLD.status = 'ACCEPTED')::int,
+                    pending_requests_count = pending_requests_count
+                        - (id = OLD.followed_id AND OLD.status = 'PENDING')::int
+                WHERE id = OLD.followed_id
+                    OR (id = OLD.follower_id AND OLD.status = 'ACCEPTED');
+            END IF;
+            IF TG_OP <> 'DELETE' AND NEW.status <> 'REJECTED' THEN
+                UPDATE users SET
+                    followers_count = followers_count
+                        + (id = NEW.followed_id AND NEW.status = 'ACCEPTED')::int,
+                    following_count = following_count
+                        + (id = NEW.follower_id AND NEW.status = 'ACCEPTED')::int,
+                    pending_requests_count = pending_requests_count
+                        + (id = NEW.followed_id AND NEW.status = 'PENDING')::int
+                WHERE id = NEW.followed_id
+                    OR (id = NEW.follower_id AND NEW.status = 'ACCEPTED');
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER followers_maintain_counts "
+        "AFTER INSERT OR DELETE OR UPDATE OF status ON followers "
+        "FOR EACH ROW EXECUTE FUNCTION followers_maintain_counts()"
+    )
+
+    # Backfill existing relationships; later drift is repaired by
+    # scripts/reconcile_follow_counts.py.
+    op.execute(
+        """
+        UPDATE users AS u SET
+            followers_count = c.followers_count,
+            following_count = c.following_count,
+            pending_requests_count = c.pending_requests_count
+        FROM (
+            SELECT
+                user_id,
+                count(*) FILTER (WHERE role = 'followed' AND status = 'ACCEPTED')
+                    AS followers_count,
+                count(*) FILTER (WHERE role = 'follower' AND status = 'ACCEPTED')
+                    AS following_count,
+                count(*) FILTER (WHERE role = 'followed' AND status = 'PENDING')
+                    AS pending_requests_count
+            FROM (
+                SELECT followed_id AS user_id, 'followed' AS role, status FROM followers
+                UNION ALL
+                SELECT follower_id AS user_id, 'follower' AS role, status FROM followers
+            ) AS edges
+            GROUP BY user_id
+        ) AS c
+        WHERE u.id = c.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS followers_maintain_counts ON followers")
+    op.execute("DROP FUNCTION IF EXISTS followers_maintain_counts()")
+    for column in ('pending_requests_count', 'following_count', 'followers_count'):
+        op.drop_column('users', column)
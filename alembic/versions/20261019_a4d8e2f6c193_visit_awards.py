@@ -0,0 +1,37 @@
+"""visit awards
+
+Revision ID: a4d8e2f6c193
+Revises: 6e1a9c4d2b87
+Create Date: 2026-10-19 23:21:40.517734+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e2f6c193'
+down_revision: Union[str, Sequence[str], None] = '6e1a9c4d2b87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('visitawards',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('venue_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('points', sa.Integer(), nullable=False),
+    sa.Column('awarded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_visitawards_user_id_users'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], name=op.f('fk_visitawards_venue_id_venues'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'venue_id', 'day', name=op.f('pk_visitawards'))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('visitawards')
@@ -0,0 +1,45 @@
+"""users avatar and follow page indexes
+
+Revision ID: b81d6f2e4c93
+Revises: 3e7b9d1c5a08
+Create Date: 2026-10-19 12:41:05.877410+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81d6f2e4c93'
+down_revision: Union[str, Sequence[str], None] = '3e7b9d1c5a08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('avatar_url', sa.String(), nullable=True))
+    op.create_index(
+        'ix_followers_accepted_followed_id',
+        'followers',
+        ['followed_id', sa.literal_column('created_at DESC'), sa.literal_column('id DESC')],
+        unique=False,
+        postgresql_include=['follower_id'],
+        postgresql_where=sa.text("status = 'ACCEPTED'"),
+    )
+    op.create_index(
+        'ix_followers_accepted_follower_id',
+        'followers',
+        ['follower_id', sa.literal_column('created_at DESC'), sa.literal_column('id DESC')],
+        unique=False,
+        postgresql_include=['followed_id'],
+        postgresql_where=sa.text("status = 'ACCEPTED'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_followers_accepted_follower_id', table_name='followers')
+    op.drop_index('ix_followers_accepted_followed_id', table_name='followers')
+    op.drop_column('users', 'avatar_url')
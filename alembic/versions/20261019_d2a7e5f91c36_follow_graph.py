@@ -0,0 +1,35 @@
+"""follow graph
+
+Revision ID: d2a7e5f91c36
+Revises: b81d6f2e4c93
+Create Date: 2026-10-19 13:58:22.409117+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7e5f91c36'
+down_revision: Union[str, Sequence[str], None] = 'b81d6f2e4c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Populate with scripts/sync_follow_graph.py once the migration has run.
+    op.execute("LOAD 'age'")
+    op.execute("SELECT ag_catalog.create_graph('social')")
+    op.execute("SELECT ag_catalog.create_vlabel('social', 'User')")
+    op.execute("SELECT ag_catalog.create_elabel('social', 'FOLLOWS')")
+    # ``MATCH (:User {id: ...})`` compiles to a properties containment test.
+    op.execute('CREATE INDEX ix_social_user_properties ON social."User" USING gin (properties)')
+    op.execute('CREATE INDEX ix_social_follows_start_id ON social."FOLLOWS" (start_id)')
+    op.execute('CREATE INDEX ix_social_follows_end_id ON social."FOLLOWS" (end_id)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOAD 'age'")
+    op.execute("SELECT ag_catalog.drop_graph('social', true)")
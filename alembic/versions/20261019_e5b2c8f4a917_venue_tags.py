@@ -0,0 +1,155 @@
+"""venue tags
+
+Revision ID: e5b2c8f4a917
+Revises: 7c3e91a5f2d8
+Create Date: 2026-10-19 19:52:37.118204+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2c8f4a917'
+down_revision: Union[str, Sequence[str], None] = '7c3e91a5f2d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def search_document(tags: str) -> str:
+    return (
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        f"setweight(to_tsvector('english', {tags}), 'B') || "
+        "setweight(to_tsvector('english', coalesce(city, '') || ' ' || coalesce(address, '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+    )
+
+
+# Same rules as app.schemas.venues.normalize_tags: split on , or ;, slugify, drop blanks
+# and repeats, keep first-seen order.
+NORMALIZED_TAGS = r"""
+    ARRAY(
+        SELECT t.tag
+        FROM (
+            SELECT
+                trim(BOTH '-' FROM regexp_replace(
+                    regexp_replace(lower(trim(p.part)), '\s+', '-', 'g'),
+                    '[^[:alnum:]_-]+', '', 'g'
+                )) AS tag,
+                p.position
+            FROM regexp_split_to_table(v.tags_legacy, '[,;]') WITH ORDINALITY AS p(part, position)
+        ) AS t
+        WHERE t.tag <> ''
+        GROUP BY t.tag
+        ORDER BY min(t.position)
+    )
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE OR REPLACE FUNCTION venue_tags_text(text[]) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$ SELECT array_to_string($1, ' ') $$"
+    )
+    op.create_table('tags',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('venue_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('name', name=op.f('pk_tags'))
+    )
+    op.create_index('ix_tags_venue_count', 'tags', [sa.text('venue_count DESC')], unique=False)
+
+    op.alter_column('venues', 'tags', new_column_name='tags_legacy')
+    op.add_column('venues', sa.Column('tags', postgresql.ARRAY(sa.Text()), server_default=sa.text("'{}'"), nullable=False))
+
+    # Convert the free-text strings in primary-key batches so no single statement has to
+    # rewrite the whole table.
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        ids = bind.execute(
+            sa.text(
+                "SELECT id FROM venues WHERE tags_legacy IS NOT NULL "
+                "AND (CAST(:last_id AS uuid) IS NULL OR id > :last_id) ORDER BY id LIMIT :size"
+            ),
+            {'last_id': last_id, 'size': BACKFILL_BATCH_SIZE},
+        ).scalars().all()
+        if not ids:
+            break
+        bind.execute(
+            sa.text(f"UPDATE venues AS v SET tags = {NORMALIZED_TAGS} WHERE v.id = ANY(:ids)"),
+            {'ids': ids},
+        )
+        last_id = ids[-1]
+
+    op.execute(
+        "INSERT INTO tags (name, venue_count) "
+        "SELECT tag, count(*) FROM venues, unnest(tags) AS tag GROUP BY tag"
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION venues_maintain_tag_counts() RETURNS trigger AS $$
+        DECLARE
+            added text[] := '{}';
+            removed text[] := '{}';
+        BEGIN
+            IF TG_OP <> 'DELETE' THEN
+                added := NEW.tags;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                removed := OLD.tags;
+            END IF;
+            INSERT INTO tags (name, venue_count)
+            SELECT name, sum(delta)
+            FROM (
+                SELECT DISTINCT unnest(added) AS name, 1 AS delta
+                UNION ALL
+                SELECT DISTINCT unnest(removed), -1
+            ) AS changes
+            GROUP BY name
+            HAVING sum(delta) <> 0
+            ORDER BY name
+            ON CONFLICT (name) DO UPDATE SET venue_count = tags.venue_count + EXCLUDED.venue_count;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER venues_maintain_tag_counts "
+        "AFTER INSERT OR DELETE OR UPDATE OF tags ON venues "
+        "FOR EACH ROW EXECUTE FUNCTION venues_maintain_tag_counts()"
+    )
+
+    # The generated search document read the old column; rebuild it over the array.
+    op.drop_index('ix_venues_search_vector', table_name='venues', postgresql_using='gin')
+    op.drop_column('venues', 'search_vector')
+    op.drop_column('venues', 'tags_legacy')
+    op.add_column('venues', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(search_document('venue_tags_text(tags)'), persisted=True), nullable=False))
+    op.create_index('ix_venues_search_vector', 'venues', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_venues_tags', 'venues', ['tags'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_venues_tags', table_name='venues', postgresql_using='gin')
+    op.drop_index('ix_venues_search_vector', table_name='venues', postgresql_using='gin')
+    op.drop_column('venues', 'search_vector')
+    op.execute("DROP TRIGGER IF EXISTS venues_maintain_tag_counts ON venues")
+    op.execute("DROP FUNCTION IF EXISTS venues_maintain_tag_counts()")
+
+    op.add_column('venues', sa.Column('tags_legacy', sa.String(), nullable=True))
+    op.execute("UPDATE venues SET tags_legacy = NULLIF(array_to_string(tags, ', '), '')")
+    op.drop_column('venues', 'tags')
+    op.alter_column('venues', 'tags_legacy', new_column_name='tags')
+    op.add_column('venues', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(search_document("coalesce(tags, '')"), persisted=True), nullable=False))
+    op.create_index('ix_venues_search_vector', 'venues', ['search_vector'], unique=False, postgresql_using='gin')
+
+    op.drop_index('ix_tags_venue_count', table_name='tags')
+    op.drop_table('tags')
+    op.execute("DROP FUNCTION IF EXISTS venue_tags_text(text[])")
@@ -0,0 +1,40 @@
+"""user locations
+
+Revision ID: f3b7c1e9d452
+Revises: a4d8e2f6c193
+Create Date: 2026-10-19 23:54:06.281947+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7c1e9d452'
+down_revision: Union[str, Sequence[str], None] = 'a4d8e2f6c193'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('userlocations',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('coordinates', sa.String(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_userlocations_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', name=op.f('pk_userlocations'))
+    )
+    # Seed from existing footsteps so "where is X" works before the next ping.
+    op.execute(
+        "INSERT INTO userlocations (user_id, coordinates, recorded_at) "
+        "SELECT DISTINCT ON (user_id) user_id, coordinates, created_at "
+        "FROM footsteps ORDER BY user_id, created_at DESC"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('userlocations')
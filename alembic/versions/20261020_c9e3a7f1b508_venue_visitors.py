@@ -0,0 +1,34 @@
+"""venue visitors
+
+Revision ID: c9e3a7f1b508
+Revises: f3b7c1e9d452
+Create Date: 2026-10-20 00:38:12.774051+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e3a7f1b508'
+down_revision: Union[str, Sequence[str], None] = 'f3b7c1e9d452'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('venuevisitors',
+    sa.Column('venue_id', sa.UUID(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('unique_visitors', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['venue_id'], ['venues.id'], name=op.f('fk_venuevisitors_venue_id_venues'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('venue_id', 'day', name=op.f('pk_venuevisitors'))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('venuevisitors')
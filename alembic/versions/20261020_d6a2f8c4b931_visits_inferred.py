@@ -0,0 +1,28 @@
+"""visits inferred
+
+Revision ID: d6a2f8c4b931
+Revises: c9e3a7f1b508
+Create Date: 2026-10-20 04:12:40.318205+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a2f8c4b931'
+down_revision: Union[str, Sequence[str], None] = 'c9e3a7f1b508'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('visits', sa.Column('inferred', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('visits', 'inferred')
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 from collections.abc import Generator
+from typing import cast
 
+from fastapi import HTTPException, Request, WebSocket, WebSocketException, status
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
 from app.db.session import get_db_session
+from app.services.amenity_facets import VenueFacets
+from app.services.autocomplete import VenueAutocomplete
+from app.services.footsteps_buffer import FootstepsBuffer
+from app.services.footsteps_stream import FootstepsBatcher
+from app.services.geofence import VenueFences
+from app.services.leaderboard import Leaderboard
+from app.services.live_updates import LiveUpdates
+from app.services.occupancy import VenueOccupancy
+from app.services.presence import Presence
+from app.services.relationship_cache import RelationshipCache
 from app.services.task_queue import TaskQueue
 
 settings = get_settings()
@@ -25,3 +37,119 @@ def get_task_queue() -> Generator[TaskQueue, None, None]:
         yield queue
     finally:
         queue.close()
+
+
+def get_relationship_cache() -> Generator[RelationshipCache, None, None]:
+    """Provide the Redis follow-edge mirror tied to the request lifecycle."""
+
+    cache = RelationshipCache(str(settings.redis_url), ttl=settings.relationship_cache_ttl)
+    try:
+        yield cache
+    finally:
+        cache.close()
+
+
+def get_leaderboard() -> Generator[Leaderboard, None, None]:
+    """Provide the Redis points leaderboard tied to the request lifecycle."""
+
+    leaderboard = Leaderboard(str(settings.redis_url))
+    try:
+        yield leaderboard
+    finally:
+        leaderboard.close()
+
+
+def get_presence() -> Generator[Presence, None, None]:
+    """Provide the Redis GEO presence set tied to the request lifecycle."""
+
+    presence = Presence(str(settings.redis_url), ttl=settings.presence_ttl)
+    try:
+        yield presence
+    finally:
+        presence.close()
+
+
+def get_footsteps_buffer() -> Generator[FootstepsBuffer, None, None]:
+    """Provide the Redis footsteps write-behind buffer tied to the request lifecycle."""
+
+    buffer = FootstepsBuffer(str(settings.redis_url))
+    try:
+        yield buffer
+    finally:
+        buffer.close()
+
+
+def get_venue_occupancy() -> Generator[VenueOccupancy, None, None]:
+    """Provide the Redis venue occupancy counters tied to the request lifecycle."""
+
+    occupancy = VenueOccupancy(
+        str(settings.redis_url),
+        window=settings.visit_gap_seconds,
+        timezone=settings.venues_timezone,
+    )
+    try:
+        yield occupancy
+    finally:
+        occupancy.close()
+
+
+def get_venue_autocomplete(request: Request) -> VenueAutocomplete:
+    """Return the per-process venue autocomplete index loaded at startup."""
+
+    autocomplete = cast(
+        VenueAutocomplete | None, getattr(request.app.state, "venue_autocomplete", None)
+    )
+    if autocomplete is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="autocomplete_unavailable",
+        )
+    return autocomplete
+
+
+def get_venue_facets(request: Request) -> VenueFacets:
+    """Return the per-process amenity facet bitmap loaded at startup."""
+
+    facets = cast(VenueFacets | None, getattr(request.app.state, "venue_facets", None))
+    if facets is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="facets_unavailable",
+        )
+    return facets
+
+
+def get_live_updates(request: Request) -> LiveUpdates:
+    """Return the per-process live updates hub started with the application."""
+
+    live_updates = cast(LiveUpdates | None, getattr(request.app.state, "live_updates", None))
+    if live_updates is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="live_updates_unavailable",
+        )
+    return live_updates
+
+
+def get_footsteps_batcher(websocket: WebSocket) -> FootstepsBatcher:
+    """Return the per-process footsteps stream batcher started with the application."""
+
+    batcher = cast(FootstepsBatcher | None, getattr(websocket.app.state, "footsteps_batcher", None))
+    if batcher is None:
+        raise WebSocketException(
+            code=status.WS_1013_TRY_AGAIN_LATER,
+            reason="footsteps_stream_unavailable",
+        )
+    return batcher
+
+
+def get_venue_fences(request: Request) -> VenueFences:
+    """Return the per-process venue geofence index loaded at startup."""
+
+    fences = cast(VenueFences | None, getattr(request.app.state, "venue_fences", None))
+    if fences is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="fences_unavailable",
+        )
+    return fences
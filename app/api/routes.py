@@ -1,32 +1,117 @@
 from __future__ import annotations
 
+import base64
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
-
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import or_, select, text
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_db, get_task_queue
-from app.models import Followers, Users
+from zoneinfo import ZoneInfo
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import Integer, cast, literal, or_, select, text, tuple_
+from sqlalchemy.dialects.postgresql import Range
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import (
+    get_db,
+    get_footsteps_batcher,
+    get_footsteps_buffer,
+    get_leaderboard,
+    get_live_updates,
+    get_presence,
+    get_relationship_cache,
+    get_task_queue,
+    get_venue_autocomplete,
+    get_venue_facets,
+    get_venue_fences,
+    get_venue_occupancy,
+)
+from app.core.config import get_settings
+from app.models import Followers, Influence, Tags, UserLocations, Users, VenueVisitors
 from app.models.followers import StatusEnum
 from app.models.operators import OperatorRole as OperatorRoleModel
 from app.models.operators import Operators as OperatorsModel
 from app.models.venues import Venues as VenuesModel
 from app.schemas import (
+    BulkUpsertResult,
+    FollowersBatchDecision,
+    FollowersBatchLookup,
+    FollowersBatchResult,
+    FollowersBatchUnfollow,
     FollowersCreate,
     FollowersRead,
+    FollowersRelationship,
     FollowersUpdate,
+    FootstepsBatch,
+    FootstepsBufferStats,
+    FootstepsIngestResult,
+    FootstepsStreamPing,
     OperatorsCreate,
     OperatorsRead,
     OperatorsUpdate,
+    UsersCard,
+    UsersCardPage,
+    UsersCounts,
     UsersCreate,
+    UsersInfluence,
+    UsersLeaderboardEntry,
+    UsersLocation,
+    UsersNearby,
+    UsersPath,
+    UsersPoints,
+    UsersPointsIncrement,
     UsersRead,
+    UsersSuggestion,
     UsersUpdate,
 )
 from app.schemas import Venues as VenuesRead
-from app.schemas import VenuesCreate, VenuesUpdate
-from app.services import TaskQueue
+from app.schemas import (
+    VenuesAmenityFilter,
+    VenuesCreate,
+    VenuesDailyVisitors,
+    VenuesFacets,
+    VenuesOccupancy,
+    VenuesSearchHit,
+    VenuesSuggestion,
+    VenuesTagCount,
+    VenuesUpdate,
+)
+from app.schemas.venues import normalize_tags
+from app.services import (
+    TaskQueue,
+    amenity_facets,
+    autocomplete,
+    bulk_load,
+    follow_bulk,
+    follow_graph,
+    footsteps_ingest,
+    footsteps_stream,
+    geofence,
+    live_updates,
+    opening_hours,
+    points_ledger,
+    venue_search,
+)
+from app.services.footsteps_buffer import FootstepsBuffer
+from app.services.leaderboard import Leaderboard
+from app.services.occupancy import VenueOccupancy
+from app.services.presence import Presence
+from app.services.relationship_cache import RelationshipCache
 
 router = APIRouter(prefix="/api/v1")
 
@@ -77,6 +162,7 @@ def create_user(
         oauth_provider=payload.oauth_provider,
         oauth_provider_id=payload.oauth_provider_id,
         points=payload.points,
+        avatar_url=payload.avatar_url,
     )
     db.add(user)
     db.commit()
@@ -86,6 +172,23 @@ def create_user(
     return UsersRead.model_validate(user)
 
 
+@router.post(
+    "/users:bulk",
+    response_model=BulkUpsertResult,
+    tags=["users"],
+)
+async def bulk_upsert_users(
+    request: Request,
+    db: Session = Depends(get_db),
+    queue: TaskQueue = Depends(get_task_queue),
+) -> BulkUpsertResult:
+    """Create or update users from an NDJSON body, one user per line, keyed on email."""
+
+    return await _run_bulk_upsert(
+        request, db, queue, bulk_load.upsert_users_chunk, "user.bulk_upserted"
+    )
+
+
 @router.get(
     "/users",
     response_model=list[UsersRead],
@@ -96,7 +199,42 @@ def list_users(db: Session = Depends(get_db)) -> list[UsersRead]:
 
     result = db.execute(select(Users).order_by(Users.created_at.desc()))
     users = result.scalars().all()
-    return [UsersRead.model_validate(user) for user in users]
+    balances = points_ledger.balances(db, [user.id for user in users])
+    return [_user_read(db, user, balances) for user in users]
+
+
+@router.get(
+    "/users/influential",
+    response_model=list[UsersInfluence],
+    tags=["users"],
+)
+def list_influential_users(
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> list[UsersInfluence]:
+    """List users by PageRank influence as of the last ``make db-influence`` run."""
+
+    rows = db.execute(
+        select(Users.id, Users.full_name, Users.avatar_url, Influence.score, Influence.rank)
+        .join(Influence, Influence.user_id == Users.id)
+        .order_by(Influence.rank)
+        .limit(limit)
+    )
+    return [UsersInfluence.model_validate(row) for row in rows]
+
+
+@router.get(
+    "/users/leaderboard",
+    response_model=list[UsersLeaderboardEntry],
+    tags=["users"],
+)
+def users_leaderboard(
+    limit: int = Query(default=20, ge=1, le=100),
+    leaderboard: Leaderboard = Depends(get_leaderboard),
+) -> list[UsersLeaderboardEntry]:
+    """List the users with the most points, from the Redis leaderboard."""
+
+    return [UsersLeaderboardEntry.model_validate(entry) for entry in leaderboard.top(limit)]
 
 
 @router.get(
@@ -108,7 +246,350 @@ def get_user(user_id: UUID, db: Session = Depends(get_db)) -> UsersRead:
     """Retrieve a single user by identifier."""
 
     user = _get_user_or_404(db, user_id)
-    return UsersRead.model_validate(user)
+    return _user_read(db, user)
+
+
+@router.post(
+    "/users/{user_id}/points:increment",
+    response_model=UsersPoints,
+    tags=["users"],
+)
+def increment_user_points(
+    user_id: UUID,
+    payload: UsersPointsIncrement,
+    db: Session = Depends(get_db),
+) -> UsersPoints:
+    """Atomically add points to a user and return their balance.
+
+    The award is appended to the points ledger instead of updating the user row, so
+    concurrent awards never contend; the compactor folds it into ``users.points`` later
+    and notifies the leaderboard then.
+    """
+
+    if payload.delta == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid_points_delta",
+        )
+    balance = points_ledger.increment(db, user_id, payload.delta, payload.reason)
+    if balance is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="user_not_found",
+        )
+    return UsersPoints(user_id=user_id, points=balance)
+
+
+@router.get(
+    "/users/{user_id}/counts",
+    response_model=UsersCounts,
+    tags=["users"],
+)
+def get_user_counts(user_id: UUID, db: Session = Depends(get_db)) -> UsersCounts:
+    """Return the follower, following and pending request counters for a user."""
+
+    counts = db.execute(
+        select(
+            Users.followers_count,
+            Users.following_count,
+            Users.pending_requests_count,
+        ).where(Users.id == user_id)
+    ).one_or_none()
+    if counts is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="user_not_found",
+        )
+    return UsersCounts.model_validate(counts)
+
+
+@router.get(
+    "/users/{user_id}/followers",
+    response_model=UsersCardPage,
+    tags=["users"],
+)
+def list_user_followers(
+    user_id: UUID,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+) -> UsersCardPage:
+    """List accepted followers of a user, newest first, as keyset-paginated cards."""
+
+    return _list_user_cards(
+        db, user_id, Followers.followed_id, Followers.follower_id, limit, cursor
+    )
+
+
+@router.get(
+    "/users/{user_id}/following",
+    response_model=UsersCardPage,
+    tags=["users"],
+)
+def list_user_following(
+    user_id: UUID,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+) -> UsersCardPage:
+    """List users a user follows, newest first, as keyset-paginated cards."""
+
+    return _list_user_cards(
+        db, user_id, Followers.follower_id, Followers.followed_id, limit, cursor
+    )
+
+
+@router.get(
+    "/users/{user_id}/suggestions",
+    response_model=list[UsersSuggestion],
+    tags=["users"],
+)
+def list_user_suggestions(
+    user_id: UUID,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+) -> list[UsersSuggestion]:
+    """Suggest friends-of-friends to follow, ranked by mutual connections."""
+
+    _get_user_or_404(db, user_id)
+    ranked = follow_graph.suggest_follows(db, user_id, limit=limit)
+    if not ranked:
+        return []
+
+    cards = {
+        row.id: row
+        for row in db.execute(
+            select(Users.id, Users.full_name, Users.avatar_url).where(
+                Users.id.in_([identifier for identifier, _ in ranked])
+            )
+        )
+    }
+    return [
+        UsersSuggestion(
+            id=identifier,
+            full_name=cards[identifier].full_name,
+            avatar_url=cards[identifier].avatar_url,
+            mutual_count=mutual,
+        )
+        for identifier, mutual in ranked
+        if identifier in cards
+    ]
+
+
+@router.get(
+    "/users/{user_id}/leaderboard",
+    response_model=list[UsersLeaderboardEntry],
+    tags=["users"],
+)
+def user_leaderboard_neighbours(
+    user_id: UUID,
+    radius: int = Query(default=5, ge=0, le=50),
+    leaderboard: Leaderboard = Depends(get_leaderboard),
+) -> list[UsersLeaderboardEntry]:
+    """Return the user's global rank with up to ``radius`` users ranked either side."""
+
+    entries = leaderboard.around(user_id, radius)
+    if entries is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="user_not_ranked",
+        )
+    return [UsersLeaderboardEntry.model_validate(entry) for entry in entries]
+
+
+@router.get(
+    "/users/{user_id}/leaderboard/friends",
+    response_model=list[UsersLeaderboardEntry],
+    tags=["users"],
+)
+def user_friends_leaderboard(
+    user_id: UUID,
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    leaderboard: Leaderboard = Depends(get_leaderboard),
+    cache: RelationshipCache = Depends(get_relationship_cache),
+) -> list[UsersLeaderboardEntry]:
+    """Rank the user among the users they follow (accepted), by points.
+
+    The user's follows come from the relationship cache set; if it is not loaded yet it is
+    filled from Postgres once and the ranking retried.
+    """
+
+    follows_key = cache.key(user_id)
+    entries = leaderboard.friends(user_id, follows_key, limit)
+    if entries is None:
+        if not cache.load(db, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="user_not_found",
+            )
+        entries = leaderboard.friends(user_id, follows_key, limit) or []
+    return [UsersLeaderboardEntry.model_validate(entry) for entry in entries]
+
+
+@router.get(
+    "/users/{user_id}/location",
+    response_model=UsersLocation,
+    tags=["users"],
+)
+def get_user_location(user_id: UUID, db: Session = Depends(get_db)) -> UsersLocation:
+    """Return the user's most recent footstep."""
+
+    location = db.get(UserLocations, user_id)
+    if location is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="location_not_found",
+        )
+    return UsersLocation.model_validate(location)
+
+
+@router.get(
+    "/users/{user_id}/nearby",
+    response_model=list[UsersNearby],
+    tags=["users"],
+)
+def nearby_users(
+    user_id: UUID,
+    radius: float = Query(default=1000, gt=0, le=50_000),
+    limit: int = Query(default=20, ge=1, le=100),
+    following: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    presence: Presence = Depends(get_presence),
+    cache: RelationshipCache = Depends(get_relationship_cache),
+) -> list[UsersNearby]:
+    """List recently seen users within ``radius`` metres of the user, nearest first.
+
+    With ``following=true`` only users they follow (accepted) are listed. Answered from
+    Redis presence in one call; 404 ``user_not_present`` when the user has not been
+    seen within ``PRESENCE_TTL``.
+    """
+
+    follows_key = cache.key(user_id) if following else None
+    try:
+        found = presence.nearby(user_id, radius, limit, follows_key)
+    except LookupError:
+        if not cache.load(db, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="user_not_found",
+            ) from None
+        try:
+            found = presence.nearby(user_id, radius, limit, follows_key)
+        except LookupError:
+            # Evicted again before the retry; answer as if there were no position.
+            found = None
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="user_not_present",
+        )
+    return [UsersNearby(user_id=other, distance_m=distance) for other, distance in found]
+
+
+@router.post(
+    "/users/{user_id}/relationships:batch",
+    response_model=list[FollowersRelationship],
+    tags=["users"],
+)
+def batch_user_relationships(
+    user_id: UUID,
+    payload: FollowersBatchLookup,
+    db: Session = Depends(get_db),
+    cache: RelationshipCache = Depends(get_relationship_cache),
+) -> list[FollowersRelationship]:
+    """Return the user's follow status towards up to 500 targets in one cache round trip."""
+
+    target_ids = list(dict.fromkeys(payload.target_ids))
+    statuses = cache.lookup(db, user_id, target_ids)
+    if statuses is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="user_not_found",
+        )
+    return [
+        FollowersRelationship(target_id=target_id, status=statuses[target_id])
+        for target_id in target_ids
+    ]
+
+
+@router.post(
+    "/users/{user_id}/follow-requests:batch",
+    response_model=FollowersBatchResult,
+    tags=["users"],
+)
+def decide_user_follow_requests(
+    user_id: UUID,
+    payload: FollowersBatchDecision,
+    db: Session = Depends(get_db),
+    queue: TaskQueue = Depends(get_task_queue),
+) -> FollowersBatchResult:
+    """Accept or reject many pending requests to a user, or all of them when ``ids`` is omitted."""
+
+    if payload.status == StatusEnum.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid_status",
+        )
+    _get_user_or_404(db, user_id)
+
+    result = FollowersBatchResult()
+    ids = list(dict.fromkeys(payload.ids)) if payload.ids is not None else None
+    for decided in follow_bulk.decide_requests(db, user_id, payload.status, ids):
+        queue.enqueue(
+            "follow.bulk_updated",
+            {
+                "ids": [str(identifier) for identifier in decided],
+                "followed_id": str(user_id),
+                "status": payload.status.value,
+            },
+        )
+        result.ids.extend(decided)
+    result.count = len(result.ids)
+    return result
+
+
+@router.post(
+    "/users/{user_id}/following:unfollow",
+    response_model=FollowersBatchResult,
+    tags=["users"],
+)
+def unfollow_users(
+    user_id: UUID,
+    payload: FollowersBatchUnfollow,
+    db: Session = Depends(get_db),
+    queue: TaskQueue = Depends(get_task_queue),
+) -> FollowersBatchResult:
+    """Remove a user's follows of (or pending requests to) many users at once."""
+
+    _get_user_or_404(db, user_id)
+
+    result = FollowersBatchResult()
+    target_ids = list(dict.fromkeys(payload.target_ids))
+    for removed in follow_bulk.unfollow(db, user_id, target_ids):
+        queue.enqueue("follow.bulk_deleted", {"relationships": removed})
+        result.ids.extend(UUID(relationship["id"]) for relationship in removed)
+    result.count = len(result.ids)
+    return result
+
+
+@router.get(
+    "/users/{source_id}/path/{target_id}",
+    response_model=UsersPath,
+    tags=["users"],
+)
+def get_user_path(
+    source_id: UUID,
+    target_id: UUID,
+    max_depth: int = Query(default=4, ge=1, le=6),
+    db: Session = Depends(get_db),
+) -> UsersPath:
+    """Return the degrees of separation along accepted follows from source to target."""
+
+    _get_user_or_404(db, source_id)
+    _get_user_or_404(db, target_id)
+    degrees = follow_graph.degrees_of_separation(db, source_id, target_id, max_depth=max_depth)
+    return UsersPath(source_id=source_id, target_id=target_id, degrees=degrees)
 
 
 @router.put(
@@ -127,7 +608,7 @@ def update_user(
     user = _get_user_or_404(db, user_id)
     updates = payload.model_dump(exclude_unset=True)
     if not updates:
-        return UsersRead.model_validate(user)
+        return _user_read(db, user)
 
     if "email" in updates:
         email_conflict = db.execute(
@@ -151,6 +632,9 @@ def update_user(
                 detail="oauth_provider_id_already_exists",
             )
 
+    # Setting points outright replaces the balance, so awards not yet compacted go too.
+    if "points" in updates:
+        points_ledger.discard_pending(db, user_id)
     for field, value in updates.items():
         setattr(user, field, value)
 
@@ -159,7 +643,7 @@ def update_user(
     db.refresh(user)
 
     queue.enqueue("user.updated", {"id": str(user.id)})
-    return UsersRead.model_validate(user)
+    return _user_read(db, user)
 
 
 @router.delete(
@@ -336,6 +820,7 @@ def create_venue(
 
     venue_data = payload.model_dump(exclude_unset=True)
     venue = VenuesModel(**venue_data)
+    venue.opening_minutes = _opening_minutes(venue.opening_hours)
     db.add(venue)
     db.commit()
     db.refresh(venue)
@@ -344,23 +829,159 @@ def create_venue(
     return _serialize_venue(venue)
 
 
+@router.post(
+    "/venues:bulk",
+    response_model=BulkUpsertResult,
+    tags=["venues"],
+)
+async def bulk_upsert_venues(
+    request: Request,
+    db: Session = Depends(get_db),
+    queue: TaskQueue = Depends(get_task_queue),
+) -> BulkUpsertResult:
+    """Create or update venues from an NDJSON body, one venue per line, keyed on name."""
+
+    return await _run_bulk_upsert(
+        request, db, queue, bulk_load.upsert_venues_chunk, "venue.bulk_upserted"
+    )
+
+
 @router.get(
     "/venues",
     response_model=list[VenuesRead],
     tags=["venues"],
 )
-def list_venues(db: Session = Depends(get_db)) -> list[VenuesRead]:
-    """List venues ordered by creation date."""
+def list_venues(
+    amenities: VenuesAmenityFilter = Depends(),
+    tags_all: list[str] | None = Query(default=None),
+    tags_any: list[str] | None = Query(default=None),
+    open_at: datetime | None = Query(default=None),
+    open_now: bool = Query(default=False),
+    db: Session = Depends(get_db),
+) -> list[VenuesRead]:
+    """List venues ordered by creation date, optionally filtered by amenities, tags and hours.
+
+    ``tags_all`` keeps venues carrying every listed tag, ``tags_any`` those carrying at
+    least one; both are answered from the GIN index on ``venues.tags``. ``open_at`` /
+    ``open_now`` keep venues whose parsed opening hours cover that moment.
+    """
+
+    open_minute = _open_minute(open_at, open_now)
 
     order_clause = (
         VenuesModel.created_at.desc(),
         VenuesModel.id.desc(),
     )
-    result = db.execute(select(VenuesModel).order_by(*order_clause))
+    query = select(VenuesModel).order_by(*order_clause)
+    for name, wanted in amenities.selected().items():
+        query = query.where(getattr(VenuesModel, name).is_(wanted))
+    if tags_all:
+        query = query.where(VenuesModel.tags.contains(normalize_tags(tags_all)))
+    if tags_any:
+        query = query.where(VenuesModel.tags.overlap(normalize_tags(tags_any)))
+    if open_minute is not None:
+        query = query.where(VenuesModel.opening_minutes.contains(cast(open_minute, Integer)))
+    result = db.execute(query)
     venues = result.scalars().all()
     return [_serialize_venue(venue) for venue in venues]
 
 
+@router.get(
+    "/venues/autocomplete",
+    response_model=list[VenuesSuggestion],
+    tags=["venues"],
+)
+async def autocomplete_venues(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=8, ge=1, le=autocomplete.MAX_RESULTS),
+    index: autocomplete.VenueAutocomplete = Depends(get_venue_autocomplete),
+) -> list[VenuesSuggestion]:
+    """Complete venue names and cities from the in-process prefix index, most popular first.
+
+    Served without touching the database, so it is declared ``async`` to skip the
+    threadpool hop.
+    """
+
+    return [VenuesSuggestion.model_validate(hit) for hit in index.search(q, limit)]
+
+
+@router.get(
+    "/venues/facets",
+    response_model=VenuesFacets,
+    tags=["venues"],
+)
+async def venue_facets(
+    amenities: VenuesAmenityFilter = Depends(),
+    facets: amenity_facets.VenueFacets = Depends(get_venue_facets),
+) -> VenuesFacets:
+    """Count the venues the listing would return for these filters, per amenity.
+
+    Computed from the in-process amenity bitmap rather than the database.
+    """
+
+    total, counts = facets.counts(amenities.selected())
+    return VenuesFacets(total=total, amenities=counts)
+
+
+@router.get(
+    "/venues/tags",
+    response_model=list[VenuesTagCount],
+    tags=["venues"],
+)
+def popular_venue_tags(
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> list[VenuesTagCount]:
+    """Return the most used venue tags with their venue counts.
+
+    Reads the trigger-maintained ``tags`` counter table instead of unnesting every venue.
+    """
+
+    rows = db.execute(
+        select(Tags)
+        .where(Tags.venue_count > 0)
+        .order_by(Tags.venue_count.desc(), Tags.name)
+        .limit(limit)
+    )
+    return [VenuesTagCount.model_validate(tag) for tag in rows.scalars()]
+
+
+@router.get(
+    "/venues/search",
+    response_model=list[VenuesSearchHit],
+    tags=["venues"],
+)
+def search_venues(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    latitude: float | None = Query(default=None, ge=-90, le=90),
+    longitude: float | None = Query(default=None, ge=-180, le=180),
+    radius_m: float | None = Query(default=None, gt=0, le=100_000),
+    amenities: VenuesAmenityFilter = Depends(),
+    open_at: datetime | None = Query(default=None),
+    open_now: bool = Query(default=False),
+    db: Session = Depends(get_db),
+) -> list[VenuesSearchHit]:
+    """Search active venues by text with typo tolerance, optionally near a point and open."""
+
+    if (latitude is None) != (longitude is None) or (radius_m is not None and latitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid_location",
+        )
+    near = (latitude, longitude) if latitude is not None and longitude is not None else None
+    hits = venue_search.search(
+        db,
+        q,
+        limit=limit,
+        amenities=amenities.selected(),
+        near=near,
+        radius_m=radius_m,
+        open_minute=_open_minute(open_at, open_now),
+    )
+    return [VenuesSearchHit.model_validate(hit) for hit in hits]
+
+
 @router.get(
     "/venues/{venue_id}",
     response_model=VenuesRead,
@@ -373,6 +994,46 @@ def get_venue(venue_id: UUID, db: Session = Depends(get_db)) -> VenuesRead:
     return _serialize_venue(venue)
 
 
+@router.get(
+    "/venues/{venue_id}/occupancy",
+    response_model=VenuesOccupancy,
+    tags=["venues"],
+)
+def get_venue_occupancy_counts(
+    venue_id: UUID,
+    occupancy: VenueOccupancy = Depends(get_venue_occupancy),
+) -> VenuesOccupancy:
+    """Return how many people are at the venue now and unique visitors so far today.
+
+    Both come from Redis counters fed by check-ins, in one round trip; an unknown venue
+    reads as empty.
+    """
+
+    return VenuesOccupancy.model_validate(occupancy.snapshot(venue_id))
+
+
+@router.get(
+    "/venues/{venue_id}/visitors",
+    response_model=list[VenuesDailyVisitors],
+    tags=["venues"],
+)
+def list_venue_daily_visitors(
+    venue_id: UUID,
+    days: int = Query(default=30, ge=1, le=366),
+    db: Session = Depends(get_db),
+) -> list[VenuesDailyVisitors]:
+    """List persisted daily unique-visitor estimates for the venue, newest first."""
+
+    _get_venue_or_404(db, venue_id)
+    rows = db.execute(
+        select(VenueVisitors.day, VenueVisitors.unique_visitors)
+        .where(VenueVisitors.venue_id == venue_id)
+        .order_by(VenueVisitors.day.desc())
+        .limit(days)
+    )
+    return [VenuesDailyVisitors.model_validate(row) for row in rows]
+
+
 @router.put(
     "/venues/{venue_id}",
     response_model=VenuesRead,
@@ -393,6 +1054,8 @@ def update_venue(
 
     for field, value in updates.items():
         setattr(venue, field, value)
+    if "opening_hours" in updates:
+        venue.opening_minutes = _opening_minutes(venue.opening_hours)
 
     db.add(venue)
     db.commit()
@@ -466,10 +1129,18 @@ def create_follow_relationship(
         status=payload.status or StatusEnum.PENDING,
     )
     db.add(relationship)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        # A concurrent request created the same pair after the existence check above.
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="follow_relationship_exists",
+        ) from exc
     db.refresh(relationship)
 
-    queue.enqueue("follow.created", {"id": str(relationship.id)})
+    queue.enqueue("follow.created", _follow_event(relationship))
     return FollowersRead.model_validate(relationship)
 
 
@@ -538,7 +1209,7 @@ def update_follow_relationship(
     db.commit()
     db.refresh(relationship)
 
-    queue.enqueue("follow.updated", {"id": str(relationship.id)})
+    queue.enqueue("follow.updated", _follow_event(relationship))
     return FollowersRead.model_validate(relationship)
 
 
@@ -555,15 +1226,254 @@ def delete_follow_relationship(
     """Delete a follower relationship."""
 
     relationship = _get_follow_relationship_or_404(db, follow_id)
-    identifier = str(relationship.id)
+    # The row is gone by the time consumers see the event, so carry both endpoints.
+    event_payload = {
+        "id": str(relationship.id),
+        "follower_id": str(relationship.follower_id),
+        "followed_id": str(relationship.followed_id),
+    }
 
     db.delete(relationship)
     db.commit()
 
-    queue.enqueue("follow.deleted", {"id": identifier})
+    queue.enqueue("follow.deleted", event_payload)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@router.post(
+    "/footsteps:batch",
+    response_model=FootstepsIngestResult,
+    tags=["footsteps"],
+)
+def ingest_footsteps(
+    payload: FootstepsBatch,
+    response: Response,
+    db: Session = Depends(get_db),
+    queue: TaskQueue = Depends(get_task_queue),
+    fences: geofence.VenueFences = Depends(get_venue_fences),
+    presence: Presence = Depends(get_presence),
+    buffer: FootstepsBuffer = Depends(get_footsteps_buffer),
+) -> FootstepsIngestResult:
+    """Store a batch of pings, record the venue visits they imply and move users' locations.
+
+    Visits created or extended by the batch are announced in one ``venue.visited`` event.
+    With ``FOOTSTEPS_WRITE_BEHIND`` on, the batch is only appended to the Redis buffer
+    (202); the drainer stores it and records its visits later.
+    """
+
+    if get_settings().footsteps_write_behind:
+        response.status_code = status.HTTP_202_ACCEPTED
+        buffered = buffer.append(payload.footsteps)
+        return FootstepsIngestResult(inserted=0, visits=0, buffered=buffered)
+
+    try:
+        result = footsteps_ingest.ingest(db, payload.footsteps, fences, presence)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="user_not_found",
+        ) from None
+
+    if result.visits:
+        queue.enqueue("venue.visited", {"visits": result.visits})
+    return FootstepsIngestResult(inserted=result.inserted, visits=len(result.visits))
+
+
+@router.get(
+    "/footsteps/buffer",
+    response_model=FootstepsBufferStats,
+    tags=["footsteps"],
+)
+def footsteps_buffer_stats(
+    buffer: FootstepsBuffer = Depends(get_footsteps_buffer),
+) -> FootstepsBufferStats:
+    """Report how many pings wait in the write-behind buffer and the oldest one's age."""
+
+    return FootstepsBufferStats.model_validate(buffer.stats())
+
+
+@router.websocket("/footsteps/stream")
+async def stream_footsteps(
+    websocket: WebSocket,
+    user_id: UUID,
+    stream: str = Query(default="default", pattern=r"^[A-Za-z0-9_-]{1,64}$"),
+    batcher: footsteps_stream.FootstepsBatcher = Depends(get_footsteps_batcher),
+) -> None:
+    """Accept a continuous stream of a user's pings over one WebSocket.
+
+    Each message is one ``{"seq", "coordinates", "created_at"}`` ping, numbered upwards
+    by the client per ``stream``. The server first sends ``{"ack": n}`` with the last
+    stored ``seq`` for this stream, then another ack after each micro-batch commits.
+    After a reconnect, clients resend everything after the first ack.
+    """
+
+    session = await batcher.open(user_id, stream, websocket)
+    if session is None:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="user_not_found",
+        )
+    await websocket.accept()
+    try:
+        await websocket.send_json({"ack": session.received})
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                ping = FootstepsStreamPing.model_validate_json(raw)
+            except ValidationError:
+                await websocket.send_json({"error": "invalid_ping"})
+                continue
+            await batcher.submit(session, ping)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        batcher.close(session)
+
+
+@router.get(
+    "/live",
+    response_class=StreamingResponse,
+    tags=["live"],
+)
+async def stream_live_updates(
+    venue_ids: list[UUID] = Query(default_factory=list),
+    user_id: UUID | None = None,
+    hub: live_updates.LiveUpdates = Depends(get_live_updates),
+) -> StreamingResponse:
+    """Stream server-sent events for the venues' occupancy and the user's follow requests.
+
+    ``occupancy`` events carry a venue's counts after each check-in batch, and
+    ``follow_request`` / ``follow_requests`` events carry changes to requests the user sent
+    or received. After a ``resync`` event the client should refetch over REST, because
+    events were dropped.
+    """
+
+    if not venue_ids and user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="empty_subscription",
+        )
+    if len(venue_ids) > live_updates.MAX_VENUES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="too_many_venues",
+        )
+    return StreamingResponse(
+        hub.stream(venue_ids, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _run_bulk_upsert(
+    request: Request,
+    db: Session,
+    queue: TaskQueue,
+    upsert_chunk: Callable[[Session, Sequence[bulk_load.NdjsonLine]], bulk_load.ChunkOutcome],
+    event: str,
+) -> BulkUpsertResult:
+    result = BulkUpsertResult()
+    async for chunk in _iter_ndjson_chunks(request, get_settings().bulk_chunk_size):
+        outcome = await run_in_threadpool(upsert_chunk, db, chunk)
+        result.rows.extend(outcome.rows)
+        result.created += len(outcome.created)
+        result.updated += len(outcome.updated)
+        if outcome.created or outcome.updated:
+            # enqueue is a blocking Redis call; keep it off the event loop too.
+            await run_in_threadpool(
+                queue.enqueue, event, {"created": outcome.created, "updated": outcome.updated}
+            )
+
+    result.failed = len(result.rows) - result.created - result.updated
+    result.rows.sort(key=lambda row: row.line)
+    return result
+
+
+async def _iter_ndjson_chunks(
+    request: Request, chunk_size: int
+) -> AsyncIterator[list[bulk_load.NdjsonLine]]:
+    """Split a streamed NDJSON body into chunks of numbered, non-blank lines."""
+
+    buffer = b""
+    line_number = 0
+    chunk: list[bulk_load.NdjsonLine] = []
+    async for piece in request.stream():
+        buffer += piece
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            if raw.strip():
+                chunk.append((line_number, raw))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if buffer.strip():
+        chunk.append((line_number + 1, buffer))
+    if chunk:
+        yield chunk
+
+
+def _list_user_cards(
+    db: Session,
+    user_id: UUID,
+    owner_column: InstrumentedAttribute[UUID],
+    other_column: InstrumentedAttribute[UUID],
+    limit: int,
+    cursor: str | None,
+) -> UsersCardPage:
+    """Page through accepted edges of ``user_id`` joined to the user on the other side.
+
+    Pages are keyed on ``(created_at, id)`` of the relationship so each one is a range
+    scan of the ``ix_followers_accepted_*`` indexes no matter how deep the client goes.
+    """
+
+    _get_user_or_404(db, user_id)
+    stmt = (
+        select(
+            Users.id,
+            Users.full_name,
+            Users.avatar_url,
+            Followers.created_at.label("followed_at"),
+            Followers.id.label("follow_id"),
+        )
+        .select_from(Followers)
+        .join(Users, Users.id == other_column)
+        .where(owner_column == user_id, Followers.status == StatusEnum.ACCEPTED)
+        .order_by(Followers.created_at.desc(), Followers.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        after = tuple_(*(literal(value) for value in _decode_cursor(cursor)))
+        stmt = stmt.where(tuple_(Followers.created_at, Followers.id) < after)
+
+    rows = db.execute(stmt).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_cursor(last.followed_at, last.follow_id)
+    return UsersCardPage(
+        items=[UsersCard.model_validate(row) for row in rows[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+def _encode_cursor(created_at: datetime, identifier: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{identifier}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, identifier = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(identifier)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid_cursor",
+        ) from exc
+
+
 def _normalize_operator_role(role: Any) -> OperatorRoleModel:
     if isinstance(role, OperatorRoleModel):
         return role
@@ -624,6 +1534,32 @@ def _get_operator_or_404(db: Session, operator_id: UUID) -> OperatorsModel:
     return operator
 
 
+def _opening_minutes(value: str | None) -> list[Range[int]] | None:
+    if value is None:
+        return None
+    try:
+        ranges = opening_hours.parse(value)
+    except opening_hours.OpeningHoursError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid_opening_hours",
+        ) from exc
+    return [Range(start, end) for start, end in ranges]
+
+
+def _open_minute(open_at: datetime | None, open_now: bool) -> int | None:
+    if open_at is not None and open_now:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid_open_filter",
+        )
+    if open_now:
+        open_at = datetime.now(timezone.utc)
+    if open_at is None:
+        return None
+    return opening_hours.minute_of_week(open_at, ZoneInfo(get_settings().venues_timezone))
+
+
 def _get_venue_or_404(db: Session, venue_id: UUID) -> VenuesModel:
     venue = db.get(VenuesModel, venue_id)
     if venue is None:
@@ -641,6 +1577,14 @@ def _get_venues_by_ids(db: Session, venue_ids: list[UUID]) -> list[VenuesModel]:
     return venues
 
 
+def _user_read(db: Session, user: Users, balances: dict[UUID, int] | None = None) -> UsersRead:
+    if balances is None:
+        balances = points_ledger.balances(db, [user.id])
+    read = UsersRead.model_validate(user)
+    read.points = balances.get(user.id, read.points)
+    return read
+
+
 def _get_user_or_404(db: Session, user_id: UUID) -> Users:
     user = db.get(Users, user_id)
     if user is None:
@@ -663,5 +1607,14 @@ def _get_follow_relationship_or_404(db: Session, follow_id: UUID) -> Followers:
     return relationship
 
 
+def _follow_event(relationship: Followers) -> dict[str, str]:
+    return {
+        "id": str(relationship.id),
+        "follower_id": str(relationship.follower_id),
+        "followed_id": str(relationship.followed_id),
+        "status": relationship.status.value,
+    }
+
+
 if __name__ == "__main__":
     print("Running routes.py")
@@ -28,6 +28,22 @@ class Settings(BaseSettings):
 
     cors_origins: Union[List[str], str] = Field(default_factory=list, alias="CORS_ORIGINS")
 
+    bulk_chunk_size: int = Field(default=5000, alias="BULK_CHUNK_SIZE")
+    graph_snapshot_dir: str = Field(default="var/follow_graph", alias="GRAPH_SNAPSHOT_DIR")
+    relationship_cache_ttl: int = Field(default=3600, alias="RELATIONSHIP_CACHE_TTL")
+    venues_timezone: str = Field(default="UTC", alias="VENUES_TIMEZONE")
+    visit_gap_seconds: int = Field(default=900, alias="VISIT_GAP_SECONDS")
+    presence_ttl: int = Field(default=900, alias="PRESENCE_TTL")
+    live_queue_size: int = Field(default=64, alias="LIVE_QUEUE_SIZE")
+    live_heartbeat_seconds: float = Field(default=15.0, alias="LIVE_HEARTBEAT_SECONDS")
+    footsteps_stream_batch: int = Field(default=500, alias="FOOTSTEPS_STREAM_BATCH")
+    footsteps_stream_flush_ms: int = Field(default=250, alias="FOOTSTEPS_STREAM_FLUSH_MS")
+    footsteps_write_behind: bool = Field(default=False, alias="FOOTSTEPS_WRITE_BEHIND")
+    footsteps_buffer_max_lag: float = Field(default=30.0, alias="FOOTSTEPS_BUFFER_MAX_LAG")
+    footsteps_thin_metres: float = Field(default=10.0, alias="FOOTSTEPS_THIN_METRES")
+    footsteps_thin_seconds: float = Field(default=60.0, alias="FOOTSTEPS_THIN_SECONDS")
+    footsteps_simplify_metres: float = Field(default=5.0, alias="FOOTSTEPS_SIMPLIFY_METRES")
+
     @field_validator("cors_origins", mode="before")
     @classmethod
     def assemble_cors_origins(cls, value: Any) -> List[str] | str:
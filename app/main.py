@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 
 import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
 
 from app.api import get_api_router
 from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.amenity_facets import VenueFacets
+from app.services.autocomplete import VenueAutocomplete
+from app.services.events import EventSubscriber
+from app.services.footsteps_stream import FootstepsBatcher
+from app.services.geofence import VenueFences
+from app.services.live_updates import LiveUpdates
+from app.services.presence import Presence
+from app.services.task_queue import TaskQueue
 
 
 def configure_logging() -> None:
@@ -24,10 +36,60 @@ def configure_logging() -> None:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Lifecycle manager that configures logging."""
+    """Lifecycle manager that configures logging and per-process event consumers."""
 
     configure_logging()
-    yield
+    settings = get_settings()
+
+    autocomplete = VenueAutocomplete(SessionLocal)
+    facets = VenueFacets(SessionLocal)
+    fences = VenueFences(SessionLocal)
+    for name, index in (
+        ("venue_autocomplete", autocomplete),
+        ("venue_facets", facets),
+        ("venue_fences", fences),
+    ):
+        try:
+            await run_in_threadpool(index.load)
+        except SQLAlchemyError:
+            # Left unset, so its dependency answers 503 instead of serving an empty index.
+            structlog.get_logger(__name__).exception(f"{name}_load_failed")
+        else:
+            setattr(app.state, name, index)
+
+    live_updates = LiveUpdates(
+        asyncio.get_running_loop(),
+        queue_size=settings.live_queue_size,
+        heartbeat=settings.live_heartbeat_seconds,
+    )
+    app.state.live_updates = live_updates
+    footsteps_batcher = None
+    # Without its fences the stream would record footsteps but never detect a visit.
+    if hasattr(app.state, "venue_fences"):
+        footsteps_batcher = FootstepsBatcher(
+            str(settings.redis_url),
+            SessionLocal,
+            fences,
+            TaskQueue(str(settings.redis_url)),
+            Presence(str(settings.redis_url), ttl=settings.presence_ttl),
+            max_batch=settings.footsteps_stream_batch,
+            flush_interval=settings.footsteps_stream_flush_ms / 1000,
+        )
+        app.state.footsteps_batcher = footsteps_batcher
+
+    events = EventSubscriber(str(settings.redis_url))
+    autocomplete.subscribe(events)
+    facets.subscribe(events)
+    fences.subscribe(events)
+    live_updates.subscribe(events)
+    events.start()
+    app.state.events = events
+    try:
+        yield
+    finally:
+        if footsteps_batcher is not None:
+            await footsteps_batcher.stop()
+        events.stop()
 
 
 def create_app() -> FastAPI:
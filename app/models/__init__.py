@@ -1,9 +1,29 @@
 """SQLAlchemy ORM models."""
 
 from app.models.followers import Followers
+from app.models.influence import Influence
 from app.models.operators import Operators
+from app.models.points import Points
+from app.models.tags import Tags
+from app.models.user_locations import UserLocations
 from app.models.users import Users
+from app.models.venue_visitors import VenueVisitors
 from app.models.venues import Venues
+from app.models.visit_awards import VisitAwards
+from app.models.visits import Visits
 from app.models.footsteps import Footsteps
 
-__all__ = ["Followers", "Footsteps", "Operators", "Users", "Venues"]
+__all__ = [
+    "Followers",
+    "Footsteps",
+    "Influence",
+    "Operators",
+    "Points",
+    "Tags",
+    "UserLocations",
+    "Users",
+    "VenueVisitors",
+    "Venues",
+    "VisitAwards",
+    "Visits",
+]
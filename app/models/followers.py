@@ -4,7 +4,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy import DDL, DateTime, ForeignKey, Index, UniqueConstraint, event, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -20,6 +20,10 @@ class StatusEnum(enum.Enum):
 class Followers(Base):
     """TODO: Add model description."""
 
+    __table_args__ = (
+        UniqueConstraint("follower_id", "followed_id", name="uq_followers_follower_id_followed_id"),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
@@ -38,8 +42,95 @@ class Followers(Base):
         default=StatusEnum.PENDING,
     )
     follower_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
     )
     followed_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
     )
+
+
+# The unique constraint serves lookups by follower; these cover the newest-first listings
+# filtered by either side or by status, and the pending-request inbox of a user.
+Index(
+    "ix_followers_follower_id_created_at",
+    Followers.follower_id,
+    Followers.created_at.desc(),
+    postgresql_include=["status"],
+)
+Index(
+    "ix_followers_followed_id_created_at",
+    Followers.followed_id,
+    Followers.created_at.desc(),
+    postgresql_include=["status"],
+)
+Index(
+    "ix_followers_pending_followed_id",
+    Followers.followed_id,
+    Followers.created_at.desc(),
+    postgresql_where=Followers.status == StatusEnum.PENDING,
+)
+Index("ix_followers_status_created_at", Followers.status, Followers.created_at.desc())
+# Covering keyset indexes for the per-user followers / following pages, so a page is an
+# index range scan plus one primary-key probe into ``users`` per row.
+Index(
+    "ix_followers_accepted_followed_id",
+    Followers.followed_id,
+    Followers.created_at.desc(),
+    Followers.id.desc(),
+    postgresql_include=["follower_id"],
+    postgresql_where=Followers.status == StatusEnum.ACCEPTED,
+)
+Index(
+    "ix_followers_accepted_follower_id",
+    Followers.follower_id,
+    Followers.created_at.desc(),
+    Followers.id.desc(),
+    postgresql_include=["followed_id"],
+    postgresql_where=Followers.status == StatusEnum.ACCEPTED,
+)
+
+
+# Keep ``users.followers_count`` / ``following_count`` / ``pending_requests_count`` in step
+# with relationship changes, including rows removed by ``ON DELETE CASCADE``. Both affected
+# users are touched in a single UPDATE so concurrent mutual follows lock rows together.
+FOLLOW_COUNTS_FUNCTION = DDL(  # type: ignore[no-untyped-call]
+    """
+    CREATE OR REPLACE FUNCTION followers_maintain_counts() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.status = NEW.status THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' AND OLD.status <> 'REJECTED' THEN
+            UPDATE users SET
+                followers_count = followers_count
+                    - (id = OLD.followed_id AND OLD.status = 'ACCEPTED')::int,
+                following_count = following_count
+                    - (id = OLD.follower_id AND OLD.status = 'ACCEPTED')::int,
+                pending_requests_count = pending_requests_count
+                    - (id = OLD.followed_id AND OLD.status = 'PENDING')::int
+            WHERE id = OLD.followed_id
+                OR (id = OLD.follower_id AND OLD.status = 'ACCEPTED');
+        END IF;
+        IF TG_OP <> 'DELETE' AND NEW.status <> 'REJECTED' THEN
+            UPDATE users SET
+                followers_count = followers_count
+                    + (id = NEW.followed_id AND NEW.status = 'ACCEPTED')::int,
+                following_count = following_count
+                    + (id = NEW.follower_id AND NEW.status = 'ACCEPTED')::int,
+                pending_requests_count = pending_requests_count
+                    + (id = NEW.followed_id AND NEW.status = 'PENDING')::int
+            WHERE id = NEW.followed_id
+                OR (id = NEW.follower_id AND NEW.status = 'ACCEPTED');
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+)
+FOLLOW_COUNTS_TRIGGER = DDL(  # type: ignore[no-untyped-call]
+    "CREATE TRIGGER followers_maintain_counts "
+    "AFTER INSERT OR DELETE OR UPDATE OF status ON followers "
+    "FOR EACH ROW EXECUTE FUNCTION followers_maintain_counts()"
+)
+event.listen(Followers.__table__, "after_create", FOLLOW_COUNTS_FUNCTION)
+event.listen(Followers.__table__, "after_create", FOLLOW_COUNTS_TRIGGER)
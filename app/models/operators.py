@@ -5,7 +5,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, String, Table, func
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, String, Table, func
 from sqlalchemy.dialects.postgresql import UUID, CITEXT
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -37,6 +37,8 @@ operator_venues = Table(
         ForeignKey("venues.id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    # The primary key only serves lookups by operator; this one serves lookups by venue.
+    Index("ix_operator_venues_venue_id", "venue_id", "operator_id"),
 )
 
 
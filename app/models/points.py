@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Identity, Index, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Points(Base):
+    """Append-only ledger of point awards not yet folded into ``users.points``.
+
+    Awards only ever insert here, so concurrent awards to the same user never wait on the
+    user row. ``app.services.points_ledger.compact`` periodically moves the deltas into
+    ``users.points`` and deletes them; until then reads add the pending sum.
+    """
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    delta: Mapped[int] = mapped_column(nullable=False)
+    reason: Mapped[str | None] = mapped_column(default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+# Reads sum a user's pending deltas.
+Index("ix_points_user_id", Points.user_id)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from sqlalchemy import Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Tags(Base):
+    """Venue tags with the number of venues carrying each one.
+
+    ``venue_count`` is maintained by the ``venues_maintain_tag_counts`` trigger declared
+    alongside the ``Venues`` model.
+    """
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    venue_count: Mapped[int] = mapped_column(nullable=False, server_default=text("0"))
+
+# Popular-tag reads walk the counts from the top.
+Index("ix_tags_venue_count", Tags.venue_count.desc())
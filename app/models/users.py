@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, func, text
 from sqlalchemy.dialects.postgresql import UUID, CITEXT
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -21,6 +21,7 @@ class Users(Base):
     )
     email: Mapped[str] = mapped_column(CITEXT(), unique=True, index=True)
     full_name: Mapped[str] = mapped_column(default="")
+    avatar_url: Mapped[str | None] = mapped_column(default=None)
     oauth_provider: Mapped[str] = mapped_column(default="local")
     oauth_provider_id: Mapped[str] = mapped_column(
         unique=True,
@@ -38,6 +39,11 @@ class Users(Base):
         onupdate=func.now(),
     )
     points: Mapped[int] = mapped_column(default=0, nullable=False)
+    # Denormalised relationship counters maintained by the ``followers_maintain_counts``
+    # trigger declared alongside the ``Followers`` model.
+    followers_count: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    following_count: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    pending_requests_count: Mapped[int] = mapped_column(default=0, server_default=text("0"))
 
     # People this user follows (A → B)
     following: Mapped[list[Users]] = relationship(
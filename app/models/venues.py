@@ -4,8 +4,9 @@ import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, func
-from sqlalchemy.dialects.postgresql import UUID, CITEXT
+from geoalchemy2 import Geography, WKBElement
+from sqlalchemy import DDL, Computed, DateTime, Index, Text, event, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, INT4MULTIRANGE, TSVECTOR, UUID, CITEXT, Range
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -14,6 +15,32 @@ from app.models.operators import operator_venues
 if TYPE_CHECKING:  # pragma: no cover - aid static type analysis
     from app.models.operators import Operators
 
+# Boolean feature columns that search and listing endpoints can filter on.
+AMENITIES = (
+    "indoor",
+    "outdoor",
+    "parking_available",
+    "wheelchair_accessible",
+    "vip_area",
+    "smoking_allowed",
+    "alcohol_served",
+    "food_served",
+    "live_music",
+    "dance_floor",
+)
+
+SEARCH_CONFIG = "english"
+
+# Weighted document for full-text search: name first, then tags, then where it is, then
+# the free-text description.
+_SEARCH_DOCUMENT = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', venue_tags_text(tags)), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+    "coalesce(city, '') || ' ' || coalesce(address, '')), 'C') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'D')"
+)
+
 
 class Venues(Base):
     """TODO: Add model description."""
@@ -60,7 +87,15 @@ class Venues(Base):
     dance_floor: Mapped[bool | None] = mapped_column()
     dress_code: Mapped[str | None] = mapped_column()
     opening_hours: Mapped[str | None] = mapped_column()
-    tags: Mapped[str | None] = mapped_column()
+    # ``opening_hours`` parsed into minute-of-week ranges (see
+    # ``app.services.opening_hours``); NULL when unset or unparseable.
+    opening_minutes: Mapped[list[Range[int]] | None] = mapped_column(
+        INT4MULTIRANGE, deferred=True
+    )
+    # Normalised slugs (see ``app.schemas.venues.normalize_tags``).
+    tags: Mapped[list[str]] = mapped_column(
+        ARRAY(Text), default=list, server_default=text("'{}'")
+    )
     rating: Mapped[float | None] = mapped_column()
     number_of_reviews: Mapped[int | None] = mapped_column()
     price_range: Mapped[str | None] = mapped_column()
@@ -73,9 +108,81 @@ class Venues(Base):
     verified_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
     experience_points: Mapped[int] = mapped_column()
     photo_url: Mapped[str | None] = mapped_column(default="")
+    # Derived by Postgres; deferred so ordinary venue reads don't carry them.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(_SEARCH_DOCUMENT, persisted=True), deferred=True
+    )
+    location: Mapped[WKBElement | None] = mapped_column(
+        Geography("POINT", srid=4326, spatial_index=False),
+        Computed("ST_GeogFromText(coordinates)", persisted=True),
+        deferred=True,
+    )
 
     operators: Mapped[list[Operators]] = relationship(
         "Operators",
         secondary=operator_venues,
         back_populates="venues",
     )
+
+
+Index("ix_venues_search_vector", Venues.search_vector, postgresql_using="gin")
+# Typo-tolerant name matching (``%`` / ``<%`` operators from pg_trgm).
+Index(
+    "ix_venues_name_trgm",
+    Venues.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+)
+Index("ix_venues_location", Venues.location, postgresql_using="gist")
+# "Open at" probes: ``opening_minutes @> minute``.
+Index("ix_venues_opening_minutes", Venues.opening_minutes, postgresql_using="gist")
+# ``tags @>`` (all of) and ``tags &&`` (any of) filters.
+Index("ix_venues_tags", Venues.tags, postgresql_using="gin")
+
+
+# ``array_to_string`` is only STABLE, so the generated ``search_vector`` goes through this
+# IMMUTABLE wrapper (safe for a ``text[]`` argument).
+VENUE_TAGS_TEXT_FUNCTION = DDL(  # type: ignore[no-untyped-call]
+    "CREATE OR REPLACE FUNCTION venue_tags_text(text[]) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$ SELECT array_to_string($1, ' ') $$"
+)
+# Keep ``tags.venue_count`` in step with venue writes. All changed tags are applied in one
+# INSERT ... ON CONFLICT ordered by name, so concurrent writers lock counter rows in the
+# same order.
+TAG_COUNTS_FUNCTION = DDL(  # type: ignore[no-untyped-call]
+    """
+    CREATE OR REPLACE FUNCTION venues_maintain_tag_counts() RETURNS trigger AS $$
+    DECLARE
+        added text[] := '{}';
+        removed text[] := '{}';
+    BEGIN
+        IF TG_OP <> 'DELETE' THEN
+            added := NEW.tags;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            removed := OLD.tags;
+        END IF;
+        INSERT INTO tags (name, venue_count)
+        SELECT name, sum(delta)
+        FROM (
+            SELECT DISTINCT unnest(added) AS name, 1 AS delta
+            UNION ALL
+            SELECT DISTINCT unnest(removed), -1
+        ) AS changes
+        GROUP BY name
+        HAVING sum(delta) <> 0
+        ORDER BY name
+        ON CONFLICT (name) DO UPDATE SET venue_count = tags.venue_count + EXCLUDED.venue_count;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+)
+TAG_COUNTS_TRIGGER = DDL(  # type: ignore[no-untyped-call]
+    "CREATE TRIGGER venues_maintain_tag_counts "
+    "AFTER INSERT OR DELETE OR UPDATE OF tags ON venues "
+    "FOR EACH ROW EXECUTE FUNCTION venues_maintain_tag_counts()"
+)
+event.listen(Venues.__table__, "before_create", VENUE_TAGS_TEXT_FUNCTION)
+event.listen(Venues.__table__, "after_create", TAG_COUNTS_FUNCTION)
+event.listen(Venues.__table__, "after_create", TAG_COUNTS_TRIGGER)
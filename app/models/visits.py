@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Visits(Base):
+    """A user's stay inside a venue's ``area``, written by the geofence ingest stage.
+
+    Footsteps inside the same venue less than ``VISIT_GAP_SECONDS`` apart extend the
+    same visit; a longer gap starts a new one. ``inferred`` visits were written by the
+    stay-point job for venues the user dwelled next to rather than inside.
+    """
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    venue_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("venues.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    entered_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    exited_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    inferred: Mapped[bool] = mapped_column(default=False, server_default=text("false"))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+
+# Ingest extends a user's latest visit to the same venue.
+Index(
+    "ix_visits_user_id_venue_id_exited_at",
+    Visits.user_id,
+    Visits.venue_id,
+    Visits.exited_at.desc(),
+)
+# Per-venue history, newest first.
+Index("ix_visits_venue_id_entered_at", Visits.venue_id, Visits.entered_at.desc())
@@ -1,26 +1,99 @@
 """Pydantic schemas."""
 
-from app.schemas.followers import FollowersCreate, FollowersRead, FollowersUpdate
-from app.schemas.footsteps import Footsteps, FootstepsCreate, FootstepsUpdate
+from app.schemas.bulk import BulkRowResult, BulkUpsertResult
+from app.schemas.followers import (
+    FollowersBatchDecision,
+    FollowersBatchLookup,
+    FollowersBatchResult,
+    FollowersBatchUnfollow,
+    FollowersCreate,
+    FollowersRead,
+    FollowersRelationship,
+    FollowersUpdate,
+)
+from app.schemas.footsteps import (
+    Footsteps,
+    FootstepsBatch,
+    FootstepsBufferStats,
+    FootstepsCreate,
+    FootstepsIngestResult,
+    FootstepsStreamPing,
+    FootstepsUpdate,
+)
 from app.schemas.operators import OperatorRole, OperatorsCreate, OperatorsRead, OperatorsUpdate
-from app.schemas.users import UsersCreate, UsersRead, UsersUpdate
-from app.schemas.venues import Venues, VenuesCreate, VenuesUpdate
+from app.schemas.users import (
+    UsersCard,
+    UsersCardPage,
+    UsersCounts,
+    UsersCreate,
+    UsersInfluence,
+    UsersLeaderboardEntry,
+    UsersLocation,
+    UsersNearby,
+    UsersPath,
+    UsersPoints,
+    UsersPointsIncrement,
+    UsersRead,
+    UsersSuggestion,
+    UsersUpdate,
+)
+from app.schemas.venues import (
+    Venues,
+    VenuesAmenityFilter,
+    VenuesCreate,
+    VenuesDailyVisitors,
+    VenuesFacets,
+    VenuesOccupancy,
+    VenuesSearchHit,
+    VenuesSuggestion,
+    VenuesTagCount,
+    VenuesUpdate,
+)
 
 __all__ = [
+    "BulkRowResult",
+    "BulkUpsertResult",
+    "FollowersBatchDecision",
+    "FollowersBatchLookup",
+    "FollowersBatchResult",
+    "FollowersBatchUnfollow",
     "FollowersCreate",
     "FollowersRead",
+    "FollowersRelationship",
     "FollowersUpdate",
     "Footsteps",
+    "FootstepsBatch",
+    "FootstepsBufferStats",
     "FootstepsCreate",
+    "FootstepsIngestResult",
+    "FootstepsStreamPing",
     "FootstepsUpdate",
     "OperatorRole",
     "OperatorsCreate",
     "OperatorsRead",
     "OperatorsUpdate",
+    "UsersCard",
+    "UsersCardPage",
+    "UsersCounts",
     "UsersCreate",
+    "UsersInfluence",
+    "UsersLeaderboardEntry",
+    "UsersLocation",
+    "UsersNearby",
+    "UsersPath",
+    "UsersPoints",
+    "UsersPointsIncrement",
     "UsersRead",
+    "UsersSuggestion",
     "UsersUpdate",
     "Venues",
+    "VenuesAmenityFilter",
     "VenuesCreate",
+    "VenuesDailyVisitors",
+    "VenuesFacets",
+    "VenuesOccupancy",
+    "VenuesSearchHit",
+    "VenuesSuggestion",
+    "VenuesTagCount",
     "VenuesUpdate",
 ]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class BulkRowResult(BaseModel):
+    """Outcome for a single NDJSON line of a bulk upload."""
+
+    line: int
+    status: Literal["created", "updated", "error"]
+    id: UUID | None = None
+    error: str | None = None
+
+
+class BulkUpsertResult(BaseModel):
+    """Aggregated outcome of a bulk upload."""
+
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    rows: list[BulkRowResult] = []
@@ -42,3 +42,36 @@ class FollowersRead(FollowersInDB):
     """Properties to return to client."""
 
     pass
+
+
+class FollowersBatchLookup(BaseModel):
+    """Target users to resolve follow-button state for."""
+
+    target_ids: list[UUID] = Field(min_length=1, max_length=500)
+
+
+class FollowersRelationship(BaseModel):
+    """The viewer's follow status towards one target; ``None`` when not following."""
+
+    target_id: UUID
+    status: StatusEnum | None = None
+
+
+class FollowersBatchDecision(BaseModel):
+    """Accept or reject pending follow requests; omit ``ids`` to decide all of them."""
+
+    status: StatusEnum
+    ids: list[UUID] | None = Field(default=None, min_length=1, max_length=10_000)
+
+
+class FollowersBatchUnfollow(BaseModel):
+    """Users to stop following (or withdraw requests to)."""
+
+    target_ids: list[UUID] = Field(min_length=1, max_length=10_000)
+
+
+class FollowersBatchResult(BaseModel):
+    """Relationships changed by a bulk operation."""
+
+    count: int = 0
+    ids: list[UUID] = Field(default_factory=list)
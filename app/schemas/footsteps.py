@@ -3,7 +3,9 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.services.geometry import parse_point
 
 
 class FootstepsBase(BaseModel):
@@ -15,7 +17,56 @@ class FootstepsBase(BaseModel):
 
 class FootstepsCreate(FootstepsBase):
     """Properties to receive on Footsteps creation."""
-    pass
+    # When the ping was taken; defaults to the time it is ingested.
+    created_at: datetime | None = None
+
+    @field_validator("coordinates")
+    @classmethod
+    def _validate_coordinates(cls, value: str) -> str:
+        parse_point(value)
+        return value
+
+
+class FootstepsBatch(BaseModel):
+    """A batch of pings for the ingest pipeline."""
+
+    footsteps: list[FootstepsCreate] = Field(min_length=1, max_length=5000)
+
+
+class FootstepsStreamPing(BaseModel):
+    """One ping on a footsteps WebSocket stream, numbered by the client."""
+
+    seq: int = Field(ge=1)
+    coordinates: str
+    created_at: datetime | None = None
+
+    @field_validator("coordinates")
+    @classmethod
+    def _validate_coordinates(cls, value: str) -> str:
+        parse_point(value)
+        return value
+
+
+class FootstepsIngestResult(BaseModel):
+    """How many footsteps a batch stored and how many visits it created or extended.
+
+    ``inserted`` counts the pings left after thinning. In write-behind mode nothing is
+    stored yet and ``buffered`` counts the queued pings.
+    """
+
+    inserted: int
+    visits: int
+    buffered: int = 0
+
+
+class FootstepsBufferStats(BaseModel):
+    """Depth of the write-behind buffer and the age of its oldest entry."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    entries: int
+    pings: int
+    lag_seconds: float
 
 
 class FootstepsUpdate(FootstepsBase):
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class UsersBase(BaseModel):
@@ -12,6 +12,7 @@ class UsersBase(BaseModel):
     oauth_provider: str
     oauth_provider_id: str
     points: int = 0
+    avatar_url: str | None = None
 
 
 class UsersCreate(UsersBase):
@@ -26,6 +27,7 @@ class UsersUpdate(BaseModel):
     oauth_provider: str | None = None
     oauth_provider_id: str | None = None
     points: int | None = None
+    avatar_url: str | None = None
 
 
 class UsersRead(UsersBase):
@@ -36,3 +38,104 @@ class UsersRead(UsersBase):
     id: UUID
     created_at: datetime
     updated_at: datetime
+    followers_count: int = 0
+    following_count: int = 0
+    pending_requests_count: int = 0
+
+
+class UsersCounts(BaseModel):
+    """Follower counters maintained on the user row."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    followers_count: int
+    following_count: int
+    pending_requests_count: int
+
+
+class UsersCard(BaseModel):
+    """Compact user representation for follower and following lists."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    full_name: str
+    avatar_url: str | None = None
+    followed_at: datetime
+
+
+class UsersCardPage(BaseModel):
+    """A page of user cards with the cursor for the next page, if any."""
+
+    items: list[UsersCard]
+    next_cursor: str | None = None
+
+
+class UsersSuggestion(BaseModel):
+    """A suggested user to follow and how many of the viewer's follows follow them."""
+
+    id: UUID
+    full_name: str
+    avatar_url: str | None = None
+    mutual_count: int
+
+
+class UsersInfluence(BaseModel):
+    """A user's PageRank influence score and rank from the last batch run."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    full_name: str
+    avatar_url: str | None = None
+    score: float
+    rank: int
+
+
+class UsersLeaderboardEntry(BaseModel):
+    """A user's points and rank on a leaderboard."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: UUID
+    points: int
+    rank: int
+
+
+class UsersPointsIncrement(BaseModel):
+    """Points to add to (or, when negative, take from) a user's balance."""
+
+    delta: int = Field(ge=-1_000_000, le=1_000_000)
+    reason: str | None = Field(default=None, max_length=200)
+
+
+class UsersPoints(BaseModel):
+    """A user's balance: compacted ``users.points`` plus pending ledger deltas."""
+
+    user_id: UUID
+    points: int
+
+
+class UsersLocation(BaseModel):
+    """A user's most recent footstep."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: UUID
+    coordinates: str
+    recorded_at: datetime
+
+
+class UsersNearby(BaseModel):
+    """A user seen recently within the search radius, and how far away they are."""
+
+    user_id: UUID
+    distance_m: float
+
+
+class UsersPath(BaseModel):
+    """Degrees of separation between two users; ``None`` when beyond the search depth."""
+
+    source_id: UUID
+    target_id: UUID
+    degrees: int | None = None
@@ -1,9 +1,50 @@
 from __future__ import annotations
 
+import re
 import uuid
-from datetime import datetime
+from collections.abc import Iterable
+from datetime import date, datetime
+from typing import Annotated, Any
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import AfterValidator, BaseModel, BeforeValidator, ConfigDict, EmailStr
+
+from app.services.geometry import parse_point
+
+_TAG_SEPARATORS = re.compile(r"[,;]")
+_TAG_INVALID = re.compile(r"[^\w-]+")
+
+
+def normalize_tags(values: Iterable[str]) -> list[str]:
+    """Slugify tags ("Craft Beer" -> "craft-beer") and drop blanks and repeats, keeping order."""
+
+    tags: dict[str, None] = {}
+    for value in values:
+        tag = _TAG_INVALID.sub("", "-".join(value.lower().split())).strip("-")
+        if tag:
+            tags.setdefault(tag, None)
+    return list(tags)
+
+
+def _parse_tags(value: Any) -> Any:
+    # An explicit null clears the tags; the legacy comma-separated string is still accepted.
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = _TAG_SEPARATORS.split(value)
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return normalize_tags(value)
+    return value
+
+
+def _check_point(value: str | None) -> str | None:
+    # Postgres derives ``location`` from the WKT, so reject what it could not parse.
+    if value is not None:
+        parse_point(value)
+    return value
+
+
+TagList = Annotated[list[str] | None, BeforeValidator(_parse_tags)]
+PointWkt = Annotated[str | None, AfterValidator(_check_point)]
 
 
 class VenuesBase(BaseModel):
@@ -35,7 +76,7 @@ class VenuesBase(BaseModel):
     dance_floor: bool | None = None
     dress_code: str | None = None
     opening_hours: str | None = None
-    tags: str | None = None
+    tags: TagList = None
     rating: float | None = None
     number_of_reviews: int | None = None
     price_range: str | None = None
@@ -50,12 +91,13 @@ class VenuesBase(BaseModel):
 
 class VenuesCreate(VenuesBase):
     """Properties to receive on Venues creation."""
-    pass
+
+    coordinates: PointWkt = None
 
 class VenuesUpdate(BaseModel):
     """Properties to receive on Venues update."""
 
-    coordinates: str | None = None
+    coordinates: PointWkt = None
     area: str | None = None
     name: str | None = None
     description: str | None = None
@@ -81,7 +123,7 @@ class VenuesUpdate(BaseModel):
     dance_floor: bool | None = None
     dress_code: str | None = None
     opening_hours: str | None = None
-    tags: str | None = None
+    tags: TagList = None
     rating: float | None = None
     number_of_reviews: int | None = None
     price_range: str | None = None
@@ -108,3 +150,84 @@ class Venues(VenuesInDB):
     """Properties to return to client."""
 
     pass
+
+
+class VenuesAmenityFilter(BaseModel):
+    """Optional amenity flags a venue must match; unset flags are not filtered on."""
+
+    indoor: bool | None = None
+    outdoor: bool | None = None
+    parking_available: bool | None = None
+    wheelchair_accessible: bool | None = None
+    vip_area: bool | None = None
+    smoking_allowed: bool | None = None
+    alcohol_served: bool | None = None
+    food_served: bool | None = None
+    live_music: bool | None = None
+    dance_floor: bool | None = None
+
+    def selected(self) -> dict[str, bool]:
+        """Return only the flags the caller set."""
+
+        return {name: value for name, value in self.model_dump().items() if value is not None}
+
+
+class VenuesFacets(BaseModel):
+    """How many venues match a filter, and how many of those have each amenity."""
+
+    total: int
+    amenities: dict[str, int]
+
+
+class VenuesOccupancy(BaseModel):
+    """People at a venue now and estimated unique visitors so far on ``day``."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    venue_id: uuid.UUID
+    day: date
+    present: int
+    unique_visitors: int
+
+
+class VenuesDailyVisitors(BaseModel):
+    """A past day's estimated unique visitors."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    day: date
+    unique_visitors: int
+
+
+class VenuesTagCount(BaseModel):
+    """A tag and how many venues carry it."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    name: str
+    venue_count: int
+
+
+class VenuesSearchHit(BaseModel):
+    """A venue matching a search, with its relevance and a highlighted description."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    name: str
+    city: str | None = None
+    address: str | None = None
+    tags: list[str]
+    score: float
+    snippet: str | None = None
+    distance_m: float | None = None
+
+
+class VenuesSuggestion(BaseModel):
+    """A venue name completion."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    name: str
+    city: str | None = None
@@ -1,5 +1,6 @@
 """Application services."""
 
 from app.services.task_queue import TaskQueue
+from app.services.worker import TaskWorker
 
-__all__ = ["TaskQueue"]
+__all__ = ["TaskQueue", "TaskWorker"]
@@ -0,0 +1,188 @@
+"""In-process amenity facet counts over packed bitsets.
+
+Every venue gets a slot, and each amenity keeps two bit-arrays over the slots (one for
+``IS TRUE``, one for ``IS FALSE``; ``NULL`` sets neither), packed 64 slots to a
+``uint64`` word. A filter is the AND of the matching rows, and the facet counts for
+every amenity at once are one ``bitwise_and`` plus ``bitwise_count`` over the whole
+matrix, instead of a ``GROUP BY`` per facet.
+
+Like ``autocomplete``, each API process loads the index at startup and keeps it current
+from ``venue.*`` events delivered by ``EventSubscriber``.
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.venues import AMENITIES
+from app.models.venues import Venues as VenuesModel
+from app.services.events import EventSubscriber
+
+logger = structlog.get_logger(__name__)
+
+Flags = Sequence[bool | None]
+
+_POSITION = {name: position for position, name in enumerate(AMENITIES)}
+_WORD_BITS = 64
+
+
+class AmenityBitmap:
+    """Packed ``IS TRUE`` / ``IS FALSE`` bit-arrays per amenity, one bit per venue slot."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        words = max(1, -(-capacity // _WORD_BITS))
+        self._live = np.zeros(words, dtype=np.uint64)
+        self._true = np.zeros((len(AMENITIES), words), dtype=np.uint64)
+        self._false = np.zeros((len(AMENITIES), words), dtype=np.uint64)
+        self._slot_of: dict[UUID, int] = {}
+        self._free: list[int] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, venues: Sequence[tuple[UUID, Flags]]) -> AmenityBitmap:
+        """Bulk-build a bitmap, packing each amenity's column in one vectorised pass."""
+
+        bitmap = cls(len(venues))
+        words = len(bitmap._live)
+        shape = (len(venues), len(AMENITIES))
+        true = np.array([[v is True for v in values] for _, values in venues], dtype=bool)
+        false = np.array([[v is False for v in values] for _, values in venues], dtype=bool)
+        bitmap._live = _pack(np.ones(len(venues), dtype=bool), words)
+        bitmap._true = _pack(true.reshape(shape).T, words)
+        bitmap._false = _pack(false.reshape(shape).T, words)
+        bitmap._slot_of = {venue_id: slot for slot, (venue_id, _) in enumerate(venues)}
+        return bitmap
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def counts(self, selected: Mapping[str, bool]) -> tuple[int, dict[str, int]]:
+        """Count venues matching ``selected``, and how many of those have each amenity."""
+
+        with self._lock:
+            mask = self._live.copy()
+            for name, wanted in selected.items():
+                mask &= (self._true if wanted else self._false)[_POSITION[name]]
+            total = int(np.bitwise_count(mask).sum())
+            per_amenity = np.bitwise_count(self._true & mask).sum(axis=1)
+        return total, dict(zip(AMENITIES, per_amenity.tolist(), strict=True))
+
+    def upsert(self, venue_id: UUID, values: Flags) -> None:
+        """Set a venue's amenity bits, adding the venue if it is new."""
+
+        with self._lock:
+            slot = self._slot_of.get(venue_id)
+            if slot is None:
+                slot = self._claim_slot(venue_id)
+            word, bit = divmod(slot, _WORD_BITS)
+            flag = np.uint64(1 << bit)
+            for position, value in enumerate(values):
+                _assign(self._true, position, word, flag, value is True)
+                _assign(self._false, position, word, flag, value is False)
+            self._live[word] |= flag
+
+    def remove(self, venue_id: UUID) -> None:
+        with self._lock:
+            slot = self._slot_of.pop(venue_id, None)
+            if slot is None:
+                return
+            word, bit = divmod(slot, _WORD_BITS)
+            keep = ~np.uint64(1 << bit)
+            self._live[word] &= keep
+            self._true[:, word] &= keep
+            self._false[:, word] &= keep
+            self._free.append(slot)
+
+    def _claim_slot(self, venue_id: UUID) -> int:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slot_of)
+            if slot >= len(self._live) * _WORD_BITS:
+                self._grow()
+        self._slot_of[venue_id] = slot
+        return slot
+
+    def _grow(self) -> None:
+        words = len(self._live)
+        self._live = np.concatenate([self._live, np.zeros(words, dtype=np.uint64)])
+        padding = np.zeros((len(AMENITIES), words), dtype=np.uint64)
+        self._true = np.concatenate([self._true, padding], axis=1)
+        self._false = np.concatenate([self._false, padding], axis=1)
+
+
+class VenueFacets:
+    """An ``AmenityBitmap`` over all venues, loaded from and kept in sync with Postgres."""
+
+    def __init__(self, session_factory: sessionmaker[Session]):
+        self._session_factory = session_factory
+        self.bitmap = AmenityBitmap()
+
+    def load(self) -> None:
+        """(Re)build the whole bitmap with one bulk query and swap it in."""
+
+        with self._session_factory() as session:
+            rows = session.execute(_flags_query()).all()
+        self.bitmap = AmenityBitmap.build([(row[0], tuple(row[1:])) for row in rows])
+        logger.info("venue_facets_loaded", venues=len(self.bitmap))
+
+    def subscribe(self, subscriber: EventSubscriber) -> None:
+        subscriber.register("venue.created", self.handle_venue_changed)
+        subscriber.register("venue.updated", self.handle_venue_changed)
+        subscriber.register("venue.deleted", self.handle_venue_deleted)
+        subscriber.register("venue.bulk_upserted", self.handle_venues_bulk_upserted)
+        subscriber.on_resync(self.load)
+
+    def counts(self, selected: Mapping[str, bool]) -> tuple[int, dict[str, int]]:
+        return self.bitmap.counts(selected)
+
+    def handle_venue_changed(self, payload: dict[str, Any]) -> None:
+        self._refresh([UUID(payload["id"])])
+
+    def handle_venue_deleted(self, payload: dict[str, Any]) -> None:
+        self.bitmap.remove(UUID(payload["id"]))
+
+    def handle_venues_bulk_upserted(self, payload: dict[str, Any]) -> None:
+        self._refresh([UUID(identifier) for identifier in payload["created"] + payload["updated"]])
+
+    def _refresh(self, venue_ids: list[UUID]) -> None:
+        with self._session_factory() as session:
+            rows = {
+                row[0]: tuple(row[1:])
+                for row in session.execute(_flags_query().where(VenuesModel.id.in_(venue_ids)))
+            }
+        for venue_id in venue_ids:
+            values = rows.get(venue_id)
+            if values is None:
+                self.bitmap.remove(venue_id)
+            else:
+                self.bitmap.upsert(venue_id, values)
+
+
+def _flags_query() -> Any:
+    return select(VenuesModel.id, *(getattr(VenuesModel, name) for name in AMENITIES))
+
+
+def _pack(bits: npt.NDArray[np.bool_], words: int) -> npt.NDArray[np.uint64]:
+    """Pack booleans along the last axis into little-endian ``uint64`` words."""
+
+    padding = [(0, 0)] * (bits.ndim - 1) + [(0, words * _WORD_BITS - bits.shape[-1])]
+    packed = np.packbits(np.pad(bits, padding), axis=-1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").astype(np.uint64)
+
+
+def _assign(
+    rows: npt.NDArray[np.uint64], position: int, word: int, flag: np.uint64, value: bool
+) -> None:
+    if value:
+        rows[position, word] |= flag
+    else:
+        rows[position, word] &= ~flag
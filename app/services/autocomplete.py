@@ -0,0 +1,314 @@
+"""In-process venue autocomplete.
+
+Each API process keeps a ``PrefixIndex``: a sorted list of normalised search terms
+(the venue name, every word-start suffix of it, and the city) with a parallel array of
+venue slots. A prefix query is two binary searches for the matching key range, ranked
+by popularity (review count). Small ranges are ranked on the spot. Wide ones (short
+prefixes like ``"b"``) have their top entries precomputed when the index is built and
+patched in place as venues change, so no request pays for ranking thousands of keys.
+Keys of changed venues go to a small sorted side list, and keys of removed ones are
+skipped until ``MERGE_THRESHOLD`` such changes are folded into the big arrays at once,
+so an event does not shift the whole list.
+
+The index is loaded from Postgres at startup and kept current from ``venue.*`` events
+delivered by ``EventSubscriber``.
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.venues import Venues as VenuesModel
+from app.services.events import EventSubscriber
+
+logger = structlog.get_logger(__name__)
+
+# Key ranges up to this size are ranked per query; wider ones use the cache.
+SCAN_LIMIT = 256
+# The largest ``limit`` callers may ask for.
+MAX_RESULTS = 20
+# Entries kept per cached prefix; the slack absorbs removals without a re-rank.
+CACHE_DEPTH = 2 * MAX_RESULTS
+# Pending and stale keys tolerated before they are merged into the sorted arrays.
+MERGE_THRESHOLD = 1024
+_KEY_END = "\U0010ffff"
+
+
+@dataclass(frozen=True, slots=True)
+class Suggestion:
+    id: UUID
+    name: str
+    city: str | None
+    popularity: int
+
+
+def normalize(text: str) -> str:
+    """Case-fold, strip accents and collapse whitespace."""
+
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+
+def terms(suggestion: Suggestion) -> set[str]:
+    """Keys a venue is reachable under: each word-start suffix of its name, and its city."""
+
+    words = normalize(suggestion.name).split()
+    found = {" ".join(words[start:]) for start in range(len(words))}
+    if suggestion.city:
+        found.add(normalize(suggestion.city))
+    found.discard("")
+    return found
+
+
+def _term(entry: tuple[str, int]) -> str:
+    return entry[0]
+
+
+def _prefixes(keys: Iterable[str]) -> set[str]:
+    return {key[:end] for key in keys for end in range(1, len(key) + 1)}
+
+
+class PrefixIndex:
+    """Sorted term keys searched by binary search, ranked by venue popularity."""
+
+    def __init__(self) -> None:
+        self._keys: list[str] = []
+        self._slots = array("I")
+        self._venues: list[Suggestion | None] = []
+        self._slot_of: dict[UUID, int] = {}
+        self._free: list[int] = []
+        # Keys added since the last merge, sorted; and removed slots whose keys are stale.
+        self._pending: list[tuple[str, int]] = []
+        self._dead: set[int] = set()
+        self._stale = 0
+        self._top: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, suggestions: Iterable[Suggestion]) -> PrefixIndex:
+        """Bulk-build an index, sorting all keys once."""
+
+        index = cls()
+        pairs: list[tuple[str, int]] = []
+        for suggestion in suggestions:
+            slot = index._claim_slot(suggestion)
+            pairs.extend((term, slot) for term in terms(suggestion))
+        pairs.sort()
+        index._keys = [term for term, _ in pairs]
+        index._slots = array("I", (slot for _, slot in pairs))
+        index._warm()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def search(self, prefix: str, limit: int = 8) -> list[Suggestion]:
+        """Return up to ``limit`` venues with a term starting with ``prefix``."""
+
+        term = normalize(prefix)
+        if not term:
+            return []
+        limit = min(limit, MAX_RESULTS)
+        with self._lock:
+            low = bisect_left(self._keys, term)
+            high = bisect_left(self._keys, term + _KEY_END, low)
+            pending_low = bisect_left(self._pending, term, key=_term)
+            pending_high = bisect_left(self._pending, term + _KEY_END, pending_low, key=_term)
+            if high - low + pending_high - pending_low <= SCAN_LIMIT:
+                slots = self._rank(low, high, limit, pending_low, pending_high)
+            else:
+                cached = self._top.get(term)
+                if cached is None:
+                    cached = self._top[term] = self._rank(
+                        low, high, CACHE_DEPTH, pending_low, pending_high
+                    )
+                slots = cached[:limit]
+            return [self._venues[slot] for slot in slots]  # type: ignore[misc]
+
+    def upsert(self, suggestion: Suggestion) -> None:
+        """Add a venue or replace its name, city and popularity."""
+
+        with self._lock:
+            self._discard(suggestion.id)
+            slot = self._claim_slot(suggestion)
+            added = terms(suggestion)
+            for term in added:
+                insort(self._pending, (term, slot))
+            for prefix in _prefixes(added):
+                cached = self._top.get(prefix)
+                if cached is not None and slot not in cached:
+                    self._promote(cached, slot)
+            self._merge_if_due()
+
+    def remove(self, venue_id: UUID) -> None:
+        with self._lock:
+            self._discard(venue_id)
+            self._merge_if_due()
+
+    def _order(self, slot: int) -> tuple[int, str]:
+        venue = self._venues[slot]
+        assert venue is not None
+        return -venue.popularity, venue.name
+
+    def _rank(
+        self, low: int, high: int, limit: int, pending_low: int = 0, pending_high: int = 0
+    ) -> list[int]:
+        slots = set(self._slots[low:high])
+        slots.update(slot for _, slot in self._pending[pending_low:pending_high])
+        return heapq.nsmallest(limit, slots - self._dead, key=self._order)
+
+    def _warm(self) -> None:
+        """Cache the ranking of every prefix whose key range is wider than SCAN_LIMIT."""
+
+        keys = self._keys
+        wide = [(0, len(keys))]
+        depth = 1
+        while wide:
+            narrower = []
+            for start, stop in wide:
+                low = start
+                while low < stop:
+                    prefix = keys[low][:depth]
+                    if len(prefix) < depth:
+                        # The key is the enclosing prefix itself; longer keys follow it.
+                        low = bisect_right(keys, prefix, low, stop)
+                        continue
+                    high = bisect_left(keys, prefix + _KEY_END, low, stop)
+                    if high - low > SCAN_LIMIT:
+                        self._top[prefix] = self._rank(low, high, CACHE_DEPTH)
+                        narrower.append((low, high))
+                    low = high
+            wide = narrower
+            depth += 1
+
+    def _promote(self, cached: list[int], slot: int) -> None:
+        if len(cached) >= CACHE_DEPTH and self._order(slot) >= self._order(cached[-1]):
+            return
+        insort(cached, slot, key=self._order)
+        del cached[CACHE_DEPTH:]
+
+    def _claim_slot(self, suggestion: Suggestion) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._venues[slot] = suggestion
+        else:
+            slot = len(self._venues)
+            self._venues.append(suggestion)
+        self._slot_of[suggestion.id] = slot
+        return slot
+
+    def _discard(self, venue_id: UUID) -> None:
+        slot = self._slot_of.pop(venue_id, None)
+        if slot is None:
+            return
+        suggestion = self._venues[slot]
+        assert suggestion is not None
+        removed = terms(suggestion)
+        for term in removed:
+            position = bisect_left(self._pending, (term, slot))
+            if position < len(self._pending) and self._pending[position] == (term, slot):
+                del self._pending[position]
+            else:
+                # Skipped by searches and dropped at the next merge.
+                self._stale += 1
+        for prefix in _prefixes(removed):
+            cached = self._top.get(prefix)
+            if cached is not None and slot in cached:
+                cached.remove(slot)
+                if len(cached) < MAX_RESULTS:
+                    # Too few left to answer every limit; re-rank on next use.
+                    del self._top[prefix]
+        self._venues[slot] = None
+        # Reusable once the merge has dropped its stale keys.
+        self._dead.add(slot)
+
+    def _merge_if_due(self) -> None:
+        if len(self._pending) + self._stale < MERGE_THRESHOLD:
+            return
+        live = (
+            (key, slot)
+            for key, slot in zip(self._keys, self._slots, strict=True)
+            if slot not in self._dead
+        )
+        merged = list(heapq.merge(live, self._pending))
+        self._keys = [key for key, _ in merged]
+        self._slots = array("I", (slot for _, slot in merged))
+        self._pending = []
+        self._free.extend(self._dead)
+        self._dead = set()
+        self._stale = 0
+
+
+class VenueAutocomplete:
+    """A ``PrefixIndex`` over active venues, loaded from and kept in sync with Postgres."""
+
+    def __init__(self, session_factory: sessionmaker[Session]):
+        self._session_factory = session_factory
+        self.index = PrefixIndex()
+
+    def load(self) -> None:
+        """(Re)build the whole index with one bulk query and swap it in."""
+
+        with self._session_factory() as session:
+            rows = session.execute(_suggestion_query()).all()
+        self.index = PrefixIndex.build(_suggestion(row) for row in rows)
+        logger.info("venue_autocomplete_loaded", venues=len(self.index))
+
+    def subscribe(self, subscriber: EventSubscriber) -> None:
+        subscriber.register("venue.created", self.handle_venue_changed)
+        subscriber.register("venue.updated", self.handle_venue_changed)
+        subscriber.register("venue.deleted", self.handle_venue_deleted)
+        subscriber.register("venue.bulk_upserted", self.handle_venues_bulk_upserted)
+        subscriber.on_resync(self.load)
+
+    def search(self, prefix: str, limit: int) -> list[Suggestion]:
+        return self.index.search(prefix, limit)
+
+    def handle_venue_changed(self, payload: dict[str, Any]) -> None:
+        self._refresh([UUID(payload["id"])])
+
+    def handle_venue_deleted(self, payload: dict[str, Any]) -> None:
+        self.index.remove(UUID(payload["id"]))
+
+    def handle_venues_bulk_upserted(self, payload: dict[str, Any]) -> None:
+        self._refresh([UUID(identifier) for identifier in payload["created"] + payload["updated"]])
+
+    def _refresh(self, venue_ids: list[UUID]) -> None:
+        with self._session_factory() as session:
+            rows = {
+                row.id: row
+                for row in session.execute(
+                    _suggestion_query().where(VenuesModel.id.in_(venue_ids))
+                )
+            }
+        for venue_id in venue_ids:
+            row = rows.get(venue_id)
+            if row is None:
+                self.index.remove(venue_id)
+            else:
+                self.index.upsert(_suggestion(row))
+
+
+def _suggestion_query() -> Any:
+    return select(
+        VenuesModel.id,
+        VenuesModel.name,
+        VenuesModel.city,
+        func.coalesce(VenuesModel.number_of_reviews, 0).label("popularity"),
+    ).where(VenuesModel.is_active.is_(True))
+
+
+def _suggestion(row: Any) -> Suggestion:
+    return Suggestion(id=row.id, name=row.name, city=row.city, popularity=row.popularity)
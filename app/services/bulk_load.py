@@ -0,0 +1,268 @@
+"""Bulk upsert of users and venues.
+
+Each chunk of NDJSON lines is validated in Python, loaded into a temporary staging
+table with ``COPY`` and merged into the target table with a single
+``INSERT ... ON CONFLICT`` statement, so a chunk costs a fixed number of round trips
+regardless of its size.
+"""
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import psycopg
+import structlog
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.schemas.bulk import BulkRowResult
+from app.schemas.users import UsersCreate
+from app.schemas.venues import VenuesCreate
+from app.services import opening_hours
+
+logger = structlog.get_logger(__name__)
+
+NdjsonLine = tuple[int, bytes]
+
+USER_COLUMNS = (
+    "id",
+    "email",
+    "full_name",
+    "oauth_provider",
+    "oauth_provider_id",
+    "points",
+    "avatar_url",
+)
+
+# ``opening_minutes`` is derived from ``opening_hours`` before staging.
+VENUE_COLUMNS = ("id", *VenuesCreate.model_fields, "opening_minutes")
+VENUE_REQUIRED_FIELDS = ("name", "owner_id", "experience_points")
+# Mirrors the Python-side column defaults declared on ``app.models.venues.Venues``, as SQL.
+# Applied only when inserting, so an update that omits the field keeps the stored value.
+VENUE_INSERT_DEFAULTS = {
+    "coordinates": "'POINT(0 0)'",
+    "area": "'POLYGON((0 0,0 0,0 0,0 0))'",
+    "is_active": "true",
+    "photo_url": "''",
+    "tags": "'{}'",
+}
+
+
+@dataclass
+class ChunkOutcome:
+    """Per-row results and affected identifiers for one merged chunk."""
+
+    rows: list[BulkRowResult] = field(default_factory=list)
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+
+
+def upsert_users_chunk(db: Session, lines: Sequence[NdjsonLine]) -> ChunkOutcome:
+    """Validate and merge a chunk of user lines keyed on ``email``.
+
+    Rows whose ``oauth_provider_id`` already belongs to another user are reported as
+    conflicts instead of aborting the chunk. ``points`` are only applied on insert so
+    re-importing a user never resets an accrued balance.
+    """
+
+    outcome = ChunkOutcome()
+    staged = _validate(lines, UsersCreate, outcome, key=lambda user: user.email.lower())
+    oauth_keys: dict[str, int] = {}
+    for key, (line, user) in list(staged.items()):
+        if user.oauth_provider_id in oauth_keys:
+            outcome.rows.append(_error(line, "duplicate_in_batch"))
+            del staged[key]
+            continue
+        oauth_keys[user.oauth_provider_id] = line
+
+    rows = [
+        (
+            uuid.uuid4(),
+            user.email,
+            user.full_name,
+            user.oauth_provider,
+            user.oauth_provider_id,
+            user.points,
+            user.avatar_url,
+        )
+        for _, user in staged.values()
+    ]
+    statements = (
+        "DELETE FROM _bulk_users AS s USING users AS u "
+        "WHERE u.oauth_provider_id = s.oauth_provider_id AND u.email <> s.email "
+        "RETURNING s.email",
+        "INSERT INTO users (id, email, full_name, oauth_provider, oauth_provider_id, points, "
+        "avatar_url, created_at, updated_at) "
+        "SELECT id, email, full_name, oauth_provider, oauth_provider_id, points, avatar_url, "
+        "now(), now() FROM _bulk_users "
+        "ON CONFLICT (email) DO UPDATE SET "
+        "full_name = EXCLUDED.full_name, "
+        "oauth_provider = EXCLUDED.oauth_provider, "
+        "oauth_provider_id = EXCLUDED.oauth_provider_id, "
+        "avatar_url = COALESCE(EXCLUDED.avatar_url, users.avatar_url), "
+        "updated_at = now() "
+        "RETURNING id, email, (xmax = 0) AS inserted",
+    )
+    results = _stage_and_merge(db, "users", "_bulk_users", USER_COLUMNS, rows, statements)
+    if results is None:
+        outcome.rows.extend(_error(line, "database_error") for line, _ in staged.values())
+        return outcome
+
+    conflicts, merged = results
+    for (email,) in conflicts:
+        line, _ = staged.pop(str(email).lower())
+        outcome.rows.append(_error(line, "oauth_provider_id_already_exists"))
+    for identifier, email, inserted in merged:
+        line, _ = staged[str(email).lower()]
+        _record(outcome, line, identifier, inserted)
+    return outcome
+
+
+def upsert_venues_chunk(db: Session, lines: Sequence[NdjsonLine]) -> ChunkOutcome:
+    """Validate and merge a chunk of venue lines keyed on ``name``.
+
+    Fields omitted from a line keep their stored value when the venue already exists.
+    """
+
+    outcome = ChunkOutcome()
+    staged = _validate(lines, VenuesCreate, outcome, key=lambda venue: venue.name)
+    for key, (line, venue) in list(staged.items()):
+        if any(getattr(venue, name) is None for name in VENUE_REQUIRED_FIELDS):
+            outcome.rows.append(_error(line, "missing_required_fields"))
+            del staged[key]
+
+    rows = []
+    for key, (line, venue) in list(staged.items()):
+        values = venue.model_dump()
+        try:
+            values["opening_minutes"] = (
+                None
+                if values["opening_hours"] is None
+                else opening_hours.to_multirange(opening_hours.parse(values["opening_hours"]))
+            )
+        except opening_hours.OpeningHoursError:
+            outcome.rows.append(_error(line, "invalid_opening_hours"))
+            del staged[key]
+            continue
+        rows.append((uuid.uuid4(), *(values[name] for name in VENUE_COLUMNS[1:])))
+
+    # Existing venues are updated from the staged row, so omitted (NULL) fields keep their
+    # stored value; only venues that are new get the column defaults.
+    columns = ", ".join(VENUE_COLUMNS)
+    selected = ", ".join(
+        f"COALESCE(s.{name}, {default})"
+        if (default := VENUE_INSERT_DEFAULTS.get(name))
+        else f"s.{name}"
+        for name in VENUE_COLUMNS
+    )
+    updates = ", ".join(
+        f"{name} = COALESCE(s.{name}, v.{name})"
+        for name in VENUE_COLUMNS
+        if name not in ("id", "name")
+    )
+    assignments = ", ".join(
+        f"{name} = COALESCE(EXCLUDED.{name}, venues.{name})"
+        for name in VENUE_COLUMNS
+        if name not in ("id", "name")
+    )
+    statements = (
+        "WITH updated AS ("
+        f"UPDATE venues AS v SET {updates}, updated_at = now() "
+        "FROM _bulk_venues AS s WHERE v.name = s.name RETURNING v.id, v.name"
+        "), inserted AS ("
+        f"INSERT INTO venues ({columns}, created_at, updated_at) "
+        f"SELECT {selected}, now(), now() FROM _bulk_venues AS s "
+        "WHERE s.name NOT IN (SELECT name FROM updated) "
+        # Only reached when a venue of the same name is created concurrently.
+        f"ON CONFLICT (name) DO UPDATE SET {assignments}, updated_at = now() "
+        "RETURNING id, name, (xmax = 0) AS inserted"
+        ") SELECT id, name, false FROM updated UNION ALL SELECT * FROM inserted",
+    )
+    results = _stage_and_merge(db, "venues", "_bulk_venues", VENUE_COLUMNS, rows, statements)
+    if results is None:
+        outcome.rows.extend(_error(line, "database_error") for line, _ in staged.values())
+        return outcome
+
+    (merged,) = results
+    for identifier, name, inserted in merged:
+        line, _ = staged[name]
+        _record(outcome, line, identifier, inserted)
+    return outcome
+
+
+def _validate[ModelT: BaseModel](
+    lines: Sequence[NdjsonLine],
+    schema: type[ModelT],
+    outcome: ChunkOutcome,
+    *,
+    key: Any,
+) -> dict[Any, tuple[int, ModelT]]:
+    staged: dict[Any, tuple[int, ModelT]] = {}
+    for line, raw in lines:
+        try:
+            item = schema.model_validate_json(raw)
+        except ValidationError:
+            outcome.rows.append(_error(line, "invalid_payload"))
+            continue
+        item_key = key(item)
+        if item_key is None:
+            outcome.rows.append(_error(line, "missing_required_fields"))
+        elif item_key in staged:
+            outcome.rows.append(_error(line, "duplicate_in_batch"))
+        else:
+            staged[item_key] = (line, item)
+    return staged
+
+
+def _stage_and_merge(
+    db: Session,
+    table: str,
+    stage: str,
+    columns: Sequence[str],
+    rows: Sequence[tuple[Any, ...]],
+    statements: Sequence[str],
+) -> list[list[Any]] | None:
+    """COPY ``rows`` into ``stage`` and run ``statements``, returning their rows.
+
+    Returns ``None`` when the database rejects the chunk; the transaction is rolled
+    back so later chunks are unaffected.
+    """
+
+    if not rows:
+        return [[] for _ in statements]
+
+    column_list = ", ".join(columns)
+    try:
+        db.execute(
+            text(
+                f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM {table} WITH NO DATA"
+            )
+        )
+        driver_connection = db.connection().connection.driver_connection
+        with driver_connection.cursor() as cursor:  # type: ignore[union-attr]
+            with cursor.copy(f"COPY {stage} ({column_list}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        results = [list(db.execute(text(statement)).tuples()) for statement in statements]
+        db.commit()
+    except (DBAPIError, psycopg.Error):
+        db.rollback()
+        logger.exception("bulk_chunk_failed", table=table, rows=len(rows))
+        return None
+    return results
+
+
+def _record(outcome: ChunkOutcome, line: int, identifier: uuid.UUID, inserted: bool) -> None:
+    outcome.rows.append(
+        BulkRowResult(line=line, status="created" if inserted else "updated", id=identifier)
+    )
+    (outcome.created if inserted else outcome.updated).append(str(identifier))
+
+
+def _error(line: int, detail: str) -> BulkRowResult:
+    return BulkRowResult(line=line, status="error", error=detail)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+import redis
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+EventHandler = Callable[[dict[str, Any]], None]
+
+
+class EventSubscriber:
+    """Deliver events broadcast by ``TaskQueue`` to in-process handlers.
+
+    One pub/sub connection per process, read on a daemon thread. Pub/sub is
+    fire-and-forget, so after a reconnect the ``on_resync`` callbacks run to let
+    in-memory state catch up on whatever was missed.
+    """
+
+    def __init__(self, url: str, namespace: str = "tasks", reconnect_delay: float = 1.0):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._channel = f"{namespace}:events"
+        self._reconnect_delay = reconnect_delay
+        self._handlers: dict[str, list[EventHandler]] = defaultdict(list)
+        self._resync: list[Callable[[], None]] = []
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, task: str, handler: EventHandler) -> None:
+        """Run ``handler`` with the payload of every ``task`` event."""
+
+        self._handlers[task].append(handler)
+
+    def on_resync(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` after the subscription is re-established."""
+
+        self._resync.append(callback)
+
+    def start(self) -> None:
+        """Start listening on a background thread."""
+
+        self._thread = threading.Thread(target=self._listen, name="event-subscriber", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop listening and close the Redis connection."""
+
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._client.close()
+
+    def dispatch(self, raw: str) -> None:
+        """Invoke every handler for one broadcast message; failures are logged."""
+
+        message = json.loads(raw)
+        task = message["task"]
+        for handler in self._handlers.get(task, []):
+            try:
+                handler(message.get("payload") or {})
+            except Exception:
+                logger.exception("event_handler_failed", task=task, handler=handler.__name__)
+
+    def _listen(self) -> None:
+        missed = False
+        while not self._stopping.is_set():
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self._channel)
+                if missed:
+                    self._run_resync()
+                    missed = False
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.dispatch(message["data"])
+            except redis.RedisError:
+                logger.warning("event_subscriber_disconnected", channel=self._channel)
+                missed = True
+                self._stopping.wait(self._reconnect_delay)
+            finally:
+                pubsub.close()
+
+    def _run_resync(self) -> None:
+        for callback in self._resync:
+            try:
+                callback()
+            except Exception:
+                logger.exception("event_resync_failed", callback=callback.__name__)
@@ -0,0 +1,106 @@
+"""Set-based bulk changes to follow relationships.
+
+Every operation runs as ``UPDATE``/``DELETE ... RETURNING`` over chunks of at most
+``chunk_size`` rows, committing after each chunk so row locks are held only briefly.
+Each chunk yields the affected rows so the caller can emit one event per chunk.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Row, delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Followers
+from app.models.followers import StatusEnum
+
+CHUNK_SIZE = 500
+
+
+def decide_requests(
+    db: Session,
+    followed_id: UUID,
+    decision: StatusEnum,
+    ids: Sequence[UUID] | None = None,
+    *,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[list[UUID]]:
+    """Move ``followed_id``'s pending requests to ``decision``, yielding ids per chunk.
+
+    With ``ids`` only those requests are touched (ids that are not pending requests to
+    ``followed_id`` are ignored); without, every pending request is, oldest id first.
+    """
+
+    pending = (Followers.followed_id == followed_id, Followers.status == StatusEnum.PENDING)
+    if ids is not None:
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            decided = _execute(
+                db,
+                update(Followers)
+                .where(*pending, Followers.id.in_(chunk))
+                .values(status=decision)
+                .returning(Followers.id),
+            )
+            if decided:
+                yield [row.id for row in decided]
+        return
+
+    while True:
+        batch = (
+            select(Followers.id)
+            .where(*pending)
+            .order_by(Followers.id)
+            .limit(chunk_size)
+            .with_for_update()
+        )
+        decided = _execute(
+            db,
+            update(Followers)
+            .where(Followers.id.in_(batch.scalar_subquery()))
+            .values(status=decision)
+            .returning(Followers.id),
+        )
+        if not decided:
+            return
+        yield [row.id for row in decided]
+
+
+def unfollow(
+    db: Session,
+    follower_id: UUID,
+    followed_ids: Sequence[UUID],
+    *,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[list[dict[str, str]]]:
+    """Delete ``follower_id``'s relationships to ``followed_ids``, whatever their status.
+
+    Yields ``follow.deleted``-shaped payloads for each chunk, since the rows are gone by
+    the time consumers see them.
+    """
+
+    for start in range(0, len(followed_ids), chunk_size):
+        chunk = followed_ids[start : start + chunk_size]
+        removed = _execute(
+            db,
+            delete(Followers)
+            .where(Followers.follower_id == follower_id, Followers.followed_id.in_(chunk))
+            .returning(Followers.id, Followers.follower_id, Followers.followed_id),
+        )
+        if removed:
+            yield [
+                {
+                    "id": str(row.id),
+                    "follower_id": str(row.follower_id),
+                    "followed_id": str(row.followed_id),
+                }
+                for row in removed
+            ]
+
+
+def _execute(db: Session, stmt: Any) -> Sequence[Row[Any]]:
+    rows = db.execute(stmt, execution_options={"synchronize_session": False}).all()
+    db.commit()
+    return rows
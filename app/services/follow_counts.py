@@ -0,0 +1,67 @@
+"""Repair drift in the denormalised follower counters on ``users``.
+
+The counters are kept current by the ``followers_maintain_counts`` trigger; this job
+exists for rows touched while the trigger was disabled (restores, manual fixes).
+"""
+from __future__ import annotations
+
+from typing import Any, cast
+from uuid import UUID
+
+import structlog
+from sqlalchemy import CursorResult, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Users
+
+logger = structlog.get_logger(__name__)
+
+_REPAIR_SQL = text(
+    """
+    UPDATE users AS u SET
+        followers_count = actual.followers_count,
+        following_count = actual.following_count,
+        pending_requests_count = actual.pending_requests_count
+    FROM (
+        SELECT
+            b.id,
+            (SELECT count(*) FROM followers AS f
+                WHERE f.followed_id = b.id AND f.status = 'ACCEPTED') AS followers_count,
+            (SELECT count(*) FROM followers AS f
+                WHERE f.follower_id = b.id AND f.status = 'ACCEPTED') AS following_count,
+            (SELECT count(*) FROM followers AS f
+                WHERE f.followed_id = b.id AND f.status = 'PENDING') AS pending_requests_count
+        FROM unnest(CAST(:ids AS uuid[])) AS b(id)
+    ) AS actual
+    WHERE u.id = actual.id
+        AND (u.followers_count, u.following_count, u.pending_requests_count)
+            IS DISTINCT FROM
+            (actual.followers_count, actual.following_count, actual.pending_requests_count)
+    """
+)
+
+
+def reconcile_follow_counts(db: Session, *, batch_size: int = 1000) -> int:
+    """Recompute counters in primary-key order, one short transaction per batch.
+
+    Each batch locks its user rows first so concurrent trigger increments queue behind
+    the repair instead of being overwritten by it. Returns the number of rows fixed.
+    """
+
+    repaired = 0
+    last_id: UUID | None = None
+    while True:
+        stmt = select(Users.id).order_by(Users.id).limit(batch_size).with_for_update()
+        if last_id is not None:
+            stmt = stmt.where(Users.id > last_id)
+        ids = list(db.execute(stmt).scalars())
+        if not ids:
+            break
+
+        result = db.execute(_REPAIR_SQL, {"ids": ids})
+        db.commit()
+        repaired += cast(CursorResult[Any], result).rowcount
+        last_id = ids[-1]
+
+    logger.info("follow_counts_reconciled", repaired=repaired)
+    return repaired
@@ -0,0 +1,238 @@
+"""Projection of accepted follow relationships into an Apache AGE graph.
+
+``(:User {id})-[:FOLLOWS]->(:User {id})`` mirrors every ``ACCEPTED`` row of ``followers``.
+The projection is maintained incrementally by the worker from ``follow.*`` and
+``user.deleted`` events and can be rebuilt from Postgres with
+``scripts/sync_follow_graph.py``. Multi-hop reads (friend-of-friend suggestions,
+degrees of separation) are served from it as Cypher queries; degrees of separation walk
+it breadth-first, one hop per query.
+"""
+from __future__ import annotations
+
+import json
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Followers
+from app.models.followers import StatusEnum
+
+logger = structlog.get_logger(__name__)
+
+GRAPH_NAME = "social"
+
+
+def cypher(db: Session, query: str, columns: Sequence[str] = ("v",)) -> list[tuple[Any, ...]]:
+    """Run a Cypher query against the graph and return its rows decoded from agtype.
+
+    Interpolated values must already be validated (the callers only embed ``UUID``s and
+    integers); Cypher text cannot be bound as a regular query parameter.
+    """
+
+    connection = db.connection()
+    connection.exec_driver_sql("LOAD 'age'")
+    column_list = ", ".join(f"{name} ag_catalog.agtype" for name in columns)
+    result = connection.exec_driver_sql(
+        f"SELECT * FROM ag_catalog.cypher('{GRAPH_NAME}', $$ {query} $$) AS ({column_list})"
+    )
+    return [tuple(_decode(value) for value in row) for row in result]
+
+
+def merge_follow_edge(db: Session, follower_id: UUID, followed_id: UUID) -> None:
+    cypher(
+        db,
+        f"MERGE (a:User {{id: '{UUID(str(follower_id))}'}}) "
+        f"MERGE (b:User {{id: '{UUID(str(followed_id))}'}}) "
+        "MERGE (a)-[:FOLLOWS]->(b)",
+    )
+
+
+def remove_follow_edge(db: Session, follower_id: UUID, followed_id: UUID) -> None:
+    cypher(
+        db,
+        f"MATCH (:User {{id: '{UUID(str(follower_id))}'}})"
+        f"-[e:FOLLOWS]->(:User {{id: '{UUID(str(followed_id))}'}}) DELETE e",
+    )
+
+
+def remove_user(db: Session, user_id: UUID) -> None:
+    cypher(db, f"MATCH (u:User {{id: '{UUID(str(user_id))}'}}) DETACH DELETE u")
+
+
+def handle_follow_changed(db: Session, payload: dict[str, Any]) -> None:
+    """Worker handler for ``follow.created`` / ``follow.updated``."""
+
+    relationship = db.execute(
+        select(Followers).where(Followers.id == UUID(payload["id"]))
+    ).scalar_one_or_none()
+    if relationship is None:
+        # Deleted before we got here; the matching follow.deleted event removes the edge.
+        return
+    if relationship.status == StatusEnum.ACCEPTED:
+        merge_follow_edge(db, relationship.follower_id, relationship.followed_id)
+    else:
+        remove_follow_edge(db, relationship.follower_id, relationship.followed_id)
+
+
+def handle_follow_deleted(db: Session, payload: dict[str, Any]) -> None:
+    """Worker handler for ``follow.deleted``."""
+
+    remove_follow_edge(db, UUID(payload["follower_id"]), UUID(payload["followed_id"]))
+
+
+def handle_follows_bulk_updated(db: Session, payload: dict[str, Any]) -> None:
+    """Worker handler for ``follow.bulk_updated``."""
+
+    rows = db.execute(
+        select(Followers.follower_id, Followers.followed_id, Followers.status).where(
+            Followers.id.in_([UUID(identifier) for identifier in payload["ids"]])
+        )
+    ).all()
+    _merge_edges(
+        db,
+        [(row.follower_id, row.followed_id) for row in rows if row.status == StatusEnum.ACCEPTED],
+    )
+    _remove_edges(
+        db,
+        [(row.follower_id, row.followed_id) for row in rows if row.status != StatusEnum.ACCEPTED],
+    )
+
+
+def handle_follows_bulk_deleted(db: Session, payload: dict[str, Any]) -> None:
+    """Worker handler for ``follow.bulk_deleted``."""
+
+    _remove_edges(
+        db,
+        [
+            (UUID(relationship["follower_id"]), UUID(relationship["followed_id"]))
+            for relationship in payload["relationships"]
+        ],
+    )
+
+
+def handle_user_deleted(db: Session, payload: dict[str, Any]) -> None:
+    """Worker handler for ``user.deleted``; cascaded follows go with the vertex."""
+
+    remove_user(db, UUID(payload["id"]))
+
+
+def suggest_follows(db: Session, user_id: UUID, *, limit: int) -> list[tuple[UUID, int]]:
+    """Return friends-of-friends not yet followed, ranked by mutual connections."""
+
+    me = UUID(str(user_id))
+    rows = cypher(
+        db,
+        f"MATCH (me:User {{id: '{me}'}})-[:FOLLOWS]->(:User)-[:FOLLOWS]->(s:User) "
+        f"WHERE s.id <> '{me}' AND NOT EXISTS((me)-[:FOLLOWS]->(s)) "
+        f"RETURN s.id, count(*) AS mutual ORDER BY mutual DESC, s.id LIMIT {int(limit)}",
+        columns=("id", "mutual"),
+    )
+    return [(UUID(identifier), int(mutual)) for identifier, mutual in rows]
+
+
+def degrees_of_separation(
+    db: Session, source_id: UUID, target_id: UUID, *, max_depth: int
+) -> int | None:
+    """Return the length of the shortest follow chain from source to target, if any.
+
+    A breadth-first search expands one hop per query from the frontier of users not
+    reached before, so each user is visited once instead of once per path to them.
+    """
+
+    source, target = UUID(str(source_id)), UUID(str(target_id))
+    if source == target:
+        return 0
+    reached = {source}
+    frontier = [source]
+    for depth in range(1, int(max_depth) + 1):
+        rows = cypher(
+            db,
+            f"UNWIND [{_id_list(frontier)}] AS user_id "
+            "MATCH (:User {id: user_id})-[:FOLLOWS]->(n:User) RETURN DISTINCT n.id",
+        )
+        found = {UUID(identifier) for (identifier,) in rows}
+        if target in found:
+            return depth
+        frontier = sorted(found - reached)
+        if not frontier:
+            return None
+        reached.update(frontier)
+    return None
+
+
+def rebuild(db: Session, *, batch_size: int = 1000) -> int:
+    """Project every accepted relationship into the graph, returning the edge count.
+
+    Edges are merged, so the rebuild is safe to run against a live projection; stale
+    edges are only dropped when ``clear`` has been run first.
+    """
+
+    merged = 0
+    last_id: UUID | None = None
+    while True:
+        stmt = (
+            select(Followers.id, Followers.follower_id, Followers.followed_id)
+            .where(Followers.status == StatusEnum.ACCEPTED)
+            .order_by(Followers.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(Followers.id > last_id)
+        batch = db.execute(stmt).all()
+        if not batch:
+            break
+
+        _merge_edges(db, [(row.follower_id, row.followed_id) for row in batch])
+        db.commit()
+        merged += len(batch)
+        last_id = batch[-1].id
+
+    logger.info("follow_graph_rebuilt", edges=merged)
+    return merged
+
+
+def clear(db: Session) -> None:
+    """Remove every vertex and edge from the projection."""
+
+    cypher(db, "MATCH (u:User) DETACH DELETE u")
+    db.commit()
+
+
+def _merge_edges(db: Session, edges: Sequence[tuple[UUID, UUID]]) -> None:
+    if edges:
+        cypher(
+            db,
+            f"UNWIND [{_edge_list(edges)}] AS edge "
+            "MERGE (a:User {id: edge[0]}) "
+            "MERGE (b:User {id: edge[1]}) "
+            "MERGE (a)-[:FOLLOWS]->(b)",
+        )
+
+
+def _remove_edges(db: Session, edges: Sequence[tuple[UUID, UUID]]) -> None:
+    if edges:
+        cypher(
+            db,
+            f"UNWIND [{_edge_list(edges)}] AS edge "
+            "MATCH (:User {id: edge[0]})-[e:FOLLOWS]->(:User {id: edge[1]}) DELETE e",
+        )
+
+
+def _edge_list(edges: Sequence[tuple[UUID, UUID]]) -> str:
+    return ", ".join(
+        f"['{UUID(str(follower_id))}', '{UUID(str(followed_id))}']"
+        for follower_id, followed_id in edges
+    )
+
+
+def _id_list(user_ids: Sequence[UUID]) -> str:
+    return ", ".join(f"'{UUID(str(user_id))}'" for user_id in user_ids)
+
+
+def _decode(value: Any) -> Any:
+    # agtype scalars render as JSON text, e.g. ``"5f0c..."`` or ``3``.
+    return json.loads(value) if isinstance(value, str) else value
@@ -0,0 +1,207 @@
+"""Write-behind buffer for footsteps, on a Redis stream.
+
+With ``FOOTSTEPS_WRITE_BEHIND`` on, ``POST /footsteps:batch`` validates the pings and
+appends them to the ``footsteps:buffer`` stream as a single entry. It answers 202
+without touching Postgres, so API latency stays flat while the database is saturated.
+Every ping gets its footsteps id and (if missing) its timestamp at that moment.
+
+The drainer (``make footsteps-drainer``) reads entries through the ``drainers`` consumer
+group and writes them with ``footsteps_ingest.ingest_copied``: one ``COPY`` and one
+transaction per batch. The batch's ``venue.visited`` event is queued next, and only
+then are the entries acknowledged and deleted. A drainer that dies before the ack leaves
+its entries pending; they are redelivered to it on restart, or claimed by another
+drainer once idle for ``CLAIM_IDLE_MS``. Because ids were fixed at append time, pings
+of a redelivered entry that were already written are not inserted again but replay
+their visits, so the event is never lost (visit awards and occupancy are idempotent).
+The rest of the batch is written as usual: claimed batches can mix entries of several
+drainers, written or not.
+
+An entry delivered more than ``MAX_DELIVERIES`` times is taken to be poison: it is moved
+to the ``footsteps:buffer:dead`` stream for inspection instead of blocking the drainer.
+
+``stats`` reports the buffer depth (entries and pings) and the age of the oldest
+unwritten entry, which the drainer holds under ``FOOTSTEPS_BUFFER_MAX_LAG``.
+"""
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+import redis
+import structlog
+
+from app.schemas import FootstepsCreate
+
+logger = structlog.get_logger(__name__)
+
+GROUP = "drainers"
+# Pending entries idle this long are taken over from a drainer presumed dead.
+CLAIM_IDLE_MS = 60_000
+# Pending entries delivered more often than this are dead-lettered.
+MAX_DELIVERIES = 5
+
+Row = tuple[UUID, UUID, str, datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class BufferStats:
+    entries: int
+    pings: int
+    lag_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class BufferBatch:
+    entry_ids: list[str]
+    rows: list[Row]
+
+
+class FootstepsBuffer:
+    """Append validated footsteps to a Redis stream and hand them to drainers."""
+
+    def __init__(self, url: str, namespace: str = "footsteps:buffer"):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._stream = namespace
+        self._pings = f"{namespace}:pings"
+        self._dead = f"{namespace}:dead"
+        self._grouped = False
+
+    def append(self, footsteps: Sequence[FootstepsCreate]) -> int:
+        """Buffer a batch of pings as one stream entry; returns how many were buffered."""
+
+        now = datetime.now(timezone.utc)
+        rows = [
+            [
+                str(uuid.uuid4()),
+                str(footstep.user_id),
+                footstep.coordinates,
+                (footstep.created_at or now).isoformat(),
+            ]
+            for footstep in footsteps
+        ]
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.xadd(self._stream, {"rows": json.dumps(rows)})
+            pipe.incrby(self._pings, len(rows))
+            pipe.execute()
+        return len(rows)
+
+    def read(self, consumer: str, count: int, block_ms: int = 1000) -> BufferBatch:
+        """Up to ``count`` entries for ``consumer``: its own pending ones first, then new ones.
+
+        Entries stay pending until ``ack``.
+        """
+
+        self._ensure_group()
+        entries = self._pending(consumer, count)
+        if not entries:
+            found = self._client.xreadgroup(
+                GROUP, consumer, {self._stream: ">"}, count=count, block=block_ms
+            )
+            entries = found[0][1] if found else []
+
+        batch = BufferBatch(entry_ids=[], rows=[])
+        for entry_id, fields in entries:
+            batch.entry_ids.append(entry_id)
+            for identifier, user_id, coordinates, created_at in json.loads(fields["rows"]):
+                batch.rows.append(
+                    (
+                        UUID(identifier),
+                        UUID(user_id),
+                        coordinates,
+                        _aware(datetime.fromisoformat(created_at)),
+                    )
+                )
+        return batch
+
+    def ack(self, batch: BufferBatch) -> None:
+        """Mark a written batch done and drop its entries from the stream."""
+
+        if not batch.entry_ids:
+            return
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.xack(self._stream, GROUP, *batch.entry_ids)
+            pipe.xdel(self._stream, *batch.entry_ids)
+            pipe.decrby(self._pings, len(batch.rows))
+            pipe.execute()
+
+    def stats(self) -> BufferStats:
+        """Entries and pings waiting, and how long the oldest has waited."""
+
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.xlen(self._stream)
+            pipe.get(self._pings)
+            pipe.xrange(self._stream, count=1)
+            entries, pings, oldest = pipe.execute()
+        lag = 0.0
+        if oldest:
+            appended_ms = int(oldest[0][0].split("-")[0])
+            lag = max(0.0, time.time() - appended_ms / 1000)
+        return BufferStats(entries=entries, pings=max(0, int(pings or 0)), lag_seconds=lag)
+
+    def close(self) -> None:
+        """Close the underlying Redis connection."""
+
+        if self._client:
+            self._client.close()
+
+    def _ensure_group(self) -> None:
+        if self._grouped:
+            return
+        try:
+            self._client.xgroup_create(self._stream, GROUP, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._grouped = True
+
+    def _pending(self, consumer: str, count: int) -> list[tuple[str, dict[str, str]]]:
+        own = self._client.xreadgroup(GROUP, consumer, {self._stream: "0"}, count=count)
+        entries = [entry for entry in (own[0][1] if own else []) if entry[1]]
+        if not entries:
+            _, claimed, *_ = self._client.xautoclaim(
+                self._stream, GROUP, consumer, CLAIM_IDLE_MS, count=count
+            )
+            entries = [entry for entry in claimed if entry[1]]
+        return self._dead_letter(consumer, entries)
+
+    def _dead_letter(
+        self, consumer: str, entries: list[tuple[str, dict[str, str]]]
+    ) -> list[tuple[str, dict[str, str]]]:
+        """Move entries delivered more than ``MAX_DELIVERIES`` times aside; return the rest."""
+
+        if not entries:
+            return entries
+        pending = self._client.xpending_range(
+            self._stream,
+            GROUP,
+            min=entries[0][0],
+            max=entries[-1][0],
+            count=len(entries),
+            consumername=consumer,
+        )
+        poison = {
+            info["message_id"] for info in pending if info["times_delivered"] > MAX_DELIVERIES
+        }
+        if not poison:
+            return entries
+
+        dead = [(entry_id, fields) for entry_id, fields in entries if entry_id in poison]
+        pings = sum(len(json.loads(fields["rows"])) for _, fields in dead)
+        with self._client.pipeline(transaction=True) as pipe:
+            for entry_id, fields in dead:
+                pipe.xadd(self._dead, {**fields, "entry_id": entry_id})
+            pipe.xack(self._stream, GROUP, *poison)
+            pipe.xdel(self._stream, *poison)
+            pipe.decrby(self._pings, pings)
+            pipe.execute()
+        logger.warning("footsteps_dead_lettered", entries=len(dead), pings=pings)
+        return [entry for entry in entries if entry[0] not in poison]
+
+
+def _aware(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
@@ -0,0 +1,231 @@
+"""Footsteps ingestion pipeline.
+
+A batch of pings goes through each stage in one transaction. It is first thinned per
+user (``trajectory.thin``), dropping near-duplicate pings and points along straight
+stretches, and the compression ratio is logged as ``footsteps_thinned``. The remaining
+rows are bulk-inserted into ``footsteps``, the geofence stage matches them against venue
+areas and records visits, and each user's newest point replaces their ``userlocations``
+row. After the commit, the users whose location moved are mirrored into Redis presence.
+Every stage works on the whole batch with a fixed number of statements, so cost grows
+with batches rather than with points.
+
+``ingest_copied`` is the write-behind variant used by the buffer drainer. Rows arrive
+with ids fixed when they were buffered and are loaded with ``COPY``, and pings of users
+deleted since are skipped. Rows whose ids are already stored were delivered before:
+they are not inserted again, but go through the visit stage with the new rows, so that
+the drainer can re-send a ``venue.visited`` event it may have lost. A claimed batch can
+mix entries that were written by a drainer that died before acking with entries that
+never were, so this is decided row by row. Pings that the earlier write thinned away
+are thinned again, against the user's newer stored location, and may be kept this time.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import redis
+import structlog
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models import Footsteps
+from app.schemas import FootstepsCreate
+from app.services import geofence, geometry, presence, trajectory
+
+logger = structlog.get_logger(__name__)
+
+_INSERT_COPIED_SQL = text(
+    """
+    INSERT INTO footsteps (id, user_id, coordinates, created_at)
+    SELECT s.id, s.user_id, s.coordinates, s.created_at
+    FROM footsteps_stage AS s
+    JOIN users AS u ON u.id = s.user_id
+    ON CONFLICT (id) DO NOTHING
+    RETURNING user_id, coordinates, created_at
+    """
+)
+_STORED_SQL = text(
+    """
+    SELECT id, user_id, coordinates, created_at
+    FROM footsteps
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+    ORDER BY created_at
+    """
+)
+
+
+@dataclass
+class IngestResult:
+    inserted: int = 0
+    visits: list[dict[str, Any]] = field(default_factory=list)
+
+
+def ingest(
+    db: Session,
+    footsteps: Sequence[FootstepsCreate],
+    fences: geofence.VenueFences,
+    locations: presence.Presence | None = None,
+) -> IngestResult:
+    """Store a batch of footsteps and the visits they produce, then commit.
+
+    A Redis failure while mirroring ``locations`` is logged rather than raised; the
+    positions catch up with the user's next batch.
+    """
+
+    result = IngestResult()
+    if not footsteps:
+        return result
+
+    now = datetime.now(timezone.utc)
+    user_ids = [footstep.user_id for footstep in footsteps]
+    coordinates = [footstep.coordinates for footstep in footsteps]
+    times = [_aware(footstep.created_at) if footstep.created_at else now for footstep in footsteps]
+    keep = _thin(db, user_ids, coordinates, times)
+    user_ids = [user_id for user_id, kept in zip(user_ids, keep, strict=True) if kept]
+    coordinates = [point for point, kept in zip(coordinates, keep, strict=True) if kept]
+    times = [moment for moment, kept in zip(times, keep, strict=True) if kept]
+    db.execute(
+        insert(Footsteps),
+        [
+            {"user_id": user_id, "coordinates": point, "created_at": moment}
+            for user_id, point, moment in zip(user_ids, coordinates, times, strict=True)
+        ],
+    )
+    result.inserted = len(user_ids)
+    _record_stages(db, result, user_ids, coordinates, times, fences, locations)
+    return result
+
+
+def ingest_copied(
+    db: Session,
+    rows: Sequence[tuple[UUID, UUID, str, datetime]],
+    fences: geofence.VenueFences,
+    locations: presence.Presence | None = None,
+) -> IngestResult:
+    """Store buffered ``(id, user_id, coordinates, created_at)`` rows, then commit.
+
+    Rows are thinned like in ``ingest``. The rows actually inserted, plus any that were
+    already stored, go on to the visit and location stages.
+    """
+
+    result = IngestResult()
+    if not rows:
+        return result
+
+    stored = db.execute(_STORED_SQL, {"ids": [row[0] for row in rows]}).all()
+    stored_ids = {row.id for row in stored}
+    rows = [row for row in rows if row[0] not in stored_ids]
+    inserted: list[Any] = []
+    if rows:
+        keep = _thin(
+            db, [row[1] for row in rows], [row[2] for row in rows], [row[3] for row in rows]
+        )
+        rows = [row for row, kept in zip(rows, keep, strict=True) if kept]
+        db.execute(
+            text(
+                "CREATE TEMP TABLE footsteps_stage "
+                "(id uuid, user_id uuid, coordinates varchar, created_at timestamptz) "
+                "ON COMMIT DROP"
+            )
+        )
+        driver_connection = db.connection().connection.driver_connection
+        with driver_connection.cursor() as cursor:  # type: ignore[union-attr]
+            with cursor.copy(
+                "COPY footsteps_stage (id, user_id, coordinates, created_at) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        inserted = list(db.execute(_INSERT_COPIED_SQL).all())
+    result.inserted = len(inserted)
+    written = [*stored, *inserted]
+    _record_stages(
+        db,
+        result,
+        [row.user_id for row in written],
+        [row.coordinates for row in written],
+        [row.created_at for row in written],
+        fences,
+        locations,
+    )
+    return result
+
+
+def _thin(
+    db: Session, user_ids: list[UUID], coordinates: list[str], times: list[datetime]
+) -> list[bool]:
+    settings = get_settings()
+    if not settings.footsteps_thin_seconds and not settings.footsteps_simplify_metres:
+        return [True] * len(user_ids)
+
+    points = np.array([geometry.parse_point(value) for value in coordinates], dtype=np.float64)
+    anchors = {
+        user_id: (*geometry.parse_point(stored), recorded_at.timestamp())
+        for user_id, (stored, recorded_at) in presence.stored_latest(db, user_ids).items()
+    }
+    keep = trajectory.thin(
+        user_ids,
+        points[:, 0],
+        points[:, 1],
+        np.array([moment.timestamp() for moment in times], dtype=np.float64),
+        anchors,
+        min_distance=settings.footsteps_thin_metres,
+        min_interval=settings.footsteps_thin_seconds,
+        tolerance=settings.footsteps_simplify_metres,
+    )
+    kept = int(np.count_nonzero(keep))
+    logger.info(
+        "footsteps_thinned",
+        received=len(user_ids),
+        kept=kept,
+        compression_ratio=round(len(user_ids) / max(kept, 1), 2),
+    )
+    flags: list[bool] = keep.tolist()
+    return flags
+
+
+def _record_stages(
+    db: Session,
+    result: IngestResult,
+    user_ids: list[UUID],
+    coordinates: list[str],
+    times: list[datetime],
+    fences: geofence.VenueFences,
+    locations: presence.Presence | None,
+) -> None:
+    if not user_ids:
+        db.commit()
+        return
+
+    points = np.array([geometry.parse_point(value) for value in coordinates], dtype=np.float64)
+    result.visits = geofence.record_visits(
+        db,
+        fences,
+        user_ids,
+        points[:, 0],
+        points[:, 1],
+        times,
+        gap=timedelta(seconds=get_settings().visit_gap_seconds),
+    )
+    moved = presence.upsert_latest(db, user_ids, coordinates, times)
+    db.commit()
+
+    if locations is not None and moved:
+        position = {
+            (user_id, moment): (float(x), float(y))
+            for user_id, moment, (x, y) in zip(user_ids, times, points, strict=True)
+        }
+        try:
+            locations.update(
+                [(user_id, *position[(user_id, moment)], moment) for user_id, moment in moved]
+            )
+        except redis.RedisError:
+            logger.warning("presence_update_failed", users=len(moved))
+
+
+def _aware(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
@@ -0,0 +1,288 @@
+"""Streamed footsteps, micro-batched across every connection of an API process.
+
+Devices with continuous tracking keep a WebSocket open and send numbered pings. Instead
+of paying a request per ping, each process buffers the pings of all its streams and
+flushes them through the regular ingest pipeline (``footsteps_ingest.ingest``). A flush
+happens as soon as ``max_batch`` pings are waiting, or ``flush_interval`` seconds after
+the first one arrived. One flush is one bulk insert and one transaction.
+
+Once a flush commits, every stream in it is acknowledged with the highest ``seq`` it got
+written. That number is also stored in Redis under
+``footsteps:acks:<user_id>:<stream>`` for a day, so a device that reconnects learns
+where to resume. Pings at or below it are ignored as resends. If a flush fails, its
+streams are closed without an ack, and their clients resend from the last acknowledged
+ping. Once the rows are committed they are acknowledged whatever happens next: a failure
+to queue ``venue.visited`` or to store the acks in Redis is only logged, since failing
+the streams would make their clients resend pings that are already stored. Acks Redis
+did not take are kept in memory, served to reconnecting streams and retried with the
+next flush. A flush loop that dies on an unexpected error is logged and restarted.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Protocol
+from uuid import UUID
+
+import redis
+import structlog
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.models import Users
+from app.schemas import FootstepsCreate, FootstepsStreamPing
+from app.services import footsteps_ingest, geofence, presence
+from app.services.task_queue import TaskQueue
+
+logger = structlog.get_logger(__name__)
+
+ACK_TTL = int(timedelta(days=1).total_seconds())
+# WebSocket close code sent to streams whose pings could not be written.
+CLOSE_WRITE_FAILED = 1011
+
+Pending = tuple["StreamSession", FootstepsCreate, int]
+
+
+class Channel(Protocol):
+    """The parts of a WebSocket the batcher talks to."""
+
+    async def send_json(self, data: Any, mode: str = "text") -> None: ...
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None: ...
+
+
+class StreamSession:
+    """One connected device stream and the highest ``seq`` accepted from it."""
+
+    __slots__ = ("channel", "closed", "failed", "key", "received", "user_id")
+
+    def __init__(self, user_id: UUID, key: str, acked: int, channel: Channel):
+        self.user_id = user_id
+        self.key = key
+        self.received = acked
+        self.channel = channel
+        self.closed = False
+        self.failed = False
+
+
+class FootstepsBatcher:
+    """Buffer pings from every stream of the process and write them in shared batches."""
+
+    def __init__(
+        self,
+        url: str,
+        session_factory: sessionmaker[Session],
+        fences: geofence.VenueFences,
+        queue: TaskQueue,
+        locations: presence.Presence | None = None,
+        *,
+        max_batch: int = 500,
+        flush_interval: float = 0.25,
+    ):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._session_factory = session_factory
+        self._fences = fences
+        self._queue = queue
+        self._locations = locations
+        self._max_batch = max(1, max_batch)
+        self._flush_interval = flush_interval
+        self._buffer: list[Pending] = []
+        # Acks written to Postgres but not yet stored in Redis, by stream key.
+        self._unsaved: dict[str, int] = {}
+        # Pings per stream key that are buffered or being written.
+        self._unwritten: Counter[str] = Counter()
+        self._ready = asyncio.Event()
+        self._full = asyncio.Event()
+        self._flushed = asyncio.Condition()
+        self._task: asyncio.Task[None] | None = None
+
+    async def open(self, user_id: UUID, stream: str, channel: Channel) -> StreamSession | None:
+        """Register a stream, or return ``None`` when the user does not exist.
+
+        Waits for any pings a previous connection of the same stream still has in flight,
+        so the returned ``received`` is the true resume point.
+        """
+
+        self._ensure_running()
+        key = f"footsteps:acks:{user_id}:{stream}"
+        async with self._flushed:
+            await self._flushed.wait_for(lambda: not self._unwritten[key])
+        acked = await run_in_threadpool(self._resume_point, user_id, key)
+        if acked is None:
+            return None
+        return StreamSession(user_id, key, acked, channel)
+
+    async def submit(self, session: StreamSession, ping: FootstepsStreamPing) -> None:
+        """Buffer a ping unless it was already received; waits while the buffer is full."""
+
+        if session.failed or ping.seq <= session.received:
+            return
+        self._ensure_running()
+        while len(self._buffer) >= 10 * self._max_batch:
+            async with self._flushed:
+                await self._flushed.wait()
+        session.received = ping.seq
+        footstep = FootstepsCreate.model_construct(
+            user_id=session.user_id, coordinates=ping.coordinates, created_at=ping.created_at
+        )
+        self._buffer.append((session, footstep, ping.seq))
+        self._unwritten[session.key] += 1
+        self._ready.set()
+        if len(self._buffer) >= self._max_batch:
+            self._full.set()
+
+    def close(self, session: StreamSession) -> None:
+        """Stop acknowledging a stream whose socket is gone; its buffered pings are kept."""
+
+        session.closed = True
+
+    async def flush(self) -> None:
+        """Write up to ``max_batch`` buffered pings and acknowledge their streams."""
+
+        batch = self._buffer[: self._max_batch]
+        del self._buffer[: self._max_batch]
+        if len(self._buffer) < self._max_batch:
+            self._full.clear()
+        if not self._buffer:
+            self._ready.clear()
+        if not batch:
+            return
+
+        try:
+            failed = await run_in_threadpool(self._write, batch)
+        except Exception:
+            logger.exception("footsteps_stream_flush_failed", pings=len(batch))
+            failed = {session for session, _, _ in batch}
+
+        acks: dict[StreamSession, int] = {}
+        for session, _, seq in batch:
+            self._unwritten[session.key] -= 1
+            if session in failed:
+                session.failed = True
+            elif not session.failed:
+                acks[session] = max(seq, acks.get(session, 0))
+        self._unwritten += Counter()
+        async with self._flushed:
+            self._flushed.notify_all()
+
+        for session, seq in acks.items():
+            await self._notify(session, {"ack": seq})
+        for session in failed:
+            await self._notify(session, {"error": "write_failed"}, close=True)
+
+    async def stop(self) -> None:
+        """Stop the flush loop after writing whatever is still buffered."""
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._buffer:
+            await self.flush()
+        self._client.close()
+        self._queue.close()
+        if self._locations is not None:
+            self._locations.close()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(self._restart)
+
+    def _restart(self, task: asyncio.Task[None]) -> None:
+        # Without the flush loop the buffer never drains and full-buffer waiters hang.
+        if task is not self._task or task.cancelled():
+            return
+        logger.error("footsteps_stream_flusher_died", exc_info=task.exception())
+        self._ensure_running()
+
+    async def _run(self) -> None:
+        while True:
+            await self._ready.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self._flush_interval)
+            except TimeoutError:
+                pass
+            await self.flush()
+
+    async def _notify(
+        self, session: StreamSession, message: dict[str, Any], close: bool = False
+    ) -> None:
+        if session.closed:
+            return
+        try:
+            await session.channel.send_json(message)
+            if close:
+                session.closed = True
+                await session.channel.close(CLOSE_WRITE_FAILED, message["error"])
+        except Exception:
+            session.closed = True
+
+    def _resume_point(self, user_id: UUID, key: str) -> int | None:
+        with self._session_factory() as db:
+            if db.execute(select(Users.id).where(Users.id == user_id)).first() is None:
+                return None
+        return max(int(self._client.get(key) or 0), self._unsaved.get(key, 0))
+
+    def _write(self, batch: list[Pending]) -> set[StreamSession]:
+        live = [item for item in batch if not item[0].failed]
+        groups: dict[StreamSession, list[FootstepsCreate]] = {}
+        for session, footstep, _ in live:
+            groups.setdefault(session, []).append(footstep)
+
+        failed: set[StreamSession] = set()
+        visits: list[dict[str, Any]] = []
+        with self._session_factory() as db:
+            try:
+                result = footsteps_ingest.ingest(
+                    db, [footstep for _, footstep, _ in live], self._fences, self._locations
+                )
+                visits = result.visits
+            except IntegrityError:
+                # A user was deleted mid-stream; write everyone else's pings on their own.
+                db.rollback()
+                for session, footsteps in groups.items():
+                    try:
+                        result = footsteps_ingest.ingest(
+                            db, footsteps, self._fences, self._locations
+                        )
+                        visits.extend(result.visits)
+                    except IntegrityError:
+                        db.rollback()
+                        failed.add(session)
+
+        # The rows are committed: from here on nothing may fail the streams.
+        if visits:
+            try:
+                self._queue.enqueue("venue.visited", {"visits": visits})
+            except redis.RedisError:
+                logger.exception("footsteps_stream_event_failed", visits=len(visits))
+        self._save_acks({session.key: seq for session, _, seq in live if session not in failed})
+        logger.info(
+            "footsteps_stream_flushed",
+            pings=len(live),
+            streams=len(groups),
+            failed=len(failed),
+            visits=len(visits),
+        )
+        return failed
+
+    def _save_acks(self, acks: dict[str, int]) -> None:
+        self._unsaved.update(acks)
+        if not self._unsaved:
+            return
+        try:
+            with self._client.pipeline(transaction=False) as pipe:
+                for key, seq in self._unsaved.items():
+                    pipe.set(key, seq, ex=ACK_TTL)
+                pipe.execute()
+        except redis.RedisError:
+            logger.warning("footsteps_stream_acks_unsaved", streams=len(self._unsaved))
+            return
+        self._unsaved.clear()
@@ -0,0 +1,381 @@
+"""Match footsteps to venue ``area`` polygons and record visits.
+
+Each API process keeps every venue polygon in memory (``FenceIndex``), simplified with
+Douglas-Peucker and bucketed by bounding box on a coarse grid. A footsteps batch is
+matched in one pass: points are grouped by grid cell, checked against the bounding
+boxes of the venues in that cell, and only the survivors get a vectorised
+point-in-polygon test. Nothing is queried per point.
+
+``record_visits`` turns the matches into visits with one statement per batch: a
+user's run of footsteps inside one venue becomes a segment, and segments within
+``VISIT_GAP_SECONDS`` of the user's existing visits to that venue (or of each other)
+are merged with them instead of opening new ones; see ``merge_visits``.
+
+Like ``amenity_facets``, the index is loaded at startup and kept current from
+``venue.*`` events delivered by ``EventSubscriber``.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import structlog
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.venues import Venues as VenuesModel
+from app.services import geometry
+from app.services.events import EventSubscriber
+
+logger = structlog.get_logger(__name__)
+
+# Grid cell size for the bounding-box prefilter (about 1 km of latitude).
+CELL_DEGREES = 0.01
+# Simplified polygons stay within this distance of the stored outline.
+SIMPLIFY_METRES = 2.0
+
+# Advisory lock space for visit writers, and how many buckets users are hashed into.
+VISIT_LOCK_SPACE = 7301
+VISIT_LOCK_BUCKETS = 1024
+
+_LOCK_SQL = text(
+    """
+    SELECT pg_advisory_xact_lock(:space, b.bucket)
+    FROM (
+        SELECT DISTINCT hashtext(CAST(u.user_id AS text)) & :mask AS bucket
+        FROM unnest(CAST(:user_ids AS uuid[])) AS u(user_id)
+        ORDER BY bucket
+    ) AS b
+    """
+)
+
+_MERGE_SQL = text(
+    """
+    WITH segments AS (
+        SELECT *
+        FROM unnest(
+            CAST(:ids AS uuid[]),
+            CAST(:user_ids AS uuid[]),
+            CAST(:venue_ids AS uuid[]),
+            CAST(:entered AS timestamptz[]),
+            CAST(:exited AS timestamptz[])
+        ) AS s(id, user_id, venue_id, entered_at, exited_at)
+    ), stored AS (
+        SELECT DISTINCT v.id, v.user_id, v.venue_id, v.entered_at, v.exited_at, v.inferred
+        FROM visits AS v
+        JOIN segments AS s
+          ON v.user_id = s.user_id
+         AND v.venue_id = s.venue_id
+         AND s.entered_at <= v.exited_at + CAST(:gap AS interval)
+         AND s.exited_at >= v.entered_at - CAST(:gap AS interval)
+    ), spans AS (
+        SELECT id, user_id, venue_id, entered_at, exited_at, inferred, true AS existed
+        FROM stored
+        UNION ALL
+        SELECT id, user_id, venue_id, entered_at, exited_at, CAST(:inferred AS boolean), false
+        FROM segments
+    ), breaks AS (
+        SELECT *,
+               CASE WHEN entered_at <= max(exited_at) OVER earlier + CAST(:gap AS interval)
+                    THEN 0 ELSE 1 END AS opens
+        FROM spans
+        WINDOW earlier AS (
+            PARTITION BY user_id, venue_id ORDER BY entered_at, exited_at, id
+            ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        )
+    ), islands AS (
+        SELECT *,
+               sum(opens) OVER (
+                   PARTITION BY user_id, venue_id ORDER BY entered_at, exited_at, id
+               ) AS island
+        FROM breaks
+    ), merged AS (
+        SELECT coalesce(
+                   (array_agg(id ORDER BY entered_at, id) FILTER (WHERE existed))[1],
+                   (array_agg(id ORDER BY entered_at, id))[1]
+               ) AS id,
+               user_id, venue_id, island,
+               min(entered_at) AS entered_at,
+               max(exited_at) AS exited_at,
+               bool_and(inferred) AS inferred,
+               bool_or(existed) AS existed
+        FROM islands
+        GROUP BY user_id, venue_id, island
+    ), extended AS (
+        UPDATE visits AS v
+        SET entered_at = m.entered_at, exited_at = m.exited_at, inferred = m.inferred
+        FROM merged AS m
+        WHERE v.id = m.id AND m.existed
+        RETURNING v.id
+    ), absorbed AS (
+        DELETE FROM visits AS v
+        USING islands AS i
+        JOIN merged AS m
+          ON m.user_id = i.user_id AND m.venue_id = i.venue_id AND m.island = i.island
+        WHERE v.id = i.id AND i.existed AND v.id <> m.id
+        RETURNING v.id
+    ), inserted AS (
+        INSERT INTO visits (id, user_id, venue_id, entered_at, exited_at, inferred)
+        SELECT m.id, m.user_id, m.venue_id, m.entered_at, m.exited_at, m.inferred
+        FROM merged AS m
+        JOIN users AS u ON u.id = m.user_id
+        WHERE NOT m.existed
+        RETURNING id
+    )
+    SELECT m.id, m.user_id, m.venue_id, m.entered_at, m.exited_at, NOT m.existed AS is_new
+    FROM merged AS m
+    WHERE m.existed OR m.id IN (SELECT id FROM inserted)
+    """
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Fence:
+    bounds: tuple[float, float, float, float]
+    rings: list[geometry.Vertices]
+
+
+class FenceIndex:
+    """Simplified venue polygons bucketed by bounding box on a ``CELL_DEGREES`` grid."""
+
+    def __init__(self) -> None:
+        self._fences: dict[UUID, Fence] = {}
+        self._grid: dict[tuple[int, int], set[UUID]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, venues: Sequence[tuple[UUID, str | None]]) -> FenceIndex:
+        index = cls()
+        for venue_id, area in venues:
+            index.upsert(venue_id, area)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._fences)
+
+    def upsert(self, venue_id: UUID, area: str | None) -> None:
+        """Replace a venue's fence; venues without a usable polygon are dropped."""
+
+        fence = _fence(venue_id, area)
+        with self._lock:
+            self._discard(venue_id)
+            if fence is None:
+                return
+            self._fences[venue_id] = fence
+            for cell in _cells(fence.bounds):
+                self._grid[cell].add(venue_id)
+
+    def remove(self, venue_id: UUID) -> None:
+        with self._lock:
+            self._discard(venue_id)
+
+    def match(self, xs: geometry.Vertices, ys: geometry.Vertices) -> list[tuple[int, UUID]]:
+        """``(point index, venue id)`` for every point inside a venue's area."""
+
+        hits: list[tuple[int, UUID]] = []
+        if not len(xs):
+            return hits
+        cells = np.stack(
+            [np.floor(xs / CELL_DEGREES), np.floor(ys / CELL_DEGREES)], axis=1
+        ).astype(np.int64)
+        keys, inverse = np.unique(cells, axis=0, return_inverse=True)
+        with self._lock:
+            for position, (cell_x, cell_y) in enumerate(keys.tolist()):
+                candidates = self._grid.get((cell_x, cell_y))
+                if not candidates:
+                    continue
+                in_cell = np.flatnonzero(inverse.ravel() == position)
+                for venue_id in candidates:
+                    fence = self._fences[venue_id]
+                    min_x, min_y, max_x, max_y = fence.bounds
+                    px, py = xs[in_cell], ys[in_cell]
+                    boxed = in_cell[(px >= min_x) & (px <= max_x) & (py >= min_y) & (py <= max_y)]
+                    if not len(boxed):
+                        continue
+                    inside = geometry.contains(fence.rings, xs[boxed], ys[boxed])
+                    hits.extend((int(point), venue_id) for point in boxed[inside])
+        return hits
+
+    def _discard(self, venue_id: UUID) -> None:
+        fence = self._fences.pop(venue_id, None)
+        if fence is None:
+            return
+        for cell in _cells(fence.bounds):
+            members = self._grid.get(cell)
+            if members is not None:
+                members.discard(venue_id)
+                if not members:
+                    del self._grid[cell]
+
+
+class VenueFences:
+    """A ``FenceIndex`` over all venues, loaded from and kept in sync with Postgres."""
+
+    def __init__(self, session_factory: sessionmaker[Session]):
+        self._session_factory = session_factory
+        self.index = FenceIndex()
+
+    def load(self) -> None:
+        """(Re)build the whole index with one bulk query and swap it in."""
+
+        with self._session_factory() as session:
+            rows = session.execute(_areas_query()).all()
+        self.index = FenceIndex.build([(row.id, row.area) for row in rows])
+        logger.info("venue_fences_loaded", venues=len(self.index))
+
+    def subscribe(self, subscriber: EventSubscriber) -> None:
+        subscriber.register("venue.created", self.handle_venue_changed)
+        subscriber.register("venue.updated", self.handle_venue_changed)
+        subscriber.register("venue.deleted", self.handle_venue_deleted)
+        subscriber.register("venue.bulk_upserted", self.handle_venues_bulk_upserted)
+        subscriber.on_resync(self.load)
+
+    def match(self, xs: geometry.Vertices, ys: geometry.Vertices) -> list[tuple[int, UUID]]:
+        return self.index.match(xs, ys)
+
+    def handle_venue_changed(self, payload: dict[str, Any]) -> None:
+        self._refresh([UUID(payload["id"])])
+
+    def handle_venue_deleted(self, payload: dict[str, Any]) -> None:
+        self.index.remove(UUID(payload["id"]))
+
+    def handle_venues_bulk_upserted(self, payload: dict[str, Any]) -> None:
+        self._refresh([UUID(identifier) for identifier in payload["created"] + payload["updated"]])
+
+    def _refresh(self, venue_ids: list[UUID]) -> None:
+        with self._session_factory() as session:
+            areas = {
+                row.id: row.area
+                for row in session.execute(_areas_query().where(VenuesModel.id.in_(venue_ids)))
+            }
+        for venue_id in venue_ids:
+            self.index.upsert(venue_id, areas.get(venue_id))
+
+
+def record_visits(
+    db: Session,
+    fences: VenueFences,
+    user_ids: Sequence[UUID],
+    xs: geometry.Vertices,
+    ys: geometry.Vertices,
+    times: Sequence[datetime],
+    *,
+    gap: timedelta,
+) -> list[dict[str, Any]]:
+    """Match a footsteps batch against the fences and upsert the resulting visits.
+
+    Runs in the caller's transaction. Returns the created or extended visits as event
+    payload dicts (``is_new`` marks visits this batch opened).
+    """
+
+    runs: dict[tuple[UUID, UUID], list[datetime]] = defaultdict(list)
+    for point, venue_id in fences.match(xs, ys):
+        runs[(user_ids[point], venue_id)].append(times[point])
+    if not runs:
+        return []
+
+    segments: list[tuple[UUID, UUID, datetime, datetime]] = []
+    for (user_id, venue_id), moments in runs.items():
+        moments.sort()
+        entered = exited = moments[0]
+        for moment in moments[1:]:
+            if moment - exited > gap:
+                segments.append((user_id, venue_id, entered, exited))
+                entered = moment
+            exited = moment
+        segments.append((user_id, venue_id, entered, exited))
+
+    rows = merge_visits(db, segments, gap=gap)
+    return [
+        {
+            "id": str(row.id),
+            "user_id": str(row.user_id),
+            "venue_id": str(row.venue_id),
+            "entered_at": row.entered_at.isoformat(),
+            "exited_at": row.exited_at.isoformat(),
+            "is_new": row.is_new,
+        }
+        for row in rows
+    ]
+
+
+def merge_visits(
+    db: Session,
+    segments: Sequence[tuple[UUID, UUID, datetime, datetime]],
+    *,
+    gap: timedelta,
+    inferred: bool = False,
+) -> list[Any]:
+    """Write ``(user_id, venue_id, entered_at, exited_at)`` segments as visits.
+
+    Segments and stored visits of the same user and venue that lie within ``gap`` of one
+    another are merged into a single visit, the earliest stored one; the others it
+    absorbs are deleted. Writers are serialised per user (by advisory lock on a hash
+    bucket), so concurrent batches of one user cannot open duplicate visits. A merged
+    visit stays ``inferred`` only if all it was made of was.
+
+    Runs in the caller's transaction. Returns one row per resulting visit, with
+    ``is_new`` set for visits that were inserted.
+    """
+
+    if not segments:
+        return []
+    user_ids = [segment[0] for segment in segments]
+    db.execute(
+        _LOCK_SQL,
+        {"space": VISIT_LOCK_SPACE, "mask": VISIT_LOCK_BUCKETS - 1, "user_ids": user_ids},
+    )
+    return list(
+        db.execute(
+            _MERGE_SQL,
+            {
+                "ids": [uuid.uuid4() for _ in segments],
+                "user_ids": user_ids,
+                "venue_ids": [segment[1] for segment in segments],
+                "entered": [segment[2] for segment in segments],
+                "exited": [segment[3] for segment in segments],
+                "gap": gap,
+                "inferred": inferred,
+            },
+        ).all()
+    )
+
+
+def _areas_query() -> Any:
+    return select(VenuesModel.id, VenuesModel.area).where(VenuesModel.is_active.is_(True))
+
+
+def _fence(venue_id: UUID, area: str | None) -> Fence | None:
+    if not area:
+        return None
+    try:
+        rings = geometry.parse_polygon(area)
+    except geometry.GeometryError:
+        logger.warning("venue_area_unparsed", venue_id=str(venue_id))
+        return None
+    shell = rings[0]
+    min_x, min_y = shell.min(axis=0)
+    max_x, max_y = shell.max(axis=0)
+    # The column default is a degenerate polygon at (0, 0).
+    if min_x == max_x or min_y == max_y:
+        return None
+    tolerance = geometry.metres_to_degrees(SIMPLIFY_METRES, (min_y + max_y) / 2)
+    simplified = [geometry.simplify_ring(ring, tolerance) for ring in rings]
+    return Fence(bounds=(float(min_x), float(min_y), float(max_x), float(max_y)), rings=simplified)
+
+
+def _cells(bounds: tuple[float, float, float, float]) -> list[tuple[int, int]]:
+    min_x, min_y, max_x, max_y = bounds
+    return [
+        (cell_x, cell_y)
+        for cell_x in range(math.floor(min_x / CELL_DEGREES), math.floor(max_x / CELL_DEGREES) + 1)
+        for cell_y in range(math.floor(min_y / CELL_DEGREES), math.floor(max_y / CELL_DEGREES) + 1)
+    ]
@@ -0,0 +1,154 @@
+"""Planar geometry helpers over NumPy arrays of ``(lon, lat)`` vertices.
+
+Venue ``area`` polygons and footsteps ``coordinates`` are stored as WKT text in
+longitude/latitude order. At venue scale (tens to hundreds of metres) degrees can be
+treated as planar for containment tests; tolerances are given in metres and converted
+with ``metres_to_degrees``.
+"""
+from __future__ import annotations
+
+import math
+import re
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+Vertices = npt.NDArray[np.float64]
+
+METRES_PER_DEGREE = 111_320.0
+
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_POINT = re.compile(rf"^\s*POINT\s*\(\s*({_NUMBER})\s+({_NUMBER})\s*\)\s*$", re.IGNORECASE)
+_POLYGON = re.compile(r"^\s*POLYGON\s*\((.*)\)\s*$", re.IGNORECASE | re.DOTALL)
+_RING = re.compile(r"\(([^()]*)\)")
+
+
+class GeometryError(ValueError):
+    """Raised when a WKT value cannot be parsed."""
+
+
+def parse_point(wkt: str) -> tuple[float, float]:
+    """``POINT(lon lat)`` as a ``(lon, lat)`` tuple, checked to lie on the globe."""
+
+    match = _POINT.match(wkt)
+    if not match:
+        raise GeometryError(f"invalid point {wkt!r}")
+    lon, lat = float(match.group(1)), float(match.group(2))
+    if not (-180.0 <= lon <= 180.0 and -90.0 <= lat <= 90.0):
+        raise GeometryError(f"point out of range {wkt!r}")
+    return lon, lat
+
+
+def parse_polygon(wkt: str) -> list[Vertices]:
+    """``POLYGON((...), (...))`` as closed ``(n, 2)`` rings, the shell first."""
+
+    match = _POLYGON.match(wkt)
+    if not match:
+        raise GeometryError(f"invalid polygon {wkt!r}")
+    rings = []
+    for body in _RING.findall(match.group(1)):
+        try:
+            ring = np.array(
+                [[float(value) for value in pair.split()] for pair in body.split(",")],
+                dtype=np.float64,
+            )
+        except ValueError as exc:
+            raise GeometryError(f"invalid polygon {wkt!r}") from exc
+        if ring.ndim != 2 or ring.shape[1] != 2 or len(ring) < 4:
+            raise GeometryError(f"invalid polygon {wkt!r}")
+        if not np.array_equal(ring[0], ring[-1]):
+            ring = np.vstack([ring, ring[:1]])
+        rings.append(ring)
+    if not rings:
+        raise GeometryError(f"invalid polygon {wkt!r}")
+    return rings
+
+
+def metres_to_degrees(metres: float, latitude: float) -> float:
+    """A distance in metres as degrees, using the (shorter) longitude scale at ``latitude``."""
+
+    return metres / (METRES_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+
+
+def metres_between(x1: Any, y1: Any, x2: Any, y2: Any) -> Vertices:
+    """Equirectangular distance in metres between lon/lat points, broadcasting like NumPy.
+
+    Accurate to well under a percent at the few-kilometre scale of footsteps.
+    """
+
+    scale = np.cos(np.radians((y1 + y2) / 2))
+    return np.hypot((x2 - x1) * scale, y2 - y1) * METRES_PER_DEGREE
+
+
+def simplify(vertices: Vertices, tolerance: float) -> Vertices:
+    """Douglas-Peucker simplification of a polyline, keeping both end points.
+
+    Each step measures every vertex of a span against its chord in one vectorised pass.
+    """
+
+    if len(vertices) < 3:
+        return vertices
+    return vertices[simplify_mask(vertices, tolerance)]
+
+
+def simplify_mask(vertices: Vertices, tolerance: float) -> npt.NDArray[np.bool_]:
+    """Which vertices ``simplify`` keeps."""
+
+    count = len(vertices)
+    keep = np.zeros(count, dtype=bool)
+    keep[:1] = keep[-1:] = True
+    spans = [(0, count - 1)]
+    while spans:
+        first, last = spans.pop()
+        if last - first < 2:
+            continue
+        distances = _distances_to_segment(
+            vertices[first + 1 : last], vertices[first], vertices[last]
+        )
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            spans.extend(((first, split), (split, last)))
+    return keep
+
+
+def simplify_ring(ring: Vertices, tolerance: float) -> Vertices:
+    """Douglas-Peucker for a closed ring, split at the vertex farthest from its start.
+
+    Rings that would collapse below a triangle are returned unchanged.
+    """
+
+    if len(ring) <= 4:
+        return ring
+    split = int(np.argmax(np.hypot(*(ring - ring[0]).T)))
+    simplified = np.vstack(
+        [simplify(ring[: split + 1], tolerance)[:-1], simplify(ring[split:], tolerance)]
+    )
+    return simplified if len(simplified) >= 4 else ring
+
+
+def contains(rings: list[Vertices], xs: Vertices, ys: Vertices) -> npt.NDArray[np.bool_]:
+    """Even-odd point-in-polygon test of every ``(xs[i], ys[i])`` against all rings at once."""
+
+    inside = np.zeros(len(xs), dtype=bool)
+    px, py = xs[:, None], ys[:, None]
+    for ring in rings:
+        x1, y1 = ring[:-1, 0], ring[:-1, 1]
+        x2, y2 = ring[1:, 0], ring[1:, 1]
+        straddles = (y1 > py) != (y2 > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= (np.count_nonzero(straddles & (px < crossing_x), axis=1) % 2).astype(bool)
+    return inside
+
+
+def _distances_to_segment(points: Vertices, start: Vertices, end: Vertices) -> Vertices:
+    direction = end - start
+    length_squared = float(direction @ direction)
+    if length_squared == 0.0:
+        return np.hypot(*(points - start).T)
+    t = np.clip(((points - start) @ direction) / length_squared, 0.0, 1.0)
+    projections = start + t[:, None] * direction
+    return np.hypot(*(points - projections).T)
@@ -0,0 +1,393 @@
+"""Compact in-memory follower graph for offline analytics.
+
+Accepted follows are held in compressed sparse row (CSR) form: ``indptr`` (int64, one
+entry per node plus one) and ``indices`` (int32 node indices) so the followed users of
+node ``i`` are ``indices[indptr[i]:indptr[i + 1]]``. ``node_ids`` keeps the UUID of
+each node as 16 raw bytes; the UUID to index map is built lazily from it.
+
+Edge changes (``add_edge`` / ``remove_edge``) are buffered as deltas and folded into the
+arrays by ``compact()``, which traversals call automatically. Snapshots are plain
+``.npy`` files that ``load()`` memory-maps, so a warm start costs no parsing.
+``FollowerGraphSync`` feeds ``follow.*`` / ``user.deleted`` worker events into such a
+snapshot so the offline jobs read current edges between full rebuilds.
+"""
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+import structlog
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models import Followers, Users
+from app.models.followers import StatusEnum
+
+logger = structlog.get_logger(__name__)
+
+IndexArray = npt.NDArray[np.int32]
+
+_EDGES_SQL = text(
+    """
+    WITH nodes AS (
+        SELECT id, (row_number() OVER (ORDER BY id) - 1)::int AS idx FROM users
+    )
+    SELECT a.idx, b.idx
+    FROM followers AS f
+    JOIN nodes AS a ON a.id = f.follower_id
+    JOIN nodes AS b ON b.id = f.followed_id
+    WHERE f.status = 'ACCEPTED'
+    """
+)
+_SNAPSHOT_FILES = ("node_ids", "indptr", "indices")
+
+
+class FollowerGraph:
+    """Accepted follow edges (follower -> followed) in CSR form."""
+
+    def __init__(
+        self,
+        node_ids: npt.NDArray[np.uint8],
+        indptr: npt.NDArray[np.int64],
+        indices: IndexArray,
+    ) -> None:
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self._index: dict[UUID, int] | None = None
+        self._reverse: tuple[npt.NDArray[np.int64], IndexArray] | None = None
+        self._new_nodes: list[bytes] = []
+        self._added: set[tuple[int, int]] = set()
+        self._removed: set[tuple[int, int]] = set()
+        self._dropped: set[int] = set()
+
+    # -- construction -----------------------------------------------------------------
+
+    @classmethod
+    def from_edges(
+        cls,
+        node_ids: Iterable[UUID],
+        sources: npt.ArrayLike,
+        targets: npt.ArrayLike,
+    ) -> FollowerGraph:
+        """Build a graph from node UUIDs and parallel arrays of edge endpoint indices."""
+
+        packed = _pack_ids(node_ids)
+        indptr, indices = _build_csr(
+            len(packed), np.asarray(sources, np.int64), np.asarray(targets, np.int64)
+        )
+        return cls(packed, indptr, indices)
+
+    @classmethod
+    def from_database(cls, db: Session, *, batch_size: int = 100_000) -> FollowerGraph:
+        """Bulk-load every accepted edge, streaming integer pairs in ``batch_size`` rows.
+
+        Node indices are assigned by Postgres so no per-edge UUID lookups happen in
+        Python; both queries share one repeatable-read snapshot to agree on them.
+        """
+
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        user_ids = db.execute(select(Users.id).order_by(Users.id)).scalars().all()
+
+        sources: list[IndexArray] = []
+        targets: list[IndexArray] = []
+        result = db.execute(_EDGES_SQL, execution_options={"yield_per": batch_size})
+        for partition in result.partitions():
+            pairs = np.asarray(partition, dtype=np.int32).reshape(-1, 2)
+            sources.append(pairs[:, 0])
+            targets.append(pairs[:, 1])
+        db.rollback()
+
+        graph = cls.from_edges(
+            user_ids,
+            np.concatenate(sources) if sources else np.empty(0, np.int32),
+            np.concatenate(targets) if targets else np.empty(0, np.int32),
+        )
+        logger.info("follower_graph_loaded", nodes=graph.node_count, edges=graph.edge_count)
+        return graph
+
+    @classmethod
+    def load(cls, path: Path, *, mmap: bool = True) -> FollowerGraph:
+        """Open a snapshot written by ``save``, memory-mapped read-only by default."""
+
+        mode: Any = "r" if mmap else None
+        arrays = [np.load(path / f"{name}.npy", mmap_mode=mode) for name in _SNAPSHOT_FILES]
+        return cls(*arrays)
+
+    def save(self, path: Path) -> None:
+        """Write a snapshot, replacing each file atomically."""
+
+        self.compact()
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _SNAPSHOT_FILES:
+            target = path / f"{name}.npy"
+            partial = path / f"{name}.npy.partial"
+            with open(partial, "wb") as handle:
+                np.save(handle, getattr(self, name))
+            os.replace(partial, target)
+
+    # -- lookups ----------------------------------------------------------------------
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids) + len(self._new_nodes)
+
+    @property
+    def edge_count(self) -> int:
+        self.compact()
+        return len(self.indices)
+
+    @property
+    def index(self) -> dict[UUID, int]:
+        """UUID to node index map, built on first use."""
+
+        if self._index is None:
+            self._index = {UUID(bytes=row.tobytes()): idx for idx, row in enumerate(self.node_ids)}
+            for offset, raw in enumerate(self._new_nodes):
+                self._index[UUID(bytes=raw)] = len(self.node_ids) + offset
+        return self._index
+
+    def node_id(self, index: int) -> UUID:
+        if index >= len(self.node_ids):
+            return UUID(bytes=self._new_nodes[index - len(self.node_ids)])
+        return UUID(bytes=self.node_ids[index].tobytes())
+
+    def out_degree(self) -> npt.NDArray[np.int64]:
+        """Number of accepted follows per node (following count)."""
+
+        self.compact()
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> npt.NDArray[np.int64]:
+        """Number of accepted followers per node."""
+
+        self.compact()
+        return np.bincount(self.indices, minlength=self.node_count).astype(np.int64)
+
+    # -- incremental updates ----------------------------------------------------------
+
+    def add_edge(self, follower_id: UUID, followed_id: UUID) -> None:
+        edge = (self._intern(follower_id), self._intern(followed_id))
+        self._removed.discard(edge)
+        self._added.add(edge)
+
+    def remove_edge(self, follower_id: UUID, followed_id: UUID) -> None:
+        index = self.index
+        if follower_id not in index or followed_id not in index:
+            return
+        edge = (index[follower_id], index[followed_id])
+        self._added.discard(edge)
+        self._removed.add(edge)
+
+    def remove_node_edges(self, user_id: UUID) -> None:
+        """Drop every edge touching ``user_id``; the node keeps its index."""
+
+        node = self.index.get(user_id)
+        if node is None:
+            return
+        self._added = {edge for edge in self._added if node not in edge}
+        self._dropped.add(node)
+
+    def compact(self) -> None:
+        """Fold buffered deltas into fresh CSR arrays."""
+
+        if not (self._new_nodes or self._added or self._removed or self._dropped):
+            return
+
+        if self._new_nodes:
+            fresh = np.frombuffer(b"".join(self._new_nodes), dtype=np.uint8).reshape(-1, 16)
+            self.node_ids = np.concatenate([self.node_ids, fresh])
+            self._new_nodes = []
+
+        node_count = len(self.node_ids)
+        sources = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr))
+        targets = self.indices.astype(np.int64)
+        keep = np.ones(len(targets), dtype=bool)
+        if self._removed:
+            removed = np.array(
+                [src * node_count + dst for src, dst in self._removed], dtype=np.int64
+            )
+            keep &= ~np.isin(sources * node_count + targets, removed)
+        if self._dropped:
+            dropped = np.fromiter(self._dropped, dtype=np.int64)
+            keep &= ~(np.isin(sources, dropped) | np.isin(targets, dropped))
+        sources, targets = sources[keep], targets[keep]
+        if self._added:
+            added = np.array(sorted(self._added), dtype=np.int64)
+            sources = np.concatenate([sources, added[:, 0]])
+            targets = np.concatenate([targets, added[:, 1]])
+
+        self.indptr, self.indices = _build_csr(node_count, sources, targets)
+        self._added, self._removed, self._dropped = set(), set(), set()
+        self._reverse = None
+
+    # -- traversal --------------------------------------------------------------------
+
+    def bfs(
+        self, source: UUID, *, max_depth: int | None = None, reverse: bool = False
+    ) -> npt.NDArray[np.int32]:
+        """Hop distance from ``source`` to every node, ``-1`` where unreachable.
+
+        ``reverse`` walks follower edges instead, i.e. "who can reach ``source``".
+        """
+
+        return self._multi_source_bfs([source], max_depth=max_depth, reverse=reverse)
+
+    def k_hop(self, sources: Iterable[UUID], k: int, *, reverse: bool = False) -> IndexArray:
+        """Indices of nodes reachable from any of ``sources`` within ``k`` hops."""
+
+        distances = self._multi_source_bfs(sources, max_depth=k, reverse=reverse)
+        return np.flatnonzero(distances >= 0).astype(np.int32)
+
+    def _multi_source_bfs(
+        self, sources: Iterable[UUID], *, max_depth: int | None, reverse: bool
+    ) -> npt.NDArray[np.int32]:
+        indptr, indices = self._csr(reverse)
+        distances = np.full(self.node_count, -1, dtype=np.int32)
+        frontier = np.unique(
+            np.fromiter((self.index[source] for source in sources), dtype=np.int32)
+        )
+        distances[frontier] = 0
+        depth = 0
+        while frontier.size and (max_depth is None or depth < max_depth):
+            depth += 1
+            neighbours = _gather(indptr, indices, frontier)
+            frontier = np.unique(neighbours[distances[neighbours] < 0])
+            distances[frontier] = depth
+        return distances
+
+    def _csr(self, reverse: bool) -> tuple[npt.NDArray[np.int64], IndexArray]:
+        self.compact()
+        if not reverse:
+            return self.indptr, self.indices
+        if self._reverse is None:
+            sources = np.repeat(
+                np.arange(self.node_count, dtype=np.int64), np.diff(self.indptr)
+            )
+            self._reverse = _build_csr(self.node_count, self.indices.astype(np.int64), sources)
+        return self._reverse
+
+    def _intern(self, user_id: UUID) -> int:
+        index = self.index
+        node = index.get(user_id)
+        if node is None:
+            node = self.node_count
+            self._new_nodes.append(user_id.bytes)
+            index[user_id] = node
+        return node
+
+
+class FollowerGraphSync:
+    """Worker handlers that keep the snapshot at ``path`` in step with follow events.
+
+    The graph is opened from the snapshot (or built from Postgres when there is none)
+    on the first event, and written back after every ``save_every`` edge changes; a
+    worker that dies in between loses those until the next ``make db-snapshot-graph``.
+    """
+
+    def __init__(self, path: Path, *, save_every: int = 1_000) -> None:
+        self._path = path
+        self._save_every = save_every
+        self._graph: FollowerGraph | None = None
+        self._unsaved = 0
+
+    def graph(self, db: Session) -> FollowerGraph:
+        if self._graph is None:
+            if (self._path / f"{_SNAPSHOT_FILES[0]}.npy").exists():
+                self._graph = FollowerGraph.load(self._path)
+            else:
+                self._graph = FollowerGraph.from_database(db)
+        return self._graph
+
+    def save(self) -> None:
+        """Write pending edge changes to the snapshot."""
+
+        if self._graph is not None and self._unsaved:
+            self._graph.save(self._path)
+            self._unsaved = 0
+
+    def handle_follow_changed(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.created`` / ``follow.updated``."""
+
+        self._apply_rows(db, [UUID(payload["id"])])
+
+    def handle_follow_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.deleted``."""
+
+        graph = self.graph(db)
+        graph.remove_edge(UUID(payload["follower_id"]), UUID(payload["followed_id"]))
+        self._changed(1)
+
+    def handle_follows_bulk_updated(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.bulk_updated``."""
+
+        self._apply_rows(db, [UUID(identifier) for identifier in payload["ids"]])
+
+    def handle_follows_bulk_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.bulk_deleted``."""
+
+        graph = self.graph(db)
+        for relationship in payload["relationships"]:
+            graph.remove_edge(UUID(relationship["follower_id"]), UUID(relationship["followed_id"]))
+        self._changed(len(payload["relationships"]))
+
+    def handle_user_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``user.deleted``."""
+
+        self.graph(db).remove_node_edges(UUID(payload["id"]))
+        self._changed(1)
+
+    def _apply_rows(self, db: Session, ids: list[UUID]) -> None:
+        graph = self.graph(db)
+        rows = db.execute(
+            select(Followers.follower_id, Followers.followed_id, Followers.status).where(
+                Followers.id.in_(ids)
+            )
+        ).all()
+        # Rows deleted in the meantime are removed by their follow.deleted event.
+        for row in rows:
+            if row.status == StatusEnum.ACCEPTED:
+                graph.add_edge(row.follower_id, row.followed_id)
+            else:
+                graph.remove_edge(row.follower_id, row.followed_id)
+        self._changed(len(rows))
+
+    def _changed(self, count: int) -> None:
+        self._unsaved += count
+        if self._unsaved >= self._save_every:
+            self.save()
+
+
+def _pack_ids(node_ids: Iterable[UUID]) -> npt.NDArray[np.uint8]:
+    raw = b"".join(node_id.bytes for node_id in node_ids)
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 16).copy()
+
+
+def _build_csr(
+    node_count: int, sources: npt.NDArray[np.int64], targets: npt.NDArray[np.int64]
+) -> tuple[npt.NDArray[np.int64], IndexArray]:
+    """Sort and de-duplicate edges by (source, target) and lay them out as CSR."""
+
+    keys = np.unique(sources * node_count + targets)
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // max(node_count, 1), minlength=node_count), out=indptr[1:])
+    return indptr, (keys % max(node_count, 1)).astype(np.int32)
+
+
+def _gather(
+    indptr: npt.NDArray[np.int64], indices: IndexArray, frontier: IndexArray
+) -> IndexArray:
+    """Concatenate the neighbour lists of every node in ``frontier`` without a loop."""
+
+    starts = indptr[frontier]
+    lengths = indptr[frontier + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int32)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)]
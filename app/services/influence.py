@@ -0,0 +1,143 @@
+"""PageRank influence scores over accepted follows.
+
+Scores are computed on a ``FollowerGraph`` by power iteration: each step is one sparse
+matrix-vector product expressed as ``np.bincount`` over the edge arrays, so the cost is
+a couple of vectorised passes over the edges per iteration. ``write_scores`` replaces
+the ``influence`` table in one transaction via ``COPY``.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, cast
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+import structlog
+from sqlalchemy import CursorResult, delete, text
+from sqlalchemy.orm import Session
+
+from app.models import Influence
+from app.services.graph_csr import FollowerGraph
+
+logger = structlog.get_logger(__name__)
+
+_INSERT_SQL = text(
+    """
+    INSERT INTO influence (user_id, score, rank, computed_at)
+    SELECT s.user_id, s.score, s.rank, now()
+    FROM influence_stage AS s
+    JOIN users AS u ON u.id = s.user_id
+    """
+)
+
+
+@dataclass
+class PageRankResult:
+    """Scores indexed like the graph's nodes, plus convergence statistics."""
+
+    scores: npt.NDArray[np.float64]
+    iterations: int
+    residual: float
+    converged: bool
+    elapsed: float
+
+
+def pagerank(
+    graph: FollowerGraph,
+    *,
+    damping: float = 0.85,
+    tolerance: float = 1e-6,
+    max_iterations: int = 100,
+    seed: UUID | None = None,
+) -> PageRankResult:
+    """Power-iterate PageRank until the L1 change between steps drops below ``tolerance``.
+
+    Influence flows from a follower to the users they follow. With ``seed`` the random
+    jump (and dangling mass) always returns to that user, giving personalised PageRank.
+    """
+
+    started = time.perf_counter()
+    graph.compact()
+    node_count = graph.node_count
+    out_degree = np.diff(graph.indptr).astype(np.float64)
+    sources = np.repeat(np.arange(node_count, dtype=np.int32), np.diff(graph.indptr))
+    targets = graph.indices
+    dangling = out_degree == 0
+    inverse_degree = np.divide(1.0, out_degree, out=np.zeros(node_count), where=~dangling)
+
+    if seed is None:
+        teleport = np.full(node_count, 1.0 / max(node_count, 1))
+    else:
+        teleport = np.zeros(node_count)
+        teleport[graph.index[seed]] = 1.0
+
+    scores = teleport.copy()
+    residual = float("inf")
+    iteration = 0
+    while iteration < max_iterations and residual >= tolerance:
+        iteration += 1
+        spread = np.bincount(
+            targets, weights=(scores * inverse_degree)[sources], minlength=node_count
+        )
+        leaked = scores[dangling].sum()
+        updated = damping * (spread + leaked * teleport) + (1.0 - damping) * teleport
+        residual = float(np.abs(updated - scores).sum())
+        scores = updated
+
+    result = PageRankResult(
+        scores=scores,
+        iterations=iteration,
+        residual=residual,
+        converged=residual < tolerance,
+        elapsed=time.perf_counter() - started,
+    )
+    logger.info(
+        "pagerank_computed",
+        nodes=node_count,
+        edges=len(targets),
+        iterations=result.iterations,
+        residual=result.residual,
+        converged=result.converged,
+        elapsed=round(result.elapsed, 3),
+        personalised=seed is not None,
+    )
+    return result
+
+
+def rank_order(scores: npt.NDArray[np.float64]) -> npt.NDArray[np.int64]:
+    """1-based rank of every node, ties broken by node index."""
+
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return ranks
+
+
+def write_scores(db: Session, graph: FollowerGraph, result: PageRankResult) -> int:
+    """Replace the ``influence`` table with ``result`` and return the rows written.
+
+    Rows are staged with ``COPY`` and joined against ``users`` on the way in, so users
+    deleted since the graph was loaded are skipped instead of failing the batch.
+    """
+
+    ranks = rank_order(result.scores)
+    db.execute(
+        text(
+            "CREATE TEMP TABLE influence_stage "
+            "(user_id uuid, score double precision, rank integer) ON COMMIT DROP"
+        )
+    )
+    driver_connection = db.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:  # type: ignore[union-attr]
+        with cursor.copy("COPY influence_stage (user_id, score, rank) FROM STDIN") as copy:
+            for node, (score, rank) in enumerate(
+                zip(result.scores.tolist(), ranks.tolist(), strict=True)
+            ):
+                copy.write_row((graph.node_id(node), score, rank))
+    db.execute(delete(Influence))
+    written = cast(CursorResult[Any], db.execute(_INSERT_SQL)).rowcount
+    db.commit()
+
+    logger.info("influence_scores_written", rows=written)
+    return written
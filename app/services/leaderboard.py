@@ -0,0 +1,189 @@
+"""Points leaderboard kept in a Redis sorted set.
+
+``leaderboard:points`` maps every user id to their ``users.points``. The worker keeps
+it current from ``user.*`` events and ``rebuild`` reloads it from Postgres. Ledger awards
+reach the board when the compactor folds them in (``user.points_compacted``). Every read
+is a single Redis call: ``ZREVRANGE`` for the top of the board, and a Lua script for a
+user's neighbourhood and for the friends board, which scores the user's accepted
+follows from the ``follows:<user_id>`` set maintained by ``RelationshipCache``.
+Ties are ordered like ``ZREVRANGE`` (reverse lexicographic user id).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+import redis
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Users
+from app.models.followers import StatusEnum
+from app.services.relationship_cache import SENTINEL
+
+logger = structlog.get_logger(__name__)
+
+_AROUND_SCRIPT = """
+local rank = redis.call('ZREVRANK', KEYS[1], ARGV[1])
+if not rank then
+    return false
+end
+local first = math.max(rank - tonumber(ARGV[2]), 0)
+return {first, redis.call('ZREVRANGE', KEYS[1], first, rank + tonumber(ARGV[2]), 'WITHSCORES')}
+"""
+
+# KEYS: leaderboard, follows set. ARGV: user id, limit, loaded sentinel, member prefix.
+# Returns false when the follows set is not loaded so the caller can fill it and retry.
+_FRIENDS_SCRIPT = """
+if redis.call('SISMEMBER', KEYS[2], ARGV[3]) == 0 then
+    return false
+end
+local prefix = ARGV[4]
+local ids = {ARGV[1]}
+for _, member in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    if string.sub(member, 1, #prefix) == prefix then
+        ids[#ids + 1] = string.sub(member, #prefix + 1)
+    end
+end
+local ranked = {}
+for start = 1, #ids, 500 do
+    local chunk = {unpack(ids, start, math.min(start + 499, #ids))}
+    local scores = redis.call('ZMSCORE', KEYS[1], unpack(chunk))
+    for offset, score in ipairs(scores) do
+        if score then
+            ranked[#ranked + 1] = {chunk[offset], score, tonumber(score)}
+        end
+    end
+end
+table.sort(ranked, function(a, b)
+    if a[3] ~= b[3] then
+        return a[3] > b[3]
+    end
+    return a[1] > b[1]
+end)
+local result = {}
+for position = 1, math.min(#ranked, tonumber(ARGV[2])) do
+    result[#result + 1] = ranked[position][1]
+    result[#result + 1] = ranked[position][2]
+end
+return result
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Standing:
+    user_id: UUID
+    points: int
+    rank: int
+
+
+class Leaderboard:
+    """Sorted-set leaderboard of ``users.points``."""
+
+    def __init__(self, url: str, key: str = "leaderboard:points"):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._key = key
+        self._around = self._client.register_script(_AROUND_SCRIPT)
+        self._friends = self._client.register_script(_FRIENDS_SCRIPT)
+
+    def top(self, limit: int) -> list[Standing]:
+        """The ``limit`` highest-scoring users."""
+
+        entries = self._client.zrevrange(self._key, 0, limit - 1, withscores=True)
+        return _standings(entries, first_rank=1)
+
+    def around(self, user_id: UUID, radius: int) -> list[Standing] | None:
+        """The user's standing with up to ``radius`` users either side, or ``None``."""
+
+        found = self._around(keys=[self._key], args=[str(user_id), radius])
+        if not found:
+            return None
+        first, flat = found
+        return _standings(_pairs(flat), first_rank=first + 1)
+
+    def friends(self, user_id: UUID, follows_key: str, limit: int) -> list[Standing] | None:
+        """Top ``limit`` among the user and their accepted follows, ranked among themselves.
+
+        Returns ``None`` when ``follows_key`` is not loaded.
+        """
+
+        found = self._friends(
+            keys=[self._key, follows_key],
+            args=[str(user_id), limit, SENTINEL, f"{StatusEnum.ACCEPTED.value}:"],
+        )
+        if found is None:
+            return None
+        return _standings(_pairs(found), first_rank=1)
+
+    def rebuild(self, db: Session, *, batch_size: int = 10_000) -> int:
+        """Reload every user's points into a scratch key and swap it in atomically."""
+
+        scratch = f"{self._key}:rebuild"
+        self._client.delete(scratch)
+        loaded = 0
+        result = db.execute(
+            select(Users.id, Users.points).execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            self._client.zadd(scratch, {str(row.id): row.points for row in rows})
+            loaded += len(rows)
+        if loaded:
+            self._client.rename(scratch, self._key)  # type: ignore[no-untyped-call]
+        else:
+            self._client.delete(self._key)
+        logger.info("leaderboard_rebuilt", users=loaded)
+        return loaded
+
+    def handle_user_changed(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``user.created`` / ``user.updated``."""
+
+        self._refresh(db, [UUID(payload["id"])])
+
+    def handle_users_bulk_upserted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``user.bulk_upserted``."""
+
+        self._refresh(
+            db, [UUID(identifier) for identifier in payload["created"] + payload["updated"]]
+        )
+
+    def handle_users_points_compacted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``user.points_compacted``."""
+
+        self._refresh(db, [UUID(identifier) for identifier in payload["ids"]])
+
+    def handle_user_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``user.deleted``."""
+
+        self._client.zrem(self._key, payload["id"])
+
+    def close(self) -> None:
+        """Close the underlying Redis connection."""
+
+        if self._client:
+            self._client.close()
+
+    def _refresh(self, db: Session, user_ids: list[UUID]) -> None:
+        points: dict[str | bytes, float] = {
+            str(row.id): row.points
+            for row in db.execute(select(Users.id, Users.points).where(Users.id.in_(user_ids)))
+        }
+        gone = [str(user_id) for user_id in user_ids if str(user_id) not in points]
+        with self._client.pipeline(transaction=False) as pipe:
+            if points:
+                pipe.zadd(self._key, points)
+            if gone:
+                pipe.zrem(self._key, *gone)
+            pipe.execute()
+
+
+def _pairs(flat: list[str]) -> list[tuple[str, float]]:
+    return [(flat[index], float(flat[index + 1])) for index in range(0, len(flat), 2)]
+
+
+def _standings(entries: list[tuple[str, float]], *, first_rank: int) -> list[Standing]:
+    return [
+        Standing(user_id=UUID(member), points=int(score), rank=first_rank + offset)
+        for offset, (member, score) in enumerate(entries)
+    ]
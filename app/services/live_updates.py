@@ -0,0 +1,158 @@
+"""Server-sent events for live venue occupancy and follow-request inboxes.
+
+Each API process has one ``LiveUpdates`` hub attached to its ``EventSubscriber``, so a
+process holds a single Redis pub/sub connection no matter how many clients stream. The
+subscriber thread formats every relevant event as an SSE frame once and hands it to the
+event loop. The loop appends the frame to the bounded queue of each client subscribed to
+the topic (``venue:<id>`` or ``inbox:<user_id>``). An idle client costs one small queue
+and one parked coroutine.
+
+A slow client cannot buffer without bound. Frames are only taken off its queue as fast
+as the socket accepts them, so when the queue fills up the backlog is dropped and
+replaced with a single ``resync`` event, which tells the client to refetch over REST.
+Everyone gets ``resync`` after the subscriber reconnects, because pub/sub loses whatever
+was published in between. Idle streams get a comment line every ``heartbeat`` seconds so
+proxies keep them open and dead peers are noticed.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import defaultdict
+from collections.abc import AsyncGenerator, Iterable
+from typing import Any
+from uuid import UUID
+
+import structlog
+
+from app.services.events import EventSubscriber
+
+logger = structlog.get_logger(__name__)
+
+# The most venues one stream may follow.
+MAX_VENUES = 100
+# Reconnect delay suggested to ``EventSource`` clients, in milliseconds.
+RETRY_MS = 5000
+
+RESYNC = "event: resync\ndata: {}\n\n"
+HEARTBEAT = ": keepalive\n\n"
+
+Frame = tuple[str, str]
+
+
+class LiveClient:
+    """One open stream: its topics and its bounded backlog of frames."""
+
+    __slots__ = ("dropped", "queue", "topics")
+
+    def __init__(self, topics: list[str], queue_size: int):
+        self.topics = topics
+        self.queue: asyncio.Queue[str] = asyncio.Queue(max(1, queue_size))
+        self.dropped = 0
+
+    def offer(self, frame: str) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class LiveUpdates:
+    """Fan this process's broadcast events out to SSE clients by topic."""
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, queue_size: int = 64, heartbeat: float = 15.0
+    ):
+        self._loop = loop
+        self._queue_size = queue_size
+        self._heartbeat = heartbeat
+        self._topics: dict[str, set[LiveClient]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len({client for clients in self._topics.values() for client in clients})
+
+    def subscribe(self, subscriber: EventSubscriber) -> None:
+        subscriber.register("venue.occupancy_updated", self.handle_occupancy_updated)
+        subscriber.register("follow.created", self.handle_follow_changed)
+        subscriber.register("follow.updated", self.handle_follow_changed)
+        subscriber.register("follow.deleted", self.handle_follow_changed)
+        subscriber.register("follow.bulk_updated", self.handle_follows_bulk_updated)
+        subscriber.register("follow.bulk_deleted", self.handle_follows_bulk_deleted)
+        subscriber.on_resync(self.handle_resync)
+
+    async def stream(self, venue_ids: Iterable[UUID], user_id: UUID | None) -> AsyncGenerator[str]:
+        """Yield SSE frames for the venues and the user's inbox until the client leaves."""
+
+        topics = [f"venue:{venue_id}" for venue_id in dict.fromkeys(venue_ids)]
+        if user_id is not None:
+            topics.append(f"inbox:{user_id}")
+        client = LiveClient(topics, self._queue_size)
+        for topic in topics:
+            self._topics[topic].add(client)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(client.queue.get(), self._heartbeat)
+                except TimeoutError:
+                    yield HEARTBEAT
+        finally:
+            self._disconnect(client)
+
+    def handle_occupancy_updated(self, payload: dict[str, Any]) -> None:
+        self._send(
+            (f"venue:{venue['venue_id']}", _frame("occupancy", venue))
+            for venue in payload["venues"]
+        )
+
+    def handle_follow_changed(self, payload: dict[str, Any]) -> None:
+        # Both sides see the request change, so every device of either user stays current.
+        frame = _frame("follow_request", payload)
+        self._send(
+            (f"inbox:{user_id}", frame)
+            for user_id in {payload["followed_id"], payload["follower_id"]}
+        )
+
+    def handle_follows_bulk_updated(self, payload: dict[str, Any]) -> None:
+        self._send([(f"inbox:{payload['followed_id']}", _frame("follow_requests", payload))])
+
+    def handle_follows_bulk_deleted(self, payload: dict[str, Any]) -> None:
+        self._send(
+            (f"inbox:{user_id}", _frame("follow_request", relationship))
+            for relationship in payload["relationships"]
+            for user_id in (relationship["followed_id"], relationship["follower_id"])
+        )
+
+    def handle_resync(self) -> None:
+        self._loop.call_soon_threadsafe(self._broadcast_resync)
+
+    def _send(self, frames: Iterable[Frame]) -> None:
+        # Called on the subscriber thread; the topic map is only touched on the loop.
+        self._loop.call_soon_threadsafe(self._deliver, list(frames))
+
+    def _deliver(self, frames: list[Frame]) -> None:
+        for topic, frame in frames:
+            for client in self._topics.get(topic, ()):
+                client.offer(frame)
+
+    def _broadcast_resync(self) -> None:
+        for client in {client for clients in self._topics.values() for client in clients}:
+            client.offer(RESYNC)
+
+    def _disconnect(self, client: LiveClient) -> None:
+        for topic in client.topics:
+            clients = self._topics.get(topic)
+            if clients is None:
+                continue
+            clients.discard(client)
+            if not clients:
+                del self._topics[topic]
+        if client.dropped:
+            logger.info("live_client_dropped_frames", frames=client.dropped)
+
+
+def _frame(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
@@ -0,0 +1,193 @@
+"""Live venue occupancy and daily unique visitors in Redis.
+
+The worker feeds both from ``venue.visited`` events:
+
+- ``occupancy:<venue_id>`` is a sorted set of user ids scored by when they were last
+  seen inside the venue. "People here now" is a ``ZCOUNT`` over the last
+  ``VISIT_GAP_SECONDS`` (the same gap that keeps a visit open). Older members are trimmed
+  on every write.
+- ``visitors:<venue_id>:<YYYY-MM-DD>`` is a HyperLogLog of the users seen inside on that
+  local day (``VENUES_TIMEZONE``). ``PFCOUNT`` estimates unique visitors with about 0.8%
+  error, in 12 KB per venue and day.
+
+Reads are one pipelined round trip. Each write reads the touched venues' counts back in
+the same pipeline, and the worker broadcasts them as ``venue.occupancy_updated`` for live
+subscribers. The sketches expire after ``SKETCH_TTL``; the nightly ``persist_daily`` job
+(``make db-persist-visitors``) copies each day's estimates into ``venuevisitors`` for
+history.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import redis
+import structlog
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.task_queue import TaskQueue
+
+logger = structlog.get_logger(__name__)
+
+# Sketches outlive their day long enough for the nightly job to persist them.
+SKETCH_TTL = int(timedelta(days=3).total_seconds())
+
+_PERSIST_SQL = text(
+    """
+    INSERT INTO venuevisitors (venue_id, day, unique_visitors)
+    SELECT c.venue_id, CAST(:day AS date), c.unique_visitors
+    FROM unnest(CAST(:venue_ids AS uuid[]), CAST(:counts AS integer[]))
+        AS c(venue_id, unique_visitors)
+    JOIN venues AS v ON v.id = c.venue_id
+    ON CONFLICT (venue_id, day) DO UPDATE SET unique_visitors = EXCLUDED.unique_visitors
+    """
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    venue_id: UUID
+    day: date
+    present: int
+    unique_visitors: int
+
+    def as_payload(self) -> dict[str, Any]:
+        return {
+            "venue_id": str(self.venue_id),
+            "day": self.day.isoformat(),
+            "present": self.present,
+            "unique_visitors": self.unique_visitors,
+        }
+
+
+class VenueOccupancy:
+    """Per-venue presence windows and daily unique-visitor sketches."""
+
+    def __init__(
+        self,
+        url: str,
+        window: int = 900,
+        timezone: str = "UTC",
+        events: TaskQueue | None = None,
+    ):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._window = window
+        self._zone = ZoneInfo(timezone)
+        self._events = events
+
+    def record(self, visits: list[dict[str, Any]]) -> list[Snapshot]:
+        """Mark each visit's user as present at its venue and count them for its day(s).
+
+        Returns the touched venues' counts after the write.
+        """
+
+        now = time.time()
+        today = self._day(datetime.now(self._zone))
+        venue_ids = list(dict.fromkeys(visit["venue_id"] for visit in visits))
+        with self._client.pipeline(transaction=False) as pipe:
+            for visit in visits:
+                venue_id, user_id = visit["venue_id"], visit["user_id"]
+                entered = datetime.fromisoformat(visit["entered_at"])
+                exited = datetime.fromisoformat(visit["exited_at"])
+                present = f"occupancy:{venue_id}"
+                pipe.zadd(present, {user_id: exited.timestamp()}, gt=True)
+                pipe.zremrangebyscore(present, "-inf", f"({now - self._window}")
+                pipe.expire(present, self._window)
+                for day in {self._day(entered), self._day(exited)}:
+                    sketch = _sketch_key(venue_id, day)
+                    pipe.pfadd(sketch, user_id)
+                    pipe.expire(sketch, SKETCH_TTL)
+            for venue_id in venue_ids:
+                pipe.zcount(f"occupancy:{venue_id}", now - self._window, "+inf")
+                pipe.pfcount(_sketch_key(venue_id, today))
+            results = pipe.execute()
+        counts = results[len(results) - 2 * len(venue_ids) :]
+        return [
+            Snapshot(
+                venue_id=UUID(venue_id),
+                day=today,
+                present=counts[2 * index],
+                unique_visitors=counts[2 * index + 1],
+            )
+            for index, venue_id in enumerate(venue_ids)
+        ]
+
+    def snapshot(self, venue_id: UUID) -> Snapshot:
+        """People at the venue now and unique visitors so far today."""
+
+        today = self._day(datetime.now(self._zone))
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.zcount(f"occupancy:{venue_id}", time.time() - self._window, "+inf")
+            pipe.pfcount(_sketch_key(venue_id, today))
+            present, unique_visitors = pipe.execute()
+        return Snapshot(
+            venue_id=venue_id, day=today, present=present, unique_visitors=unique_visitors
+        )
+
+    def daily_counts(self, day: date, *, batch_size: int = 1000) -> Iterator[dict[UUID, int]]:
+        """Unique-visitor estimates for every venue with a sketch for ``day``, in batches."""
+
+        batch: list[str] = []
+        for key in self._client.scan_iter(match=f"visitors:*:{day.isoformat()}", count=1000):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                yield self._count(batch)
+                batch = []
+        if batch:
+            yield self._count(batch)
+
+    def handle_venue_visited(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``venue.visited``."""
+
+        snapshots = self.record(payload["visits"])
+        if self._events is not None and snapshots:
+            self._events.publish(
+                "venue.occupancy_updated",
+                {"venues": [snapshot.as_payload() for snapshot in snapshots]},
+            )
+
+    def close(self) -> None:
+        """Close the underlying Redis connection."""
+
+        if self._client:
+            self._client.close()
+        if self._events is not None:
+            self._events.close()
+
+    def _count(self, keys: list[str]) -> dict[UUID, int]:
+        with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.pfcount(key)
+            counts = pipe.execute()
+        return {UUID(key.split(":")[1]): count for key, count in zip(keys, counts, strict=True)}
+
+    def _day(self, moment: datetime) -> date:
+        return moment.astimezone(self._zone).date()
+
+
+def persist_daily(db: Session, occupancy: VenueOccupancy, day: date) -> int:
+    """Upsert ``day``'s unique-visitor estimates into ``venuevisitors``; returns venues seen.
+
+    One statement and commit per batch of sketches; venues deleted since are skipped.
+    """
+
+    persisted = 0
+    for counts in occupancy.daily_counts(day):
+        db.execute(
+            _PERSIST_SQL,
+            {"day": day, "venue_ids": list(counts), "counts": list(counts.values())},
+        )
+        db.commit()
+        persisted += len(counts)
+    logger.info("venue_visitors_persisted", day=day.isoformat(), venues=persisted)
+    return persisted
+
+
+def _sketch_key(venue_id: UUID | str, day: date) -> str:
+    return f"visitors:{venue_id}:{day.isoformat()}"
@@ -0,0 +1,187 @@
+"""Weekly opening hours as minute-of-week ranges.
+
+``venues.opening_hours`` holds an OpenStreetMap-style string such as
+``"Mo-Th 16:00-00:00; Fr,Sa 16:00-02:00; Su off"`` (or ``"24/7"``). ``parse`` turns it
+into half-open ``[start, end)`` ranges of minutes since Monday 00:00, which are stored in
+``venues.opening_minutes`` (an ``int4multirange`` with a GiST index) so "open at" is a
+single ``@>`` probe. Times are local to ``VENUES_TIMEZONE``.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, cast
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import structlog
+from sqlalchemy import CursorResult, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Venues
+
+logger = structlog.get_logger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAYS = ("mo", "tu", "we", "th", "fr", "sa", "su")
+
+Ranges = list[tuple[int, int]]
+
+_DAY_SPAN = re.compile(r"^([a-z]{2})[a-z]*(?:\s*-\s*([a-z]{2})[a-z]*)?$")
+_TIME_SPAN = re.compile(r"^(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$")
+_RULE = re.compile(r"^((?:[a-z]+(?:\s*-\s*[a-z]+)?\s*,\s*)*[a-z]+(?:\s*-\s*[a-z]+)?)\s+(.+)$")
+_ALWAYS = {"24/7", "24 / 7"}
+_CLOSED = {"off", "closed"}
+
+_BACKFILL_SQL = text(
+    """
+    UPDATE venues AS v SET opening_minutes = CAST(b.minutes AS int4multirange)
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:minutes AS text[])) AS b(id, minutes)
+    WHERE v.id = b.id AND v.opening_minutes IS DISTINCT FROM CAST(b.minutes AS int4multirange)
+    """
+)
+
+
+class OpeningHoursError(ValueError):
+    """Raised when an opening-hours string cannot be parsed."""
+
+
+@dataclass
+class BackfillResult:
+    scanned: int = 0
+    updated: int = 0
+    unparsed: int = 0
+
+
+def parse(value: str) -> Ranges:
+    """Parse an opening-hours string into sorted, merged minute-of-week ranges.
+
+    Rules are separated by ``;`` and apply to the listed days (every day when no days
+    are given); a later rule replaces earlier ones for its days. A closing time at or
+    before the opening time runs past midnight into the next day.
+    """
+
+    source = value.strip().lower()
+    if source in _ALWAYS:
+        return [(0, MINUTES_PER_WEEK)]
+
+    daily: dict[int, list[tuple[int, int]]] = {}
+    for rule in filter(None, (part.strip() for part in source.split(";"))):
+        match = _RULE.match(rule)
+        if match:
+            days, times = _parse_days(match.group(1)), match.group(2)
+        else:
+            days, times = list(range(7)), rule
+        spans = [] if times in _CLOSED else [_parse_time_span(part) for part in times.split(",")]
+        for day in days:
+            daily[day] = spans
+
+    ranges: Ranges = []
+    for day, spans in daily.items():
+        for opens, closes in spans:
+            start = day * MINUTES_PER_DAY + opens
+            end = day * MINUTES_PER_DAY + closes
+            if end > MINUTES_PER_WEEK:
+                ranges.append((start, MINUTES_PER_WEEK))
+                start, end = 0, end - MINUTES_PER_WEEK
+            ranges.append((start, end))
+    return _merge(ranges)
+
+
+def minute_of_week(moment: datetime, zone: ZoneInfo) -> int:
+    """Minutes since Monday 00:00 for ``moment`` in ``zone`` (naive values are taken as local)."""
+
+    local = moment.astimezone(zone) if moment.tzinfo else moment
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+
+def to_multirange(ranges: Ranges) -> str:
+    """Render ranges as an ``int4multirange`` literal."""
+
+    return "{" + ",".join(f"[{start},{end})" for start, end in ranges) + "}"
+
+
+def backfill(db: Session, *, batch_size: int = 1000) -> BackfillResult:
+    """(Re)compute ``opening_minutes`` for every venue with opening hours, in id order.
+
+    Each batch is one ``UPDATE ... FROM unnest(...)`` in its own short transaction.
+    Strings that do not parse leave the column ``NULL`` and are logged.
+    """
+
+    result = BackfillResult()
+    last_id: UUID | None = None
+    while True:
+        stmt = (
+            select(Venues.id, Venues.opening_hours)
+            .where(Venues.opening_hours.is_not(None))
+            .order_by(Venues.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(Venues.id > last_id)
+        rows = db.execute(stmt).all()
+        if not rows:
+            break
+
+        ids, minutes = [], []
+        for row in rows:
+            try:
+                literal = to_multirange(parse(row.opening_hours))
+            except OpeningHoursError:
+                logger.warning("opening_hours_unparsed", venue_id=str(row.id))
+                result.unparsed += 1
+                literal = None
+            ids.append(row.id)
+            minutes.append(literal)
+        backfilled = db.execute(_BACKFILL_SQL, {"ids": ids, "minutes": minutes})
+        result.updated += cast(CursorResult[Any], backfilled).rowcount
+        db.commit()
+        result.scanned += len(rows)
+        last_id = rows[-1].id
+
+    logger.info(
+        "opening_hours_backfilled",
+        scanned=result.scanned,
+        updated=result.updated,
+        unparsed=result.unparsed,
+    )
+    return result
+
+
+def _parse_days(spec: str) -> list[int]:
+    days: list[int] = []
+    for part in spec.split(","):
+        match = _DAY_SPAN.match(part.strip())
+        names = [name for name in match.groups() if name] if match else []
+        if not names or any(name not in DAYS for name in names):
+            raise OpeningHoursError(f"unknown day range {part.strip()!r}")
+        first, last = DAYS.index(names[0]), DAYS.index(names[-1])
+        # Ranges may wrap around the week, e.g. "Fr-Mo".
+        days.extend((first + offset) % 7 for offset in range((last - first) % 7 + 1))
+    return days
+
+
+def _parse_time_span(spec: str) -> tuple[int, int]:
+    match = _TIME_SPAN.match(spec.strip())
+    if not match:
+        raise OpeningHoursError(f"invalid time range {spec.strip()!r}")
+    open_hour, open_minute, close_hour, close_minute = map(int, match.groups())
+    if open_hour > 23 or close_hour > 24 or open_minute > 59 or close_minute > 59:
+        raise OpeningHoursError(f"invalid time range {spec.strip()!r}")
+    opens = open_hour * 60 + open_minute
+    closes = min(close_hour * 60 + close_minute, MINUTES_PER_DAY)
+    if closes <= opens:
+        closes += MINUTES_PER_DAY
+    return opens, closes
+
+
+def _merge(ranges: Ranges) -> Ranges:
+    merged: Ranges = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
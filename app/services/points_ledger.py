@@ -0,0 +1,137 @@
+"""Points accrual through the append-only ``points`` ledger.
+
+``increment`` records an award as a single ``INSERT`` so concurrent awards to one user
+never queue on the ``users`` row (the foreign-key check only takes a ``KEY SHARE`` lock).
+``compact`` periodically folds the pending deltas into ``users.points``: each batch is one
+statement that deletes the oldest ledger rows and adds their per-user sums, so a reader
+sees every delta exactly once — either still pending or already compacted. A user's
+balance is ``users.points`` plus their pending deltas.
+
+Run a single compactor (``make points-compactor``); two of them would update the same
+users in different orders.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, cast
+from uuid import UUID
+
+import structlog
+from sqlalchemy import CursorResult, func, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Points, Users
+
+logger = structlog.get_logger(__name__)
+
+# The balance is read in the same statement as the insert, so it cannot see the new row
+# and adds the delta itself.
+_INCREMENT_SQL = text(
+    """
+    WITH entry AS (
+        INSERT INTO points (user_id, delta, reason)
+        SELECT id, :delta, :reason FROM users WHERE id = :user_id
+        RETURNING user_id
+    )
+    SELECT u.points + :delta + coalesce(
+        (SELECT sum(p.delta) FROM points AS p WHERE p.user_id = u.id), 0
+    ) AS balance
+    FROM users AS u JOIN entry ON entry.user_id = u.id
+    """
+)
+
+_COMPACT_SQL = text(
+    """
+    WITH batch AS (
+        DELETE FROM points
+        WHERE id IN (SELECT id FROM points ORDER BY id LIMIT :size)
+        RETURNING user_id, delta
+    ), totals AS (
+        SELECT user_id, sum(delta) AS delta, count(*) AS entries FROM batch GROUP BY user_id
+    )
+    UPDATE users AS u SET points = u.points + CAST(t.delta AS integer)
+    FROM totals AS t
+    WHERE u.id = t.user_id
+    RETURNING u.id, t.entries
+    """
+)
+
+
+@dataclass
+class CompactedBatch:
+    entries: int = 0
+    user_ids: list[UUID] = field(default_factory=list)
+
+
+def increment(db: Session, user_id: UUID, delta: int, reason: str | None = None) -> int | None:
+    """Record an award and return the user's new balance, or ``None`` if the user is unknown."""
+
+    balance = db.execute(
+        _INCREMENT_SQL, {"user_id": user_id, "delta": delta, "reason": reason}
+    ).scalar_one_or_none()
+    db.commit()
+    return None if balance is None else int(balance)
+
+
+def pending(db: Session, user_ids: list[UUID]) -> dict[UUID, int]:
+    """Sum of not-yet-compacted deltas per user; users with none are omitted."""
+
+    if not user_ids:
+        return {}
+    rows = db.execute(
+        select(Points.user_id, func.sum(Points.delta))
+        .where(Points.user_id.in_(user_ids))
+        .group_by(Points.user_id)
+    )
+    return {user_id: int(total) for user_id, total in rows}
+
+
+def balances(db: Session, user_ids: list[UUID]) -> dict[UUID, int]:
+    """Each user's balance, ``users.points`` plus pending deltas, read in one statement.
+
+    A single statement sees a compaction batch either entirely or not at all, so no
+    delta is counted twice or missed. Unknown users are omitted.
+    """
+
+    if not user_ids:
+        return {}
+    pending_sum = (
+        select(func.sum(Points.delta)).where(Points.user_id == Users.id).scalar_subquery()
+    )
+    rows = db.execute(
+        select(Users.id, Users.points + func.coalesce(pending_sum, 0)).where(
+            Users.id.in_(user_ids)
+        )
+    )
+    return {user_id: int(balance) for user_id, balance in rows}
+
+
+def discard_pending(db: Session, user_id: UUID) -> int:
+    """Drop a user's pending deltas, for when ``users.points`` is set outright.
+
+    Runs in the caller's transaction so the reset and the new value commit together.
+    """
+
+    result = db.execute(text("DELETE FROM points WHERE user_id = :user_id"), {"user_id": user_id})
+    return int(cast(CursorResult[Any], result).rowcount)
+
+
+def compact(db: Session, *, batch_size: int = 5000) -> Iterator[CompactedBatch]:
+    """Fold pending deltas into ``users.points``, oldest first, one transaction per batch.
+
+    Yields each committed batch and stops once a batch comes back short.
+    """
+
+    while True:
+        rows = db.execute(_COMPACT_SQL, {"size": batch_size}).all()
+        db.commit()
+        batch = CompactedBatch(
+            entries=sum(row.entries for row in rows),
+            user_ids=[row.id for row in rows],
+        )
+        if batch.entries:
+            logger.info("points_compacted", entries=batch.entries, users=len(batch.user_ids))
+            yield batch
+        if batch.entries < batch_size:
+            return
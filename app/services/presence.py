@@ -0,0 +1,225 @@
+"""Latest known location per user, in Postgres and as Redis GEO presence.
+
+The footsteps ingest pipeline upserts ``userlocations`` (one row per user) with a single
+statement per batch, keeping only points newer than the stored one. The rows it changed
+are then mirrored into Redis: ``presence:geo`` is a GEO set of user positions, and
+``presence:seen`` is a sorted set of last-seen timestamps. GEO members cannot expire on
+their own, so anyone not seen for ``PRESENCE_TTL`` seconds is pruned from both keys on
+every write and nearby read.
+
+A nearby query is one Lua call: a single ``GEOSEARCH`` around the user or, when only
+their accepted follows are wanted, a ``GEODIST`` from the user to each follow in the
+``follows:<user_id>`` set maintained by ``RelationshipCache``.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+import redis
+import structlog
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.models import UserLocations
+from app.models.followers import StatusEnum
+from app.services.relationship_cache import SENTINEL
+
+logger = structlog.get_logger(__name__)
+
+# Stale members removed per script call; the rest go on later calls.
+PRUNE_LIMIT = 500
+# Redis GEO only indexes latitudes the Web Mercator projection covers.
+MAX_LATITUDE = 85.05112878
+
+_UPSERT_SQL = text(
+    """
+    INSERT INTO userlocations (user_id, coordinates, recorded_at)
+    SELECT DISTINCT ON (l.user_id) l.user_id, l.coordinates, l.recorded_at
+    FROM unnest(
+        CAST(:user_ids AS uuid[]), CAST(:coordinates AS text[]), CAST(:times AS timestamptz[])
+    ) AS l(user_id, coordinates, recorded_at)
+    ORDER BY l.user_id, l.recorded_at DESC
+    ON CONFLICT (user_id) DO UPDATE
+    SET coordinates = EXCLUDED.coordinates, recorded_at = EXCLUDED.recorded_at
+    WHERE userlocations.recorded_at < EXCLUDED.recorded_at
+    RETURNING user_id, recorded_at
+    """
+)
+
+_PRUNE = f"""
+local stale = redis.call(
+    'ZRANGEBYSCORE', KEYS[2], '-inf', '(' .. ARGV[1], 'LIMIT', 0, {PRUNE_LIMIT}
+)
+if #stale > 0 then
+    redis.call('ZREM', KEYS[1], unpack(stale))
+    redis.call('ZREM', KEYS[2], unpack(stale))
+end
+"""
+
+# KEYS: geo, seen. ARGV: cutoff, then (member, lon, lat, seen) per position.
+_UPDATE_SCRIPT = _PRUNE + """
+local updated = 0
+for index = 2, #ARGV, 4 do
+    local member, seen = ARGV[index], tonumber(ARGV[index + 3])
+    local current = redis.call('ZSCORE', KEYS[2], member)
+    if seen >= tonumber(ARGV[1]) and (not current or tonumber(current) < seen) then
+        redis.call('GEOADD', KEYS[1], ARGV[index + 1], ARGV[index + 2], member)
+        redis.call('ZADD', KEYS[2], seen, member)
+        updated = updated + 1
+    end
+end
+return updated
+"""
+
+# KEYS: geo, seen, follows set. ARGV: cutoff, user id, radius (m), limit, restrict flag,
+# loaded sentinel, member prefix. Returns false when the user has no live position,
+# {0} when the follows set is not loaded, and {1, member, distance, ...} otherwise.
+# Restricted searches walk the follows set (one GEODIST per accepted follow) rather than
+# everyone in the radius, so their cost is bounded by the user's follows either way.
+_NEARBY_SCRIPT = _PRUNE + """
+local seen = redis.call('ZSCORE', KEYS[2], ARGV[2])
+if not seen or tonumber(seen) < tonumber(ARGV[1]) then
+    return false
+end
+local limit = tonumber(ARGV[4])
+local result = {1}
+if ARGV[5] == '1' then
+    if redis.call('SISMEMBER', KEYS[3], ARGV[6]) == 0 then
+        return {0}
+    end
+    local radius, prefix, hits = tonumber(ARGV[3]), ARGV[7], {}
+    for _, entry in ipairs(redis.call('SMEMBERS', KEYS[3])) do
+        if string.sub(entry, 1, #prefix) == prefix then
+            local member = string.sub(entry, #prefix + 1)
+            local distance = redis.call('GEODIST', KEYS[1], ARGV[2], member, 'm')
+            if distance and member ~= ARGV[2] and tonumber(distance) <= radius then
+                hits[#hits + 1] = {member, distance}
+            end
+        end
+    end
+    table.sort(hits, function(a, b) return tonumber(a[2]) < tonumber(b[2]) end)
+    for index = 1, math.min(#hits, limit) do
+        result[#result + 1] = hits[index][1]
+        result[#result + 1] = hits[index][2]
+    end
+    return result
+end
+local hits = redis.call(
+    'GEOSEARCH', KEYS[1], 'FROMMEMBER', ARGV[2], 'BYRADIUS', ARGV[3], 'm', 'ASC',
+    'COUNT', limit + 1, 'WITHDIST'
+)
+for _, hit in ipairs(hits) do
+    if hit[1] ~= ARGV[2] and #result <= 2 * limit then
+        result[#result + 1] = hit[1]
+        result[#result + 1] = hit[2]
+    end
+end
+return result
+"""
+
+
+class Presence:
+    """Redis GEO positions of recently seen users."""
+
+    def __init__(self, url: str, ttl: int = 900, namespace: str = "presence"):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._ttl = ttl
+        self._keys = [f"{namespace}:geo", f"{namespace}:seen"]
+        self._update = self._client.register_script(_UPDATE_SCRIPT)
+        self._nearby = self._client.register_script(_NEARBY_SCRIPT)
+
+    def update(self, positions: Sequence[tuple[UUID, float, float, datetime]]) -> int:
+        """Move users to ``(lon, lat)`` unless a newer position is already stored."""
+
+        args: list[Any] = [self._cutoff()]
+        for user_id, longitude, latitude, seen in positions:
+            if abs(latitude) > MAX_LATITUDE:
+                continue
+            args.extend((str(user_id), longitude, latitude, seen.timestamp()))
+        if len(args) == 1:
+            return 0
+        return int(self._update(keys=self._keys, args=args))
+
+    def nearby(
+        self, user_id: UUID, radius: float, limit: int, follows_key: str | None = None
+    ) -> list[tuple[UUID, float]] | None:
+        """Users within ``radius`` metres of ``user_id``, nearest first.
+
+        With ``follows_key`` only the user's accepted follows are returned. Returns
+        ``None`` when the user has no live position.
+
+        Raises ``LookupError`` when ``follows_key`` is not loaded.
+        """
+
+        found = self._nearby(
+            keys=[*self._keys, follows_key or self._keys[0]],
+            args=[
+                self._cutoff(),
+                str(user_id),
+                radius,
+                limit,
+                "1" if follows_key else "0",
+                SENTINEL,
+                f"{StatusEnum.ACCEPTED.value}:",
+            ],
+        )
+        if found is None:
+            return None
+        if found[0] == 0:
+            raise LookupError(follows_key)
+        return [
+            (UUID(found[index]), float(found[index + 1])) for index in range(1, len(found), 2)
+        ]
+
+    def remove(self, user_id: UUID) -> None:
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.zrem(self._keys[0], str(user_id))
+            pipe.zrem(self._keys[1], str(user_id))
+            pipe.execute()
+
+    def handle_user_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``user.deleted``."""
+
+        self.remove(UUID(payload["id"]))
+
+    def close(self) -> None:
+        """Close the underlying Redis connection."""
+
+        if self._client:
+            self._client.close()
+
+    def _cutoff(self) -> float:
+        return time.time() - self._ttl
+
+
+def upsert_latest(
+    db: Session,
+    user_ids: Sequence[UUID],
+    coordinates: Sequence[str],
+    times: Sequence[datetime],
+) -> list[tuple[UUID, datetime]]:
+    """Keep each user's newest point from a batch; returns the users whose row moved.
+
+    Runs in the caller's transaction.
+    """
+
+    rows = db.execute(
+        _UPSERT_SQL,
+        {"user_ids": list(user_ids), "coordinates": list(coordinates), "times": list(times)},
+    ).all()
+    return [(row.user_id, row.recorded_at) for row in rows]
+
+
+def stored_latest(db: Session, user_ids: Sequence[UUID]) -> dict[UUID, tuple[str, datetime]]:
+    """The stored ``(coordinates, recorded_at)`` of each of these users that has a location."""
+
+    rows = db.execute(
+        select(UserLocations.user_id, UserLocations.coordinates, UserLocations.recorded_at).where(
+            UserLocations.user_id.in_(set(user_ids))
+        )
+    ).all()
+    return {row.user_id: (row.coordinates, row.recorded_at) for row in rows}
@@ -0,0 +1,187 @@
+"""Redis mirror of each user's outgoing follow edges for follow-button lookups.
+
+``follows:<user_id>`` is a set with one ``<STATUS>:<followed_id>`` member per
+``ACCEPTED`` or ``PENDING`` relationship the user started, plus a ``*`` sentinel that
+marks the set as loaded (so "follows nobody" is distinguishable from "not cached").
+A batch lookup is then a single ``SMISMEMBER``. Sets are filled from Postgres on a miss
+and kept current by the worker from ``follow.*`` / ``user.deleted`` events; the TTL
+bounds any drift from an event racing a refill.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+from uuid import UUID
+
+import redis
+import structlog
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.models import Followers, Users
+from app.models.followers import StatusEnum
+
+logger = structlog.get_logger(__name__)
+
+Statuses = dict[UUID, StatusEnum | None]
+
+SENTINEL = "*"
+MIRRORED = (StatusEnum.ACCEPTED, StatusEnum.PENDING)
+
+# Edit a set only if it is loaded; an absent set is rebuilt on its next read instead.
+_APPLY_SCRIPT = """
+if redis.call('SISMEMBER', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('SREM', KEYS[1], unpack(ARGV, 3))
+if ARGV[2] ~= '' then
+    redis.call('SADD', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
+class RelationshipCache:
+    """Per-user Redis sets of accepted and pending follows."""
+
+    def __init__(self, url: str, namespace: str = "follows", ttl: int = 3600):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._namespace = namespace
+        self._ttl = ttl
+        self._apply = self._client.register_script(_APPLY_SCRIPT)
+
+    def lookup(self, db: Session, user_id: UUID, target_ids: Sequence[UUID]) -> Statuses | None:
+        """Return ``user_id``'s status towards each target, or ``None`` for an unknown user."""
+
+        key = self.key(user_id)
+        members = [SENTINEL]
+        members.extend(_member(status, target) for target in target_ids for status in MIRRORED)
+        try:
+            flags = self._client.smismember(key, members)  # type: ignore[no-untyped-call]
+        except redis.RedisError:
+            logger.warning("relationship_cache_unavailable", user_id=str(user_id))
+            return _load(db, user_id, target_ids)
+
+        if flags[0]:
+            statuses: Statuses = {}
+            for offset, target in enumerate(target_ids):
+                accepted, pending = flags[1 + 2 * offset : 3 + 2 * offset]
+                statuses[target] = (
+                    StatusEnum.ACCEPTED if accepted else StatusEnum.PENDING if pending else None
+                )
+            return statuses
+
+        edges = _load(db, user_id, None)
+        if edges is None:
+            return None
+        self._fill(key, edges)
+        return {target: edges.get(target) for target in target_ids}
+
+    def load(self, db: Session, user_id: UUID) -> bool:
+        """Fill the user's set from Postgres; ``False`` for an unknown user."""
+
+        edges = _load(db, user_id, None)
+        if edges is None:
+            return False
+        self._fill(self.key(user_id), edges)
+        return True
+
+    def handle_follow_changed(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.created`` / ``follow.updated``."""
+
+        row = db.execute(
+            select(Followers.follower_id, Followers.followed_id, Followers.status).where(
+                Followers.id == UUID(payload["id"])
+            )
+        ).one_or_none()
+        if row is None:
+            return
+        self._set_many([(row.follower_id, row.followed_id, row.status)])
+
+    def handle_follow_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.deleted``."""
+
+        self._set_many([(UUID(payload["follower_id"]), UUID(payload["followed_id"]), None)])
+
+    def handle_follows_bulk_updated(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.bulk_updated``."""
+
+        rows = db.execute(
+            select(Followers.follower_id, Followers.followed_id, Followers.status).where(
+                Followers.id.in_([UUID(identifier) for identifier in payload["ids"]])
+            )
+        ).all()
+        self._set_many([(row.follower_id, row.followed_id, row.status) for row in rows])
+
+    def handle_follows_bulk_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``follow.bulk_deleted``."""
+
+        self._set_many(
+            [
+                (UUID(relationship["follower_id"]), UUID(relationship["followed_id"]), None)
+                for relationship in payload["relationships"]
+            ]
+        )
+
+    def handle_user_deleted(self, db: Session, payload: dict[str, Any]) -> None:
+        """Worker handler for ``user.deleted``."""
+
+        self._client.delete(self.key(UUID(payload["id"])))
+
+    def close(self) -> None:
+        """Close the underlying Redis connection."""
+
+        if self._client:
+            self._client.close()
+
+    def key(self, user_id: UUID) -> str:
+        return f"{self._namespace}:{user_id}"
+
+    def _fill(self, key: str, edges: Statuses) -> None:
+        members = [_member(status, target) for target, status in edges.items() if status]
+        try:
+            with self._client.pipeline() as pipe:
+                pipe.delete(key)
+                pipe.sadd(key, SENTINEL, *members)
+                pipe.expire(key, self._ttl)
+                pipe.execute()
+        except redis.RedisError:
+            logger.warning("relationship_cache_fill_failed", key=key)
+
+    def _set_many(self, edges: Sequence[tuple[UUID, UUID, StatusEnum | None]]) -> None:
+        with self._client.pipeline(transaction=False) as pipe:
+            for follower_id, followed_id, status in edges:
+                member = _member(status, followed_id) if status in MIRRORED else ""
+                stale = [_member(mirrored, followed_id) for mirrored in MIRRORED]
+                self._apply(
+                    keys=[self.key(follower_id)], args=[SENTINEL, member, *stale], client=pipe
+                )
+            pipe.execute()
+
+
+def _member(status: StatusEnum, target_id: UUID) -> str:
+    return f"{status.value}:{target_id}"
+
+
+def _load(db: Session, user_id: UUID, target_ids: Sequence[UUID] | None) -> Statuses | None:
+    """Read the user's mirrored edges from Postgres, optionally only towards ``target_ids``.
+
+    Returns ``None`` when the user does not exist.
+    """
+
+    edge = and_(Followers.follower_id == Users.id, Followers.status.in_(MIRRORED))
+    if target_ids is not None:
+        edge = and_(edge, Followers.followed_id.in_(target_ids))
+    rows = db.execute(
+        select(Followers.followed_id, Followers.status)
+        .select_from(Users)
+        .outerjoin(Followers, edge)
+        .where(Users.id == user_id)
+    ).all()
+    if not rows:
+        return None
+
+    edges: Statuses = {row.followed_id: row.status for row in rows if row.followed_id}
+    if target_ids is None:
+        return edges
+    return {target: edges.get(target) for target in target_ids}
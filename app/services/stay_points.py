@@ -0,0 +1,294 @@
+"""Stay-point detection: visits inferred from raw footsteps.
+
+Geofencing only sees venues with an accurate ``area``. This offline job looks instead
+for places where a user stayed put. A stay point is a run of consecutive footsteps of
+one user that all lie within ``radius`` metres of the first one and span at least
+``min_dwell`` seconds. A silence longer than ``max_gap`` also ends a run. Each stay
+point's centroid is snapped to the nearest active venue within ``snap`` metres, using
+the GiST index on ``venues.location``. The resulting visits are written in bulk with
+``geofence.merge_visits``: stays of one user at one venue within ``max_gap`` of each
+other or of a stored visit are merged into a single visit (so a long dwell the detector
+split in two, or a rerun, lands on one visit); the rest are inserted with ``inferred``
+set.
+
+The window's footsteps are streamed ordered by user and time. They are cut into chunks
+of about ``chunk_size`` rows at user boundaries, so every user is detected in one piece.
+Detection is vectorised over the whole chunk. Windowed passes compare every footstep
+with the next ones of the same user to find which footsteps start a long enough dwell.
+Then only the chosen stays are walked to their end. Each chunk is one snap statement,
+one merge and one commit, so memory stays flat and a rerun over the same window only
+extends the visits it wrote before.
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import structlog
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services import geofence, geometry
+
+logger = structlog.get_logger(__name__)
+
+# Later footsteps compared against each footstep per pass.
+WINDOW = 32
+
+_FOOTSTEPS_SQL = text(
+    """
+    SELECT user_id, coordinates, created_at
+    FROM footsteps
+    WHERE created_at >= :start AND created_at < :end
+    ORDER BY user_id, created_at
+    """
+)
+
+_SNAP_SQL = text(
+    """
+    SELECT s.user_id, nearest.venue_id, s.entered_at, s.exited_at
+    FROM unnest(
+        CAST(:user_ids AS uuid[]),
+        CAST(:xs AS double precision[]),
+        CAST(:ys AS double precision[]),
+        CAST(:entered AS timestamptz[]),
+        CAST(:exited AS timestamptz[])
+    ) AS s(user_id, x, y, entered_at, exited_at)
+    CROSS JOIN LATERAL (
+        SELECT v.id AS venue_id
+        FROM venues AS v
+        WHERE v.is_active
+          AND ST_DWithin(v.location, ST_SetSRID(ST_MakePoint(s.x, s.y), 4326)::geography, :snap)
+        ORDER BY v.location <-> ST_SetSRID(ST_MakePoint(s.x, s.y), 4326)::geography
+        LIMIT 1
+    ) AS nearest
+    """
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StayPoints:
+    """Stays as ``first`` / ``last`` footstep indices and the centroid of each."""
+
+    first: npt.NDArray[np.intp]
+    last: npt.NDArray[np.intp]
+    xs: geometry.Vertices
+    ys: geometry.Vertices
+
+
+@dataclass
+class InferenceStats:
+    footsteps: int = 0
+    users: int = 0
+    stay_points: int = 0
+    inserted: int = 0
+    extended: int = 0
+    elapsed: float = 0.0
+
+
+def detect(
+    users: npt.NDArray[np.int_],
+    xs: geometry.Vertices,
+    ys: geometry.Vertices,
+    times: npt.NDArray[np.float64],
+    *,
+    radius: float,
+    min_dwell: float,
+    max_gap: float,
+) -> StayPoints:
+    """Stay points of footsteps sorted by user, then epoch-second ``times``."""
+
+    size = len(xs)
+    if size == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return StayPoints(first=empty, last=empty, xs=np.zeros(0), ys=np.zeros(0))
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    ends = np.r_[starts[1:], size]
+    group_end = np.repeat(ends, ends - starts)
+    broken = np.r_[False, np.diff(times) > max_gap]
+
+    # A footstep can start a stay when the footsteps after it stay inside the radius for
+    # at least ``min_dwell``; passes stop as soon as that is settled either way.
+    dwells = np.zeros(size, dtype=bool)
+    pending = np.arange(size)
+    offset = 1
+    while len(pending):
+        window = pending[:, None] + offset + np.arange(WINDOW)
+        valid = window < group_end[pending, None]
+        window = np.minimum(window, size - 1)
+        origin = pending[:, None]
+        gone = geometry.metres_between(xs[origin], ys[origin], xs[window], ys[window]) > radius
+        hits = valid & (gone | broken[window])
+        found = hits.any(axis=1)
+        # The last footstep known to be inside: before the first one outside, else the
+        # last one compared.
+        inside = np.where(
+            found,
+            window[np.arange(len(pending)), hits.argmax(axis=1)] - 1,
+            np.minimum(pending + offset + WINDOW, group_end[pending]) - 1,
+        )
+        settled = times[inside] - times[pending] >= min_dwell
+        dwells[pending[settled]] = True
+        pending = pending[~found & valid[:, -1] & ~settled]
+        offset += WINDOW
+
+    # Greedy left to right: the next stay starts at the first such footstep after the
+    # previous stay ended, and footsteps in between are passed by.
+    candidates = np.flatnonzero(dwells).tolist()
+    first: list[int] = []
+    last: list[int] = []
+    position = index = 0
+    while (index := bisect.bisect_left(candidates, position, index)) < len(candidates):
+        start = candidates[index]
+        end = _last_inside(xs, ys, broken, start, int(group_end[start]), radius)
+        first.append(start)
+        last.append(end)
+        position = end + 1
+
+    firsts = np.array(first, dtype=np.intp)
+    lasts = np.array(last, dtype=np.intp)
+    counts = lasts - firsts + 1
+    sums_x = np.r_[0.0, np.cumsum(xs)]
+    sums_y = np.r_[0.0, np.cumsum(ys)]
+    return StayPoints(
+        first=firsts,
+        last=lasts,
+        xs=(sums_x[lasts + 1] - sums_x[firsts]) / counts,
+        ys=(sums_y[lasts + 1] - sums_y[firsts]) / counts,
+    )
+
+
+def infer_visits(
+    read_db: Session,
+    write_db: Session,
+    start: datetime,
+    end: datetime,
+    *,
+    radius: float,
+    min_dwell: timedelta,
+    snap: float,
+    max_gap: timedelta,
+    chunk_size: int = 200_000,
+) -> InferenceStats:
+    """Detect stay points in ``[start, end)`` and write them as visits, chunk by chunk.
+
+    ``read_db`` streams footsteps while ``write_db`` commits each chunk's visits.
+    """
+
+    started = time.perf_counter()
+    stats = InferenceStats()
+    for rows in _chunks(read_db, start, end, chunk_size):
+        user_ids = [row.user_id for row in rows]
+        changes = np.r_[False, np.array(user_ids[1:]) != np.array(user_ids[:-1])]
+        points = np.array([geometry.parse_point(row.coordinates) for row in rows], dtype=float)
+        times = np.array([row.created_at.timestamp() for row in rows], dtype=np.float64)
+        stays = detect(
+            np.cumsum(changes),
+            points[:, 0],
+            points[:, 1],
+            times,
+            radius=radius,
+            min_dwell=min_dwell.total_seconds(),
+            max_gap=max_gap.total_seconds(),
+        )
+        inserted, extended = _write(write_db, rows, stays, snap=snap, gap=max_gap)
+        stats.footsteps += len(rows)
+        stats.users += int(changes.sum()) + 1
+        stats.stay_points += len(stays.first)
+        stats.inserted += inserted
+        stats.extended += extended
+        logger.info(
+            "stay_points_chunk_written",
+            footsteps=len(rows),
+            stay_points=len(stays.first),
+            inserted=inserted,
+            extended=extended,
+        )
+    read_db.rollback()
+
+    stats.elapsed = time.perf_counter() - started
+    logger.info(
+        "stay_points_inferred",
+        footsteps=stats.footsteps,
+        users=stats.users,
+        stay_points=stats.stay_points,
+        inserted=stats.inserted,
+        extended=stats.extended,
+        elapsed=round(stats.elapsed, 3),
+    )
+    return stats
+
+
+def _chunks(db: Session, start: datetime, end: datetime, chunk_size: int) -> Iterator[list[Any]]:
+    result = db.execute(
+        _FOOTSTEPS_SQL, {"start": start, "end": end}, execution_options={"yield_per": chunk_size}
+    )
+    pending: list[Any] = []
+    for partition in result.partitions():
+        pending.extend(partition)
+        if len(pending) < chunk_size:
+            continue
+        # The last user may go on in the next partition; hold their rows back.
+        cut = len(pending)
+        while cut and pending[cut - 1].user_id == pending[-1].user_id:
+            cut -= 1
+        if cut:
+            yield pending[:cut]
+            pending = pending[cut:]
+    if pending:
+        yield pending
+
+
+def _write(
+    db: Session, rows: Sequence[Any], stays: StayPoints, *, snap: float, gap: timedelta
+) -> tuple[int, int]:
+    if not len(stays.first):
+        return 0, 0
+    first, last = stays.first.tolist(), stays.last.tolist()
+    segments = db.execute(
+        _SNAP_SQL,
+        {
+            "user_ids": [rows[index].user_id for index in first],
+            "xs": stays.xs.tolist(),
+            "ys": stays.ys.tolist(),
+            "entered": [rows[index].created_at for index in first],
+            "exited": [rows[index].created_at for index in last],
+            "snap": snap,
+        },
+    ).all()
+    visits = geofence.merge_visits(
+        db,
+        [(row.user_id, row.venue_id, row.entered_at, row.exited_at) for row in segments],
+        gap=gap,
+        inferred=True,
+    )
+    db.commit()
+    inserted = sum(1 for visit in visits if visit.is_new)
+    return inserted, len(visits) - inserted
+
+
+def _last_inside(
+    xs: geometry.Vertices,
+    ys: geometry.Vertices,
+    broken: npt.NDArray[np.bool_],
+    first: int,
+    end: int,
+    radius: float,
+) -> int:
+    # Scan ever larger slices, so a long stay costs a handful of vectorised steps.
+    start, size = first + 1, WINDOW
+    while start < end:
+        stop = min(end, start + size)
+        gone = geometry.metres_between(xs[first], ys[first], xs[start:stop], ys[start:stop])
+        left = (gone > radius) | broken[start:stop]
+        if left.any():
+            return start + int(left.argmax()) - 1
+        start, size = stop, size * 2
+    return end - 1
+
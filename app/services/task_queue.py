@@ -11,25 +11,44 @@ logger = structlog.get_logger(__name__)
 
 
 class TaskQueue:
-    """Minimal Redis-backed FIFO queue."""
+    """Minimal Redis-backed FIFO queue on the ``<namespace>:stream`` stream.
+
+    ``TaskWorker`` reads it through a consumer group and acknowledges each message once
+    handled. Every message is also published on ``<namespace>:events`` so per-process
+    listeners (``EventSubscriber``) see it without competing with the worker.
+    """
 
     def __init__(self, url: str, namespace: str = "tasks"):
         self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
         self._namespace = namespace
 
     def enqueue(self, task: str, payload: dict[str, Any] | None = None) -> None:
-        """Push a JSON payload onto the queue."""
+        """Append a JSON payload to the queue and broadcast it."""
 
-        message = {
-            "task": task,
-            "payload": payload or {},
-            "enqueued_at": datetime.now(timezone.utc).isoformat(),
-        }
-        self._client.lpush(self._namespace, json.dumps(message))
+        message = _message(task, payload)
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.xadd(f"{self._namespace}:stream", {"message": message})
+            pipe.publish(f"{self._namespace}:events", message)
+            pipe.execute()
         logger.info("task_enqueued", task=task)
 
+    def publish(self, task: str, payload: dict[str, Any] | None = None) -> None:
+        """Broadcast a message to per-process listeners only, without queueing it."""
+
+        self._client.publish(f"{self._namespace}:events", _message(task, payload))
+
     def close(self) -> None:
         """Close the underlying Redis connection."""
 
         if self._client:
             self._client.close()
+
+
+def _message(task: str, payload: dict[str, Any] | None) -> str:
+    return json.dumps(
+        {
+            "task": task,
+            "payload": payload or {},
+            "enqueued_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
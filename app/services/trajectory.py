@@ -0,0 +1,143 @@
+"""Trajectory thinning for footsteps batches.
+
+Most raw pings carry no new information: a user standing at a bar reports the same
+spot every few seconds, and a user walking down a street reports points on a straight
+line. Each user's pings in a batch are thinned in two passes before they are stored:
+
+1. Spatial de-duplication drops a ping within ``min_distance`` metres *and*
+   ``min_interval`` seconds of the user's previous kept point, which for the first ping
+   is the stored ``userlocations`` row. Someone standing still still keeps a point every
+   ``min_interval`` seconds, so their visits keep growing.
+2. Douglas-Peucker (``geometry.simplify_mask``) runs over moving runs, meaning kept points
+   each more than ``min_distance`` from the one before, and drops those within
+   ``tolerance`` metres of the simplified path. Stationary points are never simplified
+   away, so the dwell time of a visit survives.
+
+De-duplication first finds, for every ping of the batch at once, the next ping of the
+same user that is far or late enough from it, comparing windows of ``WINDOW`` pings per
+pass. The kept pings are then the chain of those links from each user's first point.
+"""
+from __future__ import annotations
+
+import math
+from collections.abc import Hashable, Mapping, Sequence
+from typing import TypeVar
+
+import numpy as np
+import numpy.typing as npt
+
+from app.services import geometry
+
+# Later pings compared against each ping per pass.
+WINDOW = 32
+
+# Longitude, latitude and epoch seconds of a user's last stored point.
+Anchor = tuple[float, float, float]
+UserT = TypeVar("UserT", bound=Hashable)
+
+
+def thin(
+    user_ids: Sequence[UserT],
+    xs: geometry.Vertices,
+    ys: geometry.Vertices,
+    times: npt.NDArray[np.float64],
+    anchors: Mapping[UserT, Anchor],
+    *,
+    min_distance: float,
+    min_interval: float,
+    tolerance: float,
+) -> npt.NDArray[np.bool_]:
+    """Which pings of a batch to store, given epoch-second ``times`` and stored ``anchors``."""
+
+    count = len(xs)
+    if count == 0:
+        return np.zeros(0, dtype=bool)
+    codes: dict[UserT, int] = {}
+    users = np.array([codes.setdefault(user_id, len(codes)) for user_id in user_ids], dtype=int)
+    stored = np.array(
+        [(codes[user_id], *anchor) for user_id, anchor in anchors.items() if user_id in codes],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+
+    # Stored points go first among each user's pings of the same time.
+    users = np.concatenate([users, stored[:, 0].astype(int)])
+    x = np.concatenate([xs, stored[:, 1]])
+    y = np.concatenate([ys, stored[:, 2]])
+    t = np.concatenate([times, stored[:, 3]])
+    own = np.arange(len(x)) < count
+    order = np.lexsort((own, t, users))
+    users, x, y, t = users[order], x[order], y[order], t[order]
+
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    ends = np.r_[starts[1:], len(x)]
+    kept = _deduplicate(x, y, t, starts, ends, min_distance, min_interval)
+    if tolerance > 0:
+        _simplify_moving(kept, x, y, users, min_distance, tolerance)
+
+    keep = np.zeros(count, dtype=bool)
+    mine = own[order]
+    keep[order[mine]] = kept[mine]
+    return keep
+
+
+def _deduplicate(
+    x: geometry.Vertices,
+    y: geometry.Vertices,
+    t: npt.NDArray[np.float64],
+    starts: npt.NDArray[np.int_],
+    ends: npt.NDArray[np.int_],
+    min_distance: float,
+    min_interval: float,
+) -> npt.NDArray[np.bool_]:
+    # For every ping, the first later ping of the same user far or late enough from it.
+    size = len(x)
+    group_end = np.repeat(ends, ends - starts)
+    following = np.full(size, -1)
+    pending = np.arange(size)
+    offset = 1
+    while len(pending):
+        window = pending[:, None] + offset + np.arange(WINDOW)
+        valid = window < group_end[pending, None]
+        window = np.minimum(window, size - 1)
+        origin = pending[:, None]
+        far = geometry.metres_between(x[origin], y[origin], x[window], y[window]) > min_distance
+        late = t[window] - t[origin] >= min_interval
+        hits = valid & (far | late)
+        found = hits.any(axis=1)
+        following[pending[found]] = window[found, hits[found].argmax(axis=1)]
+        pending = pending[~found & valid[:, -1]]
+        offset += WINDOW
+
+    # Each user's kept pings are then a chain from their first one.
+    chain = following.tolist()
+    kept_indices = []
+    for index in starts.tolist():
+        while index >= 0:
+            kept_indices.append(index)
+            index = chain[index]
+    kept = np.zeros(size, dtype=bool)
+    kept[kept_indices] = True
+    return kept
+
+
+def _simplify_moving(
+    kept: npt.NDArray[np.bool_],
+    x: geometry.Vertices,
+    y: geometry.Vertices,
+    users: npt.NDArray[np.int_],
+    min_distance: float,
+    tolerance: float,
+) -> None:
+    points = np.flatnonzero(kept)
+    steps = geometry.metres_between(x[points[:-1]], y[points[:-1]], x[points[1:]], y[points[1:]])
+    moving = (steps > min_distance) & (users[points[1:]] == users[points[:-1]])
+    # A run of moving steps spans from its first step's start to its last step's end.
+    edges = np.diff(np.r_[0, moving.astype(np.int8), 0])
+    for first, last in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1), strict=True):
+        if last - first < 2:
+            continue
+        run = points[first : last + 1]
+        scale = math.cos(math.radians(float(np.mean(y[run]))))
+        vertices = np.column_stack([x[run] * scale, y[run]]) * geometry.METRES_PER_DEGREE
+        kept[run] = geometry.simplify_mask(vertices, tolerance)
+
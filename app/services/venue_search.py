@@ -0,0 +1,91 @@
+"""Ranked full-text and fuzzy venue search.
+
+A venue matches when its ``search_vector`` satisfies the web-style query or the query
+is word-similar (pg_trgm ``<%``) to its name, so misspelt names still hit. Both
+predicates are served by GIN indexes and combined with a bitmap OR. Ranking and
+filtering happen in an inner query; ``ts_headline`` only runs on the page returned.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from geoalchemy2 import Geography
+from sqlalchemy import Float, Integer, Row, cast, func, literal, null, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from app.models.venues import SEARCH_CONFIG
+from app.models.venues import Venues as VenuesModel
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=18, MinWords=6"
+
+
+def search(
+    db: Session,
+    text_query: str,
+    *,
+    limit: int,
+    amenities: Mapping[str, bool] | None = None,
+    near: tuple[float, float] | None = None,
+    radius_m: float | None = None,
+    open_minute: int | None = None,
+) -> Sequence[Row[Any]]:
+    """Return up to ``limit`` active venues for ``text_query``, most relevant first.
+
+    ``near`` is a ``(latitude, longitude)`` pair; when given each hit carries its
+    distance in metres and, with ``radius_m``, hits further away are excluded.
+    ``open_minute`` (minute of the week) keeps only venues open at that time.
+    """
+
+    config = cast(SEARCH_CONFIG, REGCONFIG)
+    query = func.websearch_to_tsquery(config, text_query)
+    score = (
+        func.ts_rank_cd(VenuesModel.search_vector, query)
+        + func.word_similarity(text_query, VenuesModel.name)
+    ).label("score")
+
+    inner = select(VenuesModel.id, score).where(
+        VenuesModel.is_active.is_(True),
+        or_(
+            VenuesModel.search_vector.bool_op("@@")(query),
+            literal(text_query).bool_op("<%")(VenuesModel.name),
+        ),
+    )
+    for name, wanted in (amenities or {}).items():
+        inner = inner.where(getattr(VenuesModel, name).is_(wanted))
+    if open_minute is not None:
+        inner = inner.where(VenuesModel.opening_minutes.contains(cast(open_minute, Integer)))
+
+    if near is not None:
+        latitude, longitude = near
+        point = cast(
+            func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+            Geography("POINT", srid=4326),
+        )
+        inner = inner.add_columns(
+            func.ST_Distance(VenuesModel.location, point).label("distance_m")
+        )
+        if radius_m is not None:
+            inner = inner.where(func.ST_DWithin(VenuesModel.location, point, radius_m))
+    else:
+        inner = inner.add_columns(cast(null(), Float).label("distance_m"))
+
+    ranked = inner.order_by(score.desc(), VenuesModel.id).limit(limit).subquery()
+    stmt = (
+        select(
+            VenuesModel.id,
+            VenuesModel.name,
+            VenuesModel.city,
+            VenuesModel.address,
+            VenuesModel.tags,
+            ranked.c.score,
+            ranked.c.distance_m,
+            func.ts_headline(config, VenuesModel.description, query, HEADLINE_OPTIONS).label(
+                "snippet"
+            ),
+        )
+        .join(ranked, ranked.c.id == VenuesModel.id)
+        .order_by(ranked.c.score.desc(), VenuesModel.id)
+    )
+    return db.execute(stmt).all()
@@ -0,0 +1,91 @@
+"""Experience points for venue visits.
+
+The worker handles each ``venue.visited`` event (one per ingested footsteps batch) with
+a single statement. It claims a ``visitawards`` row per distinct (user, venue, local day)
+and skips keys that already exist. Then it appends each user's summed award to the
+``points`` ledger, so the credit never contends with other awards on the user row and
+reaches ``users.points`` at the next compaction.
+
+Days are local to ``VENUES_TIMEZONE``.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+logger = structlog.get_logger(__name__)
+
+REASON = "venue_visit"
+
+_AWARD_SQL = text(
+    """
+    WITH candidates AS (
+        SELECT DISTINCT c.user_id, c.venue_id, c.day
+        FROM unnest(
+            CAST(:user_ids AS uuid[]), CAST(:venue_ids AS uuid[]), CAST(:days AS date[])
+        ) AS c(user_id, venue_id, day)
+    ), awarded AS (
+        INSERT INTO visitawards (user_id, venue_id, day, points)
+        SELECT c.user_id, c.venue_id, c.day, v.experience_points
+        FROM candidates AS c JOIN venues AS v ON v.id = c.venue_id
+        ORDER BY c.user_id, c.venue_id, c.day
+        ON CONFLICT DO NOTHING
+        RETURNING user_id, points
+    )
+    INSERT INTO points (user_id, delta, reason)
+    SELECT user_id, CAST(sum(points) AS integer), :reason
+    FROM awarded
+    GROUP BY user_id
+    HAVING sum(points) <> 0
+    RETURNING delta
+    """
+)
+
+
+def award_visits(db: Session, visits: list[dict[str, Any]], zone: ZoneInfo) -> int:
+    """Credit each new (user, venue, day) in ``visits`` once; returns the points awarded.
+
+    Runs in the caller's transaction.
+    """
+
+    keys = {
+        (
+            UUID(visit["user_id"]),
+            UUID(visit["venue_id"]),
+            _local_day(visit["entered_at"], zone),
+        )
+        for visit in visits
+    }
+    if not keys:
+        return 0
+    user_ids, venue_ids, days = zip(*keys, strict=True)
+    awarded = db.execute(
+        _AWARD_SQL,
+        {
+            "user_ids": list(user_ids),
+            "venue_ids": list(venue_ids),
+            "days": list(days),
+            "reason": REASON,
+        },
+    ).scalars().all()
+    total = int(sum(awarded))
+    logger.info("visit_points_awarded", visits=len(keys), users=len(awarded), points=total)
+    return total
+
+
+def handle_venue_visited(db: Session, payload: dict[str, Any]) -> None:
+    """Worker handler for ``venue.visited``."""
+
+    award_visits(db, payload["visits"], ZoneInfo(get_settings().venues_timezone))
+
+
+def _local_day(moment: str, zone: ZoneInfo) -> date:
+    return datetime.fromisoformat(moment).astimezone(zone).date()
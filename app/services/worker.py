@@ -0,0 +1,177 @@
+"""Consumer side of ``TaskQueue``.
+
+The worker reads the ``<namespace>:stream`` stream through the ``workers`` consumer
+group and acknowledges (and deletes) a message only once every handler for it
+succeeded. A message whose handler failed, or whose worker died mid-message, stays
+pending and is claimed again once idle for ``claim_idle_ms`` (by any worker, including
+the one that failed it), so the retry comes after a pause rather than in a tight loop.
+All of its handlers then run again, so handlers must be idempotent. A message
+delivered more than ``MAX_DELIVERIES`` times is moved to ``<namespace>:dead`` instead.
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+import redis
+import structlog
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = structlog.get_logger(__name__)
+
+GROUP = "workers"
+# Pending messages idle this long are retried, or taken over from a worker presumed dead.
+CLAIM_IDLE_MS = 60_000
+# Pending messages delivered more often than this are dead-lettered.
+MAX_DELIVERIES = 5
+
+TaskHandler = Callable[[Session, dict[str, Any]], None]
+
+
+class TaskWorker:
+    """Consume tasks pushed by ``TaskQueue`` and dispatch them to registered handlers."""
+
+    def __init__(
+        self,
+        url: str,
+        session_factory: sessionmaker[Session],
+        namespace: str = "tasks",
+        consumer: str | None = None,
+        *,
+        claim_idle_ms: int = CLAIM_IDLE_MS,
+        retry_delay: float = 1.0,
+    ):
+        self._client = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._session_factory = session_factory
+        self._stream = f"{namespace}:stream"
+        self._dead = f"{namespace}:dead"
+        self._consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._claim_idle_ms = claim_idle_ms
+        self._retry_delay = retry_delay
+        self._handlers: dict[str, list[TaskHandler]] = defaultdict(list)
+        self._grouped = False
+
+    def register(self, task: str, handler: TaskHandler) -> None:
+        """Run ``handler`` for every ``task`` message, after previously registered ones."""
+
+        self._handlers[task].append(handler)
+
+    def run_once(self, timeout: int = 5) -> bool:
+        """Process at most one message, returning whether one was received.
+
+        The message stays pending unless all of its handlers succeeded.
+        """
+
+        entry = self._next(timeout)
+        if entry is None:
+            return False
+        entry_id, fields = entry
+        try:
+            message = json.loads(fields["message"])
+            task, payload = message["task"], message.get("payload") or {}
+        except (KeyError, TypeError, ValueError):
+            # Left pending, so it ends up dead-lettered.
+            logger.exception("task_undecodable", entry_id=entry_id)
+            return True
+        if self.dispatch(task, payload):
+            self._ack(entry_id)
+        return True
+
+    def dispatch(self, task: str, payload: dict[str, Any]) -> bool:
+        """Invoke every handler for ``task``, returning whether they all succeeded.
+
+        A failing handler does not block the rest.
+        """
+
+        succeeded = True
+        for handler in self._handlers.get(task, []):
+            with self._session_factory() as session:
+                try:
+                    handler(session, payload)
+                    session.commit()
+                except Exception:
+                    session.rollback()
+                    succeeded = False
+                    logger.exception("task_failed", task=task, handler=handler.__name__)
+        return succeeded
+
+    def run_forever(self) -> None:
+        """Block on the queue and process messages until interrupted.
+
+        Redis errors are logged and retried after a growing delay, capped at a minute.
+        """
+
+        logger.info("worker_started", tasks=sorted(self._handlers), consumer=self._consumer)
+        delay = self._retry_delay
+        while True:
+            try:
+                self.run_once()
+            except redis.RedisError:
+                logger.exception("worker_redis_failed", retry_in=delay)
+                # The group may be gone along with the stream; create it again.
+                self._grouped = False
+                time.sleep(delay)
+                delay = min(delay * 2, 60.0)
+            else:
+                delay = self._retry_delay
+
+    def close(self) -> None:
+        """Close the underlying Redis connection."""
+
+        if self._client:
+            self._client.close()
+
+    def _next(self, timeout: int) -> tuple[str, dict[str, str]] | None:
+        # Pending messages idle long enough to retry first, then new ones.
+        self._ensure_group()
+        _, entries, *_ = self._client.xautoclaim(
+            self._stream, GROUP, self._consumer, self._claim_idle_ms, count=1
+        )
+        for entry_id, fields in entries:
+            if not fields:
+                # Deleted from the stream while pending; nothing left to run.
+                self._ack(entry_id)
+            elif not self._dead_letter(entry_id, fields):
+                return entry_id, fields
+        found = self._client.xreadgroup(
+            GROUP, self._consumer, {self._stream: ">"}, count=1, block=timeout * 1000
+        )
+        if not found:
+            return None
+        entry_id, fields = found[0][1][0]
+        return entry_id, fields
+
+    def _dead_letter(self, entry_id: str, fields: dict[str, str]) -> bool:
+        pending = self._client.xpending_range(
+            self._stream, GROUP, min=entry_id, max=entry_id, count=1
+        )
+        if not pending or pending[0]["times_delivered"] <= MAX_DELIVERIES:
+            return False
+        with self._client.pipeline(transaction=True) as pipe:
+            pipe.xadd(self._dead, {**fields, "entry_id": entry_id})
+            pipe.xack(self._stream, GROUP, entry_id)
+            pipe.xdel(self._stream, entry_id)
+            pipe.execute()
+        logger.warning("task_dead_lettered", entry_id=entry_id)
+        return True
+
+    def _ack(self, entry_id: str) -> None:
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.xack(self._stream, GROUP, entry_id)
+            pipe.xdel(self._stream, entry_id)
+            pipe.execute()
+
+    def _ensure_group(self) -> None:
+        if self._grouped:
+            return
+        try:
+            self._client.xgroup_create(self._stream, GROUP, id="0", mkstream=True)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._grouped = True
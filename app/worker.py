@@ -0,0 +1,79 @@
+"""Background worker entrypoint: ``python -m app.worker``."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.main import configure_logging
+from app.services import TaskQueue, follow_graph, visit_awards
+from app.services.graph_csr import FollowerGraphSync
+from app.services.leaderboard import Leaderboard
+from app.services.occupancy import VenueOccupancy
+from app.services.presence import Presence
+from app.services.relationship_cache import RelationshipCache
+from app.services.worker import TaskWorker
+
+
+def build_worker() -> TaskWorker:
+    """Create a worker with every event handler registered."""
+
+    settings = get_settings()
+    worker = TaskWorker(str(settings.redis_url), SessionLocal)
+    worker.register("follow.created", follow_graph.handle_follow_changed)
+    worker.register("follow.updated", follow_graph.handle_follow_changed)
+    worker.register("follow.deleted", follow_graph.handle_follow_deleted)
+    worker.register("follow.bulk_updated", follow_graph.handle_follows_bulk_updated)
+    worker.register("follow.bulk_deleted", follow_graph.handle_follows_bulk_deleted)
+    worker.register("user.deleted", follow_graph.handle_user_deleted)
+
+    relationships = RelationshipCache(str(settings.redis_url), ttl=settings.relationship_cache_ttl)
+    worker.register("follow.created", relationships.handle_follow_changed)
+    worker.register("follow.updated", relationships.handle_follow_changed)
+    worker.register("follow.deleted", relationships.handle_follow_deleted)
+    worker.register("follow.bulk_updated", relationships.handle_follows_bulk_updated)
+    worker.register("follow.bulk_deleted", relationships.handle_follows_bulk_deleted)
+    worker.register("user.deleted", relationships.handle_user_deleted)
+
+    snapshot = FollowerGraphSync(Path(settings.graph_snapshot_dir))
+    worker.register("follow.created", snapshot.handle_follow_changed)
+    worker.register("follow.updated", snapshot.handle_follow_changed)
+    worker.register("follow.deleted", snapshot.handle_follow_deleted)
+    worker.register("follow.bulk_updated", snapshot.handle_follows_bulk_updated)
+    worker.register("follow.bulk_deleted", snapshot.handle_follows_bulk_deleted)
+    worker.register("user.deleted", snapshot.handle_user_deleted)
+
+    leaderboard = Leaderboard(str(settings.redis_url))
+    worker.register("user.created", leaderboard.handle_user_changed)
+    worker.register("user.updated", leaderboard.handle_user_changed)
+    worker.register("user.bulk_upserted", leaderboard.handle_users_bulk_upserted)
+    worker.register("user.points_compacted", leaderboard.handle_users_points_compacted)
+    worker.register("user.deleted", leaderboard.handle_user_deleted)
+
+    presence = Presence(str(settings.redis_url), ttl=settings.presence_ttl)
+    worker.register("user.deleted", presence.handle_user_deleted)
+
+    worker.register("venue.visited", visit_awards.handle_venue_visited)
+    occupancy = VenueOccupancy(
+        str(settings.redis_url),
+        window=settings.visit_gap_seconds,
+        timezone=settings.venues_timezone,
+        events=TaskQueue(str(settings.redis_url)),
+    )
+    worker.register("venue.visited", occupancy.handle_venue_visited)
+    return worker
+
+
+def main() -> None:
+    configure_logging()
+    worker = build_worker()
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Parse ``venues.opening_hours`` into the indexed ``opening_minutes`` ranges."""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.services.opening_hours import backfill
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backfill venue opening-hour ranges")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of venues parsed and updated per transaction (default: 1000)",
+    )
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        result = backfill(session, batch_size=max(1, args.batch_size))
+
+    print(
+        f"✅ Parsed opening hours for {result.scanned} venues "
+        f"({result.updated} updated, {result.unparsed} unparseable)."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Fold pending points-ledger deltas into ``users.points``."""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services import TaskQueue
+from app.services.points_ledger import compact
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compact the points ledger")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="Number of ledger entries folded per transaction (default: 5000)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Seconds between passes; 0 runs a single pass and exits (default: 0)",
+    )
+    args = parser.parse_args()
+
+    queue = TaskQueue(str(get_settings().redis_url))
+    entries = users = 0
+    try:
+        while True:
+            with SessionLocal() as session:
+                for batch in compact(session, batch_size=max(1, args.batch_size)):
+                    queue.enqueue(
+                        "user.points_compacted",
+                        {"ids": [str(user_id) for user_id in batch.user_ids]},
+                    )
+                    entries += batch.entries
+                    users += len(batch.user_ids)
+            if args.interval <= 0:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close()
+
+    print(f"✅ Compacted {entries} ledger entries into {users} user balances.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Write buffered footsteps from the Redis write-behind stream into Postgres."""
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+import structlog
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.main import configure_logging
+from app.services import TaskQueue
+from app.services.events import EventSubscriber
+from app.services.footsteps_buffer import FootstepsBuffer
+from app.services.footsteps_ingest import ingest_copied
+from app.services.geofence import VenueFences
+from app.services.presence import Presence
+
+logger = structlog.get_logger("drain_footsteps")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drain the footsteps write-behind buffer")
+    parser.add_argument(
+        "--entries",
+        type=int,
+        default=200,
+        help="Buffered requests written per COPY batch (default: 200)",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=0,
+        help="Pings per second to write while within the max lag; 0 is unpaced (default: 0)",
+    )
+    parser.add_argument(
+        "--consumer",
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help="Consumer name within the drainers group (default: host-pid)",
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    settings = get_settings()
+    url = str(settings.redis_url)
+    buffer = FootstepsBuffer(url)
+    queue = TaskQueue(url)
+    locations = Presence(url, ttl=settings.presence_ttl)
+    fences = VenueFences(SessionLocal)
+    fences.load()
+    events = EventSubscriber(url)
+    fences.subscribe(events)
+    events.start()
+
+    written = 0
+    try:
+        while True:
+            started = time.monotonic()
+            batch = buffer.read(args.consumer, max(1, args.entries))
+            if not batch.entry_ids:
+                continue
+            try:
+                with SessionLocal() as session:
+                    result = ingest_copied(session, batch.rows, fences, locations)
+                # Queued before the ack: if either fails, the redelivered batch replays its
+                # visits and the event goes out again.
+                if result.visits:
+                    queue.enqueue("venue.visited", {"visits": result.visits})
+            except Exception:
+                # Left pending; this consumer gets the same entries back on the next read.
+                logger.exception("footsteps_drain_failed", entries=len(batch.entry_ids))
+                time.sleep(1.0)
+                continue
+            buffer.ack(batch)
+            written += result.inserted
+
+            stats = buffer.stats()
+            logger.info(
+                "footsteps_buffer_drained",
+                pings=len(batch.rows),
+                inserted=result.inserted,
+                depth_entries=stats.entries,
+                depth_pings=stats.pings,
+                lag_seconds=round(stats.lag_seconds, 3),
+            )
+            # Pace writes to spare the database, unless the backlog is getting too old.
+            if args.max_rate > 0 and stats.lag_seconds < settings.footsteps_buffer_max_lag:
+                time.sleep(max(0.0, len(batch.rows) / args.max_rate - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        events.stop()
+        buffer.close()
+        queue.close()
+        locations.close()
+
+    print(f"✅ Drained {written} buffered footsteps.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Copy a day's venue unique-visitor estimates from Redis into ``venuevisitors``."""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.occupancy import VenueOccupancy, persist_daily
+
+
+def main() -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Persist daily venue unique visitors")
+    parser.add_argument(
+        "--day",
+        type=date.fromisoformat,
+        default=None,
+        help="Local day to persist as YYYY-MM-DD (default: yesterday in VENUES_TIMEZONE)",
+    )
+    args = parser.parse_args()
+
+    day = args.day or datetime.now(ZoneInfo(settings.venues_timezone)).date() - timedelta(days=1)
+    occupancy = VenueOccupancy(
+        str(settings.redis_url),
+        window=settings.visit_gap_seconds,
+        timezone=settings.venues_timezone,
+    )
+    try:
+        with SessionLocal() as session:
+            venues = persist_daily(session, occupancy, day)
+    finally:
+        occupancy.close()
+
+    print(f"✅ Persisted unique visitors for {venues} venues on {day.isoformat()}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Reload the Redis points leaderboard from ``users.points``."""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.leaderboard import Leaderboard
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the points leaderboard")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="Number of users streamed and written per ZADD (default: 10000)",
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    leaderboard = Leaderboard(str(settings.redis_url))
+    try:
+        with SessionLocal() as session:
+            loaded = leaderboard.rebuild(session, batch_size=max(1, args.batch_size))
+    finally:
+        leaderboard.close()
+
+    print(f"✅ Leaderboard rebuilt with {loaded} users.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Repair drift in the denormalised follower counters on ``users``."""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.services.follow_counts import reconcile_follow_counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reconcile follower/following counters")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of users locked and repaired per transaction (default: 1000)",
+    )
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        repaired = reconcile_follow_counts(session, batch_size=max(1, args.batch_size))
+
+    print(f"✅ Repaired follow counters for {repaired} users.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Load accepted follows into the in-memory CSR graph and write a snapshot to disk."""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.graph_csr import FollowerGraph
+
+settings = get_settings()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Snapshot the follower graph as CSR arrays")
+    parser.add_argument(
+        "--path",
+        type=Path,
+        default=Path(settings.graph_snapshot_dir),
+        help=f"Snapshot directory (default: {settings.graph_snapshot_dir})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100_000,
+        help="Number of edges fetched per round trip (default: 100000)",
+    )
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        graph = FollowerGraph.from_database(session, batch_size=max(1, args.batch_size))
+
+    graph.save(args.path)
+    print(f"✅ Wrote {graph.node_count} users / {graph.edge_count} follows to {args.path}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Rebuild the AGE follow graph projection from the ``followers`` table."""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.services import follow_graph
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Project accepted follows into the AGE graph")
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Remove every vertex and edge before projecting",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of relationships merged per Cypher statement (default: 1000)",
+    )
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        if args.clear:
+            print("🧹 Clearing follow graph...")
+            follow_graph.clear(session)
+        merged = follow_graph.rebuild(session, batch_size=max(1, args.batch_size))
+
+    print(f"✅ Projected {merged} follow relationships.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -77,7 +77,8 @@ def test_database_url() -> Generator[str, None, None]:
     test_url = url.set(database=database_name)
     test_engine = create_engine(test_url, future=True, isolation_level="AUTOCOMMIT")
     with test_engine.connect() as connection:
-        connection.execute(text("CREATE EXTENSION IF NOT EXISTS citext"))
+        for extension in ("citext", "postgis", "pg_trgm"):
+            connection.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
     test_engine.dispose()
 
     try:
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import random
+import uuid
+from collections.abc import Mapping, Sequence
+
+from app.models.venues import AMENITIES
+from app.services.amenity_facets import AmenityBitmap, Flags
+
+
+def _flags(**values: bool | None) -> tuple[bool | None, ...]:
+    return tuple(values.get(name) for name in AMENITIES)
+
+
+def _expected(
+    venues: Sequence[tuple[uuid.UUID, Flags]], selected: Mapping[str, bool]
+) -> tuple[int, dict[str, int]]:
+    matching = [
+        values
+        for _, values in venues
+        if all(values[AMENITIES.index(name)] is wanted for name, wanted in selected.items())
+    ]
+    counts = {
+        name: sum(values[position] is True for values in matching)
+        for position, name in enumerate(AMENITIES)
+    }
+    return len(matching), counts
+
+
+def test_counts_distinguish_false_from_unknown() -> None:
+    bitmap = AmenityBitmap.build(
+        [
+            (uuid.uuid4(), _flags(live_music=True, indoor=True)),
+            (uuid.uuid4(), _flags(live_music=False, indoor=True)),
+            (uuid.uuid4(), _flags(indoor=False)),
+        ]
+    )
+
+    total, counts = bitmap.counts({})
+    assert total == 3
+    assert counts["indoor"] == 2
+    assert counts["live_music"] == 1
+
+    assert bitmap.counts({"live_music": False})[0] == 1
+    total, counts = bitmap.counts({"indoor": True, "live_music": True})
+    assert (total, counts["live_music"]) == (1, 1)
+
+
+def test_incremental_updates_match_a_rebuild() -> None:
+    rng = random.Random(7)
+    venues = {
+        uuid.uuid4(): tuple(rng.choice((True, False, None)) for _ in AMENITIES)
+        for _ in range(300)
+    }
+    bitmap = AmenityBitmap(capacity=1)
+    for venue_id, values in venues.items():
+        bitmap.upsert(venue_id, values)
+    for venue_id in list(venues)[:50]:
+        bitmap.remove(venue_id)
+        del venues[venue_id]
+    for venue_id in list(venues)[:50]:
+        venues[venue_id] = _flags(dance_floor=True)
+        bitmap.upsert(venue_id, venues[venue_id])
+    venues[uuid.uuid4()] = _flags(dance_floor=True, outdoor=False)
+    bitmap.upsert(*list(venues.items())[-1])
+
+    rebuilt = AmenityBitmap.build(list(venues.items()))
+    for selected in ({}, {"dance_floor": True}, {"outdoor": False, "indoor": True}):
+        expected = _expected(list(venues.items()), selected)
+        assert bitmap.counts(selected) == expected
+        assert rebuilt.counts(selected) == expected
+    assert len(bitmap) == len(venues)
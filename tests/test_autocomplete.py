@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app.services import autocomplete
+from app.services.autocomplete import (
+    CACHE_DEPTH,
+    MAX_RESULTS,
+    SCAN_LIMIT,
+    PrefixIndex,
+    Suggestion,
+)
+
+
+def _venue(name: str, city: str | None = None, popularity: int = 0) -> Suggestion:
+    return Suggestion(id=uuid.uuid4(), name=name, city=city, popularity=popularity)
+
+
+def test_search_matches_word_starts_and_city() -> None:
+    jazz = _venue("Blue Note Jazz Club", "Austin", popularity=5)
+    cafe = _venue("Café Olé", "Seattle", popularity=9)
+    index = PrefixIndex.build([jazz, cafe])
+
+    assert index.search("blue") == [jazz]
+    assert index.search("JAZZ c") == [jazz]
+    assert index.search("aus") == [jazz]
+    assert index.search("cafe o") == [cafe]
+    assert index.search("note jazz club extra") == []
+    assert index.search("   ") == []
+
+
+def test_search_ranks_by_popularity_and_deduplicates() -> None:
+    quiet = _venue("Moon Bar", "Moonee Ponds", popularity=1)
+    busy = _venue("Moonlight Lounge", popularity=50)
+    index = PrefixIndex.build([quiet, busy])
+
+    assert index.search("moon") == [busy, quiet]
+    assert index.search("moon", limit=1) == [busy]
+
+
+def test_upsert_and_remove() -> None:
+    index = PrefixIndex.build([])
+    venue = _venue("Harbour Taproom", "Seattle")
+
+    index.upsert(venue)
+    assert index.search("harb") == [venue]
+
+    renamed = Suggestion(id=venue.id, name="Dockside Taproom", city="Seattle", popularity=3)
+    index.upsert(renamed)
+    assert index.search("harb") == []
+    assert index.search("dock") == [renamed]
+    assert len(index) == 1
+
+    index.remove(venue.id)
+    assert index.search("tap") == []
+    assert len(index) == 0
+
+
+def test_wide_prefix_cache_follows_changes() -> None:
+    venues = [_venue(f"Bar {number}", popularity=number) for number in range(SCAN_LIMIT * 2)]
+    index = PrefixIndex.build(venues)
+
+    top = SCAN_LIMIT * 2 - 1
+    assert [hit.popularity for hit in index.search("bar", limit=3)] == [top, top - 1, top - 2]
+
+    champion = _venue("Bar Champion", popularity=10_000)
+    index.upsert(champion)
+    assert index.search("b", limit=1) == [champion]
+    assert index.search("bar", limit=1) == [champion]
+
+    index.remove(champion.id)
+    assert index.search("bar", limit=1)[0].popularity == top
+
+    # Drain the cached entries past the slack so the prefix has to be re-ranked.
+    for venue in venues[-CACHE_DEPTH:]:
+        index.remove(venue.id)
+    remaining = [hit.popularity for hit in index.search("bar", limit=MAX_RESULTS)]
+    assert remaining == list(range(top - CACHE_DEPTH, top - CACHE_DEPTH - MAX_RESULTS, -1))
+
+
+def test_warm_descends_past_a_key_equal_to_the_prefix() -> None:
+    venues = [_venue(f"Bar {number}", popularity=number) for number in range(SCAN_LIMIT * 2)]
+    index = PrefixIndex.build([_venue("Bar"), *venues])
+
+    # "bar" is a key of its own and sorts first in the "bar" range.
+    assert {"b", "ba", "bar", "bar "} <= index._top.keys()
+
+
+def test_changes_are_merged_in_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(autocomplete, "MERGE_THRESHOLD", 4)
+    old = _venue("Old Mill", popularity=1)
+    index = PrefixIndex.build([old])
+    keys = list(index._keys)
+
+    fresh = _venue("Mill House", popularity=2)
+    index.upsert(fresh)
+    # Buffered rather than inserted into the sorted keys.
+    assert index._keys == keys
+    assert index.search("mill") == [fresh, old]
+
+    # Two pending and two stale keys reach the threshold, so the removal merges them.
+    index.remove(old.id)
+    assert index._pending == []
+    assert index._keys == ["house", "mill house"]
+    assert index.search("mill") == [fresh]
+    assert index.search("old") == []
+
+    # The merge freed the removed venue's slot (the only one at build) for reuse.
+    reused = _venue("Oldtown Tap")
+    index.upsert(reused)
+    assert index._slot_of[reused.id] == 0
+    assert index.search("old") == [reused]
+    assert index.search("mill") == [fresh]
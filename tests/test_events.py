@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from app.services.events import EventSubscriber
+
+
+def test_dispatch_runs_every_handler_and_isolates_failures() -> None:
+    subscriber = EventSubscriber("redis://localhost:6379/0")
+    seen: list[dict[str, Any]] = []
+
+    def failing(_payload: dict[str, Any]) -> None:
+        raise RuntimeError("boom")
+
+    subscriber.register("venue.updated", failing)
+    subscriber.register("venue.updated", seen.append)
+    subscriber.dispatch(json.dumps({"task": "venue.updated", "payload": {"id": "abc"}}))
+    subscriber.dispatch(json.dumps({"task": "venue.deleted", "payload": {"id": "ignored"}}))
+
+    assert seen == [{"id": "abc"}]
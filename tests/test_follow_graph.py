@@ -0,0 +1,178 @@
+"""Behaviour of the Apache AGE follow projection; skipped where AGE is not installed."""
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Followers, Users
+from app.models.followers import StatusEnum
+from app.services import follow_graph
+from tests.conftest import APITestContext
+
+NAMES = ("ann", "bob", "cat", "dan", "eve", "fay")
+
+
+@pytest.fixture()
+def graph(api_app: APITestContext) -> Iterator[tuple[APITestContext, dict[str, uuid.UUID]]]:
+    _, session_factory, _ = api_app
+    engine: Engine = session_factory.kw["bind"]
+    graph_name = follow_graph.GRAPH_NAME
+    with engine.begin() as connection:
+        available = connection.execute(
+            text("SELECT 1 FROM pg_available_extensions WHERE name = 'age'")
+        ).first()
+        if available is None:
+            pytest.skip("Apache AGE is not installed")
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS age"))
+        connection.execute(text("LOAD 'age'"))
+        connection.execute(text(f"SELECT ag_catalog.create_graph('{graph_name}')"))
+        connection.execute(text(f"SELECT ag_catalog.create_vlabel('{graph_name}', 'User')"))
+        connection.execute(text(f"SELECT ag_catalog.create_elabel('{graph_name}', 'FOLLOWS')"))
+
+    ids = {name: uuid.uuid4() for name in NAMES}
+    # Every follow is accepted except ann -> eve, which is pending.
+    follows = [
+        ("ann", "bob", StatusEnum.ACCEPTED),
+        ("ann", "fay", StatusEnum.ACCEPTED),
+        ("bob", "cat", StatusEnum.ACCEPTED),
+        ("bob", "dan", StatusEnum.ACCEPTED),
+        ("cat", "dan", StatusEnum.ACCEPTED),
+        ("fay", "dan", StatusEnum.ACCEPTED),
+        ("ann", "eve", StatusEnum.PENDING),
+    ]
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Users),
+            [
+                {
+                    "id": ids[name],
+                    "email": f"{name}@example.com",
+                    "full_name": name.title(),
+                    "oauth_provider": "test",
+                    "oauth_provider_id": f"graph-{name}",
+                }
+                for name in NAMES
+            ],
+        )
+        connection.execute(
+            insert(Followers),
+            [
+                {"follower_id": ids[follower], "followed_id": ids[followed], "status": status}
+                for follower, followed, status in follows
+            ],
+        )
+    try:
+        yield api_app, ids
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("LOAD 'age'"))
+            connection.execute(text(f"SELECT ag_catalog.drop_graph('{graph_name}', true)"))
+
+
+def _follow_id(session: Session, follower_id: uuid.UUID, followed_id: uuid.UUID) -> uuid.UUID:
+    return session.scalars(
+        select(Followers.id).where(
+            Followers.follower_id == follower_id, Followers.followed_id == followed_id
+        )
+    ).one()
+
+
+def test_rebuild_projects_accepted_follows_only(
+    graph: tuple[APITestContext, dict[str, uuid.UUID]],
+) -> None:
+    (_, session_factory, _), ids = graph
+    with session_factory() as session:
+        assert follow_graph.rebuild(session, batch_size=2) == 6
+        # Merging again against the live projection adds nothing.
+        assert follow_graph.rebuild(session) == 6
+        edges = follow_graph.cypher(session, "MATCH ()-[e:FOLLOWS]->() RETURN count(e)")
+        assert edges == [(6,)]
+        # The pending follow is not an edge.
+        assert follow_graph.suggest_follows(session, ids["eve"], limit=10) == []
+        path = follow_graph.degrees_of_separation(session, ids["ann"], ids["eve"], max_depth=6)
+        assert path is None
+
+
+def test_suggestions_and_path_endpoints(
+    graph: tuple[APITestContext, dict[str, uuid.UUID]],
+) -> None:
+    (client, session_factory, _), ids = graph
+    with session_factory() as session:
+        follow_graph.rebuild(session)
+
+    suggestions = client.get(f"/api/v1/users/{ids['ann']}/suggestions").json()
+    # dan is followed by two of ann's follows, cat by one; ann's own follows are excluded.
+    assert [(item["id"], item["mutual_count"]) for item in suggestions] == [
+        (str(ids["dan"]), 2),
+        (str(ids["cat"]), 1),
+    ]
+
+    def degrees(source: str, target: str, max_depth: int = 4) -> int | None:
+        response = client.get(
+            f"/api/v1/users/{ids[source]}/path/{ids[target]}", params={"max_depth": max_depth}
+        )
+        assert response.status_code == 200
+        degrees: int | None = response.json()["degrees"]
+        return degrees
+
+    assert degrees("ann", "ann") == 0
+    assert degrees("ann", "bob") == 1
+    # Two hops through bob or fay; the longer chain through cat is not counted.
+    assert degrees("ann", "dan") == 2
+    assert degrees("ann", "dan", max_depth=1) is None
+    # Follows are directed.
+    assert degrees("dan", "ann") is None
+    assert client.get(f"/api/v1/users/{uuid.uuid4()}/path/{ids['ann']}").status_code == 404
+
+
+def test_handlers_keep_the_projection_in_sync(
+    graph: tuple[APITestContext, dict[str, uuid.UUID]],
+) -> None:
+    (_, session_factory, _), ids = graph
+
+    def path(session: Session, source: str, target: str) -> int | None:
+        return follow_graph.degrees_of_separation(session, ids[source], ids[target], max_depth=4)
+
+    with session_factory() as session:
+        follow_graph.rebuild(session)
+
+        pending = _follow_id(session, ids["ann"], ids["eve"])
+        follow_graph.handle_follow_changed(session, {"id": str(pending)})
+        assert path(session, "ann", "eve") is None
+        session.execute(
+            text("UPDATE followers SET status = 'ACCEPTED' WHERE id = :id"), {"id": pending}
+        )
+        follow_graph.handle_follow_changed(session, {"id": str(pending)})
+        assert path(session, "ann", "eve") == 1
+
+        follow_graph.handle_follow_deleted(
+            session, {"follower_id": str(ids["ann"]), "followed_id": str(ids["bob"])}
+        )
+        assert path(session, "ann", "cat") is None
+        assert path(session, "ann", "dan") == 2
+
+        follow_graph.handle_user_deleted(session, {"id": str(ids["fay"])})
+        assert path(session, "ann", "dan") is None
+
+        follow_graph.handle_follows_bulk_deleted(
+            session,
+            {
+                "relationships": [
+                    {"follower_id": str(ids["bob"]), "followed_id": str(ids["cat"])},
+                ]
+            },
+        )
+        assert path(session, "bob", "dan") == 1
+        assert path(session, "bob", "cat") is None
+
+        follow_graph.handle_follows_bulk_updated(
+            session,
+            {"ids": [str(_follow_id(session, ids["bob"], ids["cat"]))]},
+        )
+        assert path(session, "bob", "cat") == 1
+        session.commit()
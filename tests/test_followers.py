@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+from pathlib import Path
 from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from app.models import Followers, Users
 from app.models.followers import StatusEnum
+from app.services import follow_bulk, influence
+from app.services.follow_counts import reconcile_follow_counts
+from app.services.graph_csr import FollowerGraph, FollowerGraphSync
 from tests.conftest import TestBase
 
 
@@ -49,7 +53,17 @@ class TestFollowers(TestBase):
         assert body["follower_id"] == str(follower_id)
         assert body["followed_id"] == str(followed_id)
         assert body["status"] == StatusEnum.PENDING.value
-        assert self.events == [("follow.created", {"id": body["id"]})]
+        assert self.events == [
+            (
+                "follow.created",
+                {
+                    "id": body["id"],
+                    "follower_id": str(follower_id),
+                    "followed_id": str(followed_id),
+                    "status": StatusEnum.PENDING.value,
+                },
+            )
+        ]
 
         with self.session_factory() as session:
             stored = session.execute(
@@ -79,7 +93,16 @@ class TestFollowers(TestBase):
 
         delete_response = self.client.delete(f"/api/v1/followers/{follow_id}")
         assert delete_response.status_code == 204
-        assert self.events == [("follow.deleted", {"id": follow_id})]
+        assert self.events == [
+            (
+                "follow.deleted",
+                {
+                    "id": follow_id,
+                    "follower_id": str(follower_id),
+                    "followed_id": str(followed_id),
+                },
+            )
+        ]
 
         with self.session_factory() as session:
             remaining = session.execute(
@@ -117,7 +140,17 @@ class TestFollowers(TestBase):
 
         body = update_response.json()
         assert body["status"] == StatusEnum.ACCEPTED.value
-        assert self.events == [("follow.updated", {"id": follow_id})]
+        assert self.events == [
+            (
+                "follow.updated",
+                {
+                    "id": follow_id,
+                    "follower_id": str(follower_id),
+                    "followed_id": str(followed_id),
+                    "status": StatusEnum.ACCEPTED.value,
+                },
+            )
+        ]
 
         with self.session_factory() as session:
             stored = session.execute(
@@ -214,3 +247,295 @@ class TestFollowers(TestBase):
         assert response.status_code == 400
         assert response.json()["detail"] == "cannot_follow_self"
         assert self.events == []
+
+    def _counts(self, user_id: UUID) -> tuple[int, int, int]:
+        response = self.client.get(f"/api/v1/users/{user_id}/counts")
+        assert response.status_code == 200
+        body = response.json()
+        return (
+            body["followers_count"],
+            body["following_count"],
+            body["pending_requests_count"],
+        )
+
+    def test_counts_follow_lifecycle(self) -> None:
+        follower_id = self._create_user(email="count-follower@example.com", full_name="Follower")
+        followed_id = self._create_user(email="count-followed@example.com", full_name="Followed")
+
+        response = self.client.post(
+            "/api/v1/followers",
+            json={"follower_id": str(follower_id), "followed_id": str(followed_id)},
+        )
+        assert response.status_code == 201
+        follow_id = response.json()["id"]
+        assert self._counts(followed_id) == (0, 0, 1)
+        assert self._counts(follower_id) == (0, 0, 0)
+
+        self.client.put(
+            f"/api/v1/followers/{follow_id}",
+            json={"status": StatusEnum.ACCEPTED.value},
+        )
+        assert self._counts(followed_id) == (1, 0, 0)
+        assert self._counts(follower_id) == (0, 1, 0)
+        user_response = self.client.get(f"/api/v1/users/{followed_id}")
+        assert user_response.json()["followers_count"] == 1
+
+        self.client.delete(f"/api/v1/users/{follower_id}")
+        assert self._counts(followed_id) == (0, 0, 0)
+
+    def test_counts_not_found(self) -> None:
+        response = self.client.get(f"/api/v1/users/{uuid4()}/counts")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "user_not_found"
+
+    def test_reconcile_follow_counts(self) -> None:
+        follower_id = self._create_user(email="drift-follower@example.com", full_name="Follower")
+        followed_id = self._create_user(email="drift-followed@example.com", full_name="Followed")
+        self.client.post(
+            "/api/v1/followers",
+            json={
+                "follower_id": str(follower_id),
+                "followed_id": str(followed_id),
+                "status": StatusEnum.ACCEPTED.value,
+            },
+        )
+
+        with self.session_factory() as session:
+            session.execute(update(Users).values(followers_count=42, following_count=0))
+            session.commit()
+            assert reconcile_follow_counts(session, batch_size=1) == 2
+
+        assert self._counts(followed_id) == (1, 0, 0)
+        assert self._counts(follower_id) == (0, 1, 0)
+
+    def test_list_user_followers_and_following(self) -> None:
+        followed_id = self._create_user(email="page-followed@example.com", full_name="Star")
+        follower_ids = [
+            self._create_user(email=f"page-follower{idx}@example.com", full_name=f"Fan {idx}")
+            for idx in range(3)
+        ]
+        for follower_id in follower_ids:
+            self.client.post(
+                "/api/v1/followers",
+                json={
+                    "follower_id": str(follower_id),
+                    "followed_id": str(followed_id),
+                    "status": StatusEnum.ACCEPTED.value,
+                },
+            )
+        pending_id = self._create_user(email="page-pending@example.com", full_name="Pending")
+        self.client.post(
+            "/api/v1/followers",
+            json={"follower_id": str(pending_id), "followed_id": str(followed_id)},
+        )
+
+        first = self.client.get(f"/api/v1/users/{followed_id}/followers?limit=2")
+        assert first.status_code == 200
+        first_page = first.json()
+        assert [item["full_name"] for item in first_page["items"]] == ["Fan 2", "Fan 1"]
+        assert set(first_page["items"][0]) == {"id", "full_name", "avatar_url", "followed_at"}
+        assert first_page["next_cursor"] is not None
+
+        second = self.client.get(
+            f"/api/v1/users/{followed_id}/followers",
+            params={"limit": 2, "cursor": first_page["next_cursor"]},
+        )
+        second_page = second.json()
+        assert [item["full_name"] for item in second_page["items"]] == ["Fan 0"]
+        assert second_page["next_cursor"] is None
+
+        following = self.client.get(f"/api/v1/users/{follower_ids[0]}/following").json()
+        assert [UUID(item["id"]) for item in following["items"]] == [followed_id]
+
+        invalid = self.client.get(f"/api/v1/users/{followed_id}/followers?cursor=bogus")
+        assert invalid.status_code == 400
+        assert invalid.json()["detail"] == "invalid_cursor"
+
+    def test_influential_users(self) -> None:
+        star_id = self._create_user(email="influence-star@example.com", full_name="Star")
+        fan_ids = [
+            self._create_user(email=f"influence-fan{idx}@example.com", full_name=f"Fan {idx}")
+            for idx in range(2)
+        ]
+        for fan_id in fan_ids:
+            self.client.post(
+                "/api/v1/followers",
+                json={
+                    "follower_id": str(fan_id),
+                    "followed_id": str(star_id),
+                    "status": StatusEnum.ACCEPTED.value,
+                },
+            )
+
+        with self.session_factory() as session:
+            graph = FollowerGraph.from_database(session)
+            result = influence.pagerank(graph)
+            assert result.converged
+            assert influence.write_scores(session, graph, result) == 3
+
+        response = self.client.get("/api/v1/users/influential?limit=2")
+        assert response.status_code == 200
+        ranked = response.json()
+        assert [item["rank"] for item in ranked] == [1, 2]
+        assert UUID(ranked[0]["id"]) == star_id
+        assert ranked[0]["score"] > ranked[1]["score"]
+
+    def test_graph_snapshot_follows_worker_events(self, tmp_path: Path) -> None:
+        star_id = self._create_user(email="snapshot-star@example.com", full_name="Star")
+        fan_id = self._create_user(email="snapshot-fan@example.com", full_name="Fan")
+        sync = FollowerGraphSync(tmp_path, save_every=1)
+        handlers = {
+            "follow.created": sync.handle_follow_changed,
+            "follow.bulk_updated": sync.handle_follows_bulk_updated,
+            "follow.deleted": sync.handle_follow_deleted,
+        }
+
+        def replay() -> int:
+            with self.session_factory() as session:
+                for task, payload in self.events:
+                    handlers[task](session, payload)
+            self.events.clear()
+            return FollowerGraph.load(tmp_path).edge_count
+
+        self.events.clear()
+        follow_id = self._request_follow(fan_id, star_id)
+        # The graph is built from Postgres on the first event; the request is pending.
+        assert replay() == 0
+        with self.session_factory() as session:
+            assert sync.graph(session).index.keys() >= {fan_id, star_id}
+
+        self.client.post(
+            f"/api/v1/users/{star_id}/follow-requests:batch",
+            json={"status": "ACCEPTED", "ids": [str(follow_id)]},
+        )
+        assert replay() == 1
+        assert FollowerGraph.load(tmp_path).bfs(fan_id, max_depth=1).max() == 1
+
+        self.client.delete(f"/api/v1/followers/{follow_id}")
+        assert replay() == 0
+
+    def test_batch_relationships(self) -> None:
+        viewer_id = self._create_user(email="batch-viewer@example.com", full_name="Viewer")
+        accepted_id = self._create_user(email="batch-accepted@example.com", full_name="A")
+        pending_id = self._create_user(email="batch-pending@example.com", full_name="P")
+        stranger_id = self._create_user(email="batch-stranger@example.com", full_name="S")
+        self.client.post(
+            "/api/v1/followers",
+            json={
+                "follower_id": str(viewer_id),
+                "followed_id": str(accepted_id),
+                "status": StatusEnum.ACCEPTED.value,
+            },
+        )
+        self.client.post(
+            "/api/v1/followers",
+            json={"follower_id": str(viewer_id), "followed_id": str(pending_id)},
+        )
+
+        response = self.client.post(
+            f"/api/v1/users/{viewer_id}/relationships:batch",
+            json={"target_ids": [str(pending_id), str(accepted_id), str(stranger_id)]},
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"target_id": str(pending_id), "status": "PENDING"},
+            {"target_id": str(accepted_id), "status": "ACCEPTED"},
+            {"target_id": str(stranger_id), "status": None},
+        ]
+
+        missing = self.client.post(
+            f"/api/v1/users/{uuid4()}/relationships:batch",
+            json={"target_ids": [str(accepted_id)]},
+        )
+        assert missing.status_code == 404
+        assert missing.json()["detail"] == "user_not_found"
+
+        too_many = self.client.post(
+            f"/api/v1/users/{viewer_id}/relationships:batch",
+            json={"target_ids": [str(uuid4()) for _ in range(501)]},
+        )
+        assert too_many.status_code == 422
+
+    def _request_follow(self, follower_id: UUID, followed_id: UUID) -> UUID:
+        response = self.client.post(
+            "/api/v1/followers",
+            json={"follower_id": str(follower_id), "followed_id": str(followed_id)},
+        )
+        return UUID(response.json()["id"])
+
+    def test_decide_follow_requests_in_bulk(self) -> None:
+        owner_id = self._create_user(email="bulk-owner@example.com", full_name="Owner")
+        fan_ids = [
+            self._create_user(email=f"bulk-fan{idx}@example.com", full_name=f"Fan {idx}")
+            for idx in range(4)
+        ]
+        request_ids = [self._request_follow(fan_id, owner_id) for fan_id in fan_ids]
+        unrelated_id = self._request_follow(owner_id, fan_ids[0])
+        self.events.clear()
+
+        accepted = self.client.post(
+            f"/api/v1/users/{owner_id}/follow-requests:batch",
+            json={"status": "ACCEPTED", "ids": [str(request_ids[0]), str(unrelated_id)]},
+        )
+        assert accepted.status_code == 200
+        assert accepted.json() == {"count": 1, "ids": [str(request_ids[0])]}
+        assert self.events == [
+            (
+                "follow.bulk_updated",
+                {
+                    "ids": [str(request_ids[0])],
+                    "followed_id": str(owner_id),
+                    "status": StatusEnum.ACCEPTED.value,
+                },
+            )
+        ]
+
+        with self.session_factory() as session:
+            rejected = list(
+                follow_bulk.decide_requests(session, owner_id, StatusEnum.REJECTED, chunk_size=2)
+            )
+        assert [len(chunk) for chunk in rejected] == [2, 1]
+        assert {identifier for chunk in rejected for identifier in chunk} == set(request_ids[1:])
+        assert self._counts(owner_id) == (1, 0, 0)
+
+        invalid = self.client.post(
+            f"/api/v1/users/{owner_id}/follow-requests:batch", json={"status": "PENDING"}
+        )
+        assert invalid.status_code == 400
+        assert invalid.json()["detail"] == "invalid_status"
+
+    def test_unfollow_in_bulk(self) -> None:
+        fan_id = self._create_user(email="unfollow-fan@example.com", full_name="Fan")
+        idol_ids = [
+            self._create_user(email=f"unfollow-idol{idx}@example.com", full_name=f"Idol {idx}")
+            for idx in range(3)
+        ]
+        follow_ids = [self._request_follow(fan_id, idol_id) for idol_id in idol_ids]
+        self.events.clear()
+
+        response = self.client.post(
+            f"/api/v1/users/{fan_id}/following:unfollow",
+            json={"target_ids": [str(idol_ids[0]), str(idol_ids[2]), str(uuid4())]},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == 2
+        assert set(body["ids"]) == {str(follow_ids[0]), str(follow_ids[2])}
+        ((task, payload),) = self.events
+        assert task == "follow.bulk_deleted"
+        assert {relationship["followed_id"] for relationship in payload["relationships"]} == {
+            str(idol_ids[0]),
+            str(idol_ids[2]),
+        }
+
+        with self.session_factory() as session:
+            remaining = session.execute(
+                select(Followers.id).where(Followers.follower_id == fan_id)
+            ).scalars()
+            assert list(remaining) == [follow_ids[1]]
+
+        missing = self.client.post(
+            f"/api/v1/users/{uuid4()}/following:unfollow",
+            json={"target_ids": [str(idol_ids[1])]},
+        )
+        assert missing.status_code == 404
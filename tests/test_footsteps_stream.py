@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from typing import Any
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.schemas import FootstepsStreamPing
+from app.services.footsteps_stream import FootstepsBatcher, StreamSession
+from app.services.geofence import VenueFences
+from app.services.task_queue import TaskQueue
+
+URL = "redis://localhost:6379/0"
+
+
+class _Channel:
+    async def send_json(self, data: Any, mode: str = "text") -> None:
+        return None
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        return None
+
+
+async def test_flush_loop_restarts_after_a_crash(monkeypatch: pytest.MonkeyPatch) -> None:
+    batcher = FootstepsBatcher(
+        URL, sessionmaker(), VenueFences(sessionmaker()), TaskQueue(URL), flush_interval=0.01
+    )
+    flushed: list[int] = []
+
+    async def flaky_flush() -> None:
+        flushed.append(len(batcher._buffer))
+        if len(flushed) == 1:
+            raise RuntimeError("flush bug")
+        batcher._buffer.clear()
+        batcher._ready.clear()
+
+    monkeypatch.setattr(batcher, "flush", flaky_flush)
+    session = StreamSession(uuid.uuid4(), "footsteps:acks:test", 0, _Channel())
+    await batcher.submit(session, FootstepsStreamPing(seq=1, coordinates="POINT(13.4 52.5)"))
+
+    async def drained() -> None:
+        while batcher._buffer:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(drained(), 1)
+    # The first loop died on the bug; its replacement wrote the ping.
+    assert flushed == [1, 1]
+    await batcher.stop()
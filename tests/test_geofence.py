@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import uuid
+
+import numpy as np
+import pytest
+
+from app.services import geometry
+from app.services.geofence import FenceIndex
+
+SQUARE_WITH_HOLE = (
+    "POLYGON((13.40 52.50, 13.41 52.50, 13.41 52.51, 13.40 52.51, 13.40 52.50),"
+    "(13.404 52.504, 13.406 52.504, 13.406 52.506, 13.404 52.506, 13.404 52.504))"
+)
+
+
+def test_match_honours_holes_and_skips_degenerate_areas() -> None:
+    square, empty = uuid.uuid4(), uuid.uuid4()
+    index = FenceIndex.build(
+        [(square, SQUARE_WITH_HOLE), (empty, "POLYGON((0 0,0 0,0 0,0 0))"), (uuid.uuid4(), None)]
+    )
+    assert len(index) == 1
+
+    xs = np.array([13.401, 13.405, 13.42, 0.0])
+    ys = np.array([52.501, 52.505, 52.505, 0.0])
+    assert index.match(xs, ys) == [(0, square)]
+
+    index.remove(square)
+    assert index.match(xs, ys) == []
+
+
+def test_match_agrees_with_the_exact_outline_away_from_the_edge() -> None:
+    angles = np.linspace(0, 2 * np.pi, 240)
+    ring = np.stack([13.4 + 0.0005 * np.cos(angles), 52.5 + 0.0003 * np.sin(angles)], axis=1)
+    ring[-1] = ring[0]
+    venue_id = uuid.uuid4()
+    index = FenceIndex()
+    index.upsert(venue_id, "POLYGON((" + ",".join(f"{x} {y}" for x, y in ring) + "))")
+
+    rng = np.random.default_rng(3)
+    xs = 13.4 + rng.uniform(-0.001, 0.001, 4000)
+    ys = 52.5 + rng.uniform(-0.001, 0.001, 4000)
+    radius = np.hypot((xs - 13.4) / 0.0005, (ys - 52.5) / 0.0003)
+    matched = np.zeros(len(xs), dtype=bool)
+    matched[[point for point, _ in index.match(xs, ys)]] = True
+
+    assert matched[radius < 0.9].all()
+    assert not matched[radius > 1.0].any()
+
+
+def test_simplify_ring_stays_closed_and_drops_collinear_vertices() -> None:
+    ring = geometry.parse_polygon("POLYGON((0 0, 1 0, 2 0, 2 1, 2 2, 1 2, 0 2, 0 1, 0 0))")[0]
+    simplified = geometry.simplify_ring(ring, 0.01)
+    assert len(simplified) == 5
+    assert np.array_equal(simplified[0], simplified[-1])
+    assert geometry.contains([simplified], np.array([1.0, 3.0]), np.array([1.0, 1.0])).tolist() == [
+        True,
+        False,
+    ]
+
+
+def test_parse_point_rejects_points_off_the_globe() -> None:
+    assert geometry.parse_point(" point(-180 90) ") == (-180.0, 90.0)
+    for wkt in ("POINT(1)", "POINT(180.5 0)", "POINT(0 -90.1)"):
+        with pytest.raises(geometry.GeometryError):
+            geometry.parse_point(wkt)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import uuid
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.services.graph_csr import FollowerGraph, FollowerGraphSync
+
+
+def _chain(length: int) -> tuple[FollowerGraph, list[uuid.UUID]]:
+    ids = [uuid.uuid4() for _ in range(length)]
+    sources = np.arange(length - 1)
+    graph = FollowerGraph.from_edges(ids, sources, sources + 1)
+    return graph, ids
+
+
+def test_from_edges_deduplicates_and_sorts() -> None:
+    ids = [uuid.uuid4() for _ in range(3)]
+    graph = FollowerGraph.from_edges(ids, [2, 0, 0, 0], [0, 2, 1, 2])
+
+    assert graph.indptr.tolist() == [0, 2, 2, 3]
+    assert graph.indices.tolist() == [1, 2, 0]
+    assert graph.indices.dtype == np.int32
+    assert graph.out_degree().tolist() == [2, 0, 1]
+    assert graph.in_degree().tolist() == [1, 1, 1]
+    assert graph.index[ids[2]] == 2
+    assert graph.node_id(1) == ids[1]
+
+
+def test_bfs_and_k_hop() -> None:
+    graph, ids = _chain(5)
+
+    assert graph.bfs(ids[0]).tolist() == [0, 1, 2, 3, 4]
+    assert graph.bfs(ids[0], max_depth=2).tolist() == [0, 1, 2, -1, -1]
+    assert graph.bfs(ids[2], reverse=True).tolist() == [2, 1, 0, -1, -1]
+    assert graph.k_hop([ids[0], ids[3]], 1).tolist() == [0, 1, 3, 4]
+
+
+def test_incremental_updates() -> None:
+    graph, ids = _chain(4)
+    newcomer = uuid.uuid4()
+
+    graph.add_edge(ids[3], newcomer)
+    graph.remove_edge(ids[1], ids[2])
+    graph.remove_edge(ids[0], uuid.uuid4())
+
+    assert graph.node_count == 5
+    assert graph.bfs(ids[0]).tolist() == [0, 1, -1, -1, -1]
+    assert graph.bfs(ids[2]).tolist() == [-1, -1, 0, 1, 2]
+    assert graph.edge_count == 3
+
+    graph.remove_node_edges(ids[3])
+    assert graph.edge_count == 1
+    assert graph.node_id(4) == newcomer
+
+
+def test_snapshot_round_trip(tmp_path: Path) -> None:
+    graph, ids = _chain(6)
+    graph.add_edge(ids[5], ids[0])
+    graph.save(tmp_path)
+
+    loaded = FollowerGraph.load(tmp_path)
+
+    assert isinstance(loaded.indices, np.memmap)
+    assert loaded.index == graph.index
+    assert loaded.bfs(ids[3]).tolist() == [3, 4, 5, 0, 1, 2]
+
+    loaded.add_edge(ids[0], ids[3])
+    assert loaded.bfs(ids[0]).tolist() == [0, 1, 2, 1, 2, 3]
+
+
+def test_sync_writes_follow_events_to_the_snapshot(tmp_path: Path) -> None:
+    graph, ids = _chain(4)
+    graph.save(tmp_path)
+    sync = FollowerGraphSync(tmp_path, save_every=2)
+    db = Session()
+
+    sync.handle_follow_deleted(db, {"follower_id": str(ids[0]), "followed_id": str(ids[1])})
+    assert FollowerGraph.load(tmp_path).edge_count == 3
+
+    sync.handle_follows_bulk_deleted(
+        db,
+        {"relationships": [{"follower_id": str(ids[1]), "followed_id": str(ids[2])}]},
+    )
+    assert FollowerGraph.load(tmp_path).bfs(ids[1]).tolist() == [-1, 0, -1, -1]
+
+    sync.handle_user_deleted(db, {"id": str(ids[3])})
+    sync.save()
+    assert FollowerGraph.load(tmp_path).edge_count == 0
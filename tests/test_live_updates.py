@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from app.services.live_updates import HEARTBEAT, RESYNC, LiveUpdates
+
+
+def _occupancy(venue_id: uuid.UUID, present: int) -> dict[str, object]:
+    return {
+        "venues": [
+            {
+                "venue_id": str(venue_id),
+                "day": "2026-10-20",
+                "present": present,
+                "unique_visitors": present,
+            }
+        ]
+    }
+
+
+async def test_streams_fan_out_by_topic() -> None:
+    hub = LiveUpdates(asyncio.get_running_loop(), queue_size=8, heartbeat=0.05)
+    venue_id, follower_id, followed_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    venue_stream = hub.stream([venue_id, venue_id], None)
+    inbox_stream = hub.stream([], followed_id)
+    assert (await anext(venue_stream)).startswith("retry:")
+    assert (await anext(inbox_stream)).startswith("retry:")
+    assert len(hub) == 2
+
+    # Handlers run on the subscriber thread in production.
+    await asyncio.to_thread(hub.handle_occupancy_updated, _occupancy(venue_id, 3))
+    await asyncio.to_thread(
+        hub.handle_follow_changed,
+        {"id": "f1", "follower_id": str(follower_id), "followed_id": str(followed_id)},
+    )
+
+    frame = await anext(venue_stream)
+    assert frame.startswith("event: occupancy\n")
+    assert '"present":3' in frame
+    assert (await anext(venue_stream)) == HEARTBEAT
+    assert (await anext(inbox_stream)).startswith("event: follow_request\n")
+
+    await venue_stream.aclose()
+    await inbox_stream.aclose()
+    assert len(hub) == 0
+
+
+async def test_slow_client_backlog_collapses_to_resync() -> None:
+    hub = LiveUpdates(asyncio.get_running_loop(), queue_size=2, heartbeat=0.05)
+    venue_id = uuid.uuid4()
+    stream = hub.stream([venue_id], None)
+    await anext(stream)
+
+    for present in range(3):
+        await asyncio.to_thread(hub.handle_occupancy_updated, _occupancy(venue_id, present))
+    assert (await anext(stream)) == RESYNC
+    assert (await anext(stream)) == HEARTBEAT
+
+    await asyncio.to_thread(hub.handle_resync)
+    assert (await anext(stream)) == RESYNC
+    await stream.aclose()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.services.opening_hours import (
+    MINUTES_PER_DAY,
+    MINUTES_PER_WEEK,
+    OpeningHoursError,
+    minute_of_week,
+    parse,
+    to_multirange,
+)
+
+MONDAY, FRIDAY, SATURDAY, SUNDAY = 0, 4, 5, 6
+
+
+def _at(day: int, hour: int, minute: int = 0) -> int:
+    return day * MINUTES_PER_DAY + hour * 60 + minute
+
+
+def test_parse_day_rules_and_overrides() -> None:
+    ranges = parse("Mo-Fr 16:00-23:00; Fr 16:00-02:00; Sa,Su 12:00-14:00,18:00-22:00; Su off")
+
+    assert ranges[0] == (_at(MONDAY, 16), _at(MONDAY, 23))
+    assert (_at(FRIDAY, 16), _at(SATURDAY, 2)) in ranges
+    assert (_at(SATURDAY, 12), _at(SATURDAY, 14)) in ranges
+    assert all(not start <= _at(SUNDAY, 13) < end for start, end in ranges)
+    assert len(ranges) == 7
+
+
+def test_parse_wraps_midnight_and_week() -> None:
+    assert parse("24/7") == [(0, MINUTES_PER_WEEK)]
+    assert parse("Sunday 22:00-02:00") == [(0, 120), (_at(SUNDAY, 22), MINUTES_PER_WEEK)]
+    # Adjacent daily ranges merge into one.
+    assert parse("00:00-24:00") == [(0, MINUTES_PER_WEEK)]
+    assert parse("Fr-Mo 10:00-11:00")[0] == (_at(MONDAY, 10), _at(MONDAY, 11))
+    assert to_multirange(parse("Mo 09:00-10:30")) == "{[540,630)}"
+    assert to_multirange(parse("off")) == "{}"
+
+
+@pytest.mark.parametrize("value", ["Open late", "Mo-Fr 9-5", "Mo 25:00-26:00", "Xy 10:00-11:00"])
+def test_parse_rejects_unknown_formats(value: str) -> None:
+    with pytest.raises(OpeningHoursError):
+        parse(value)
+
+
+def test_minute_of_week_uses_the_venue_timezone() -> None:
+    moment = datetime(2026, 10, 19, 3, 30, tzinfo=timezone.utc)  # Monday
+    assert minute_of_week(moment, ZoneInfo("UTC")) == _at(MONDAY, 3, 30)
+    assert minute_of_week(moment, ZoneInfo("America/Chicago")) == _at(SUNDAY, 22, 30)
+    assert minute_of_week(datetime(2026, 10, 23, 18, 0), ZoneInfo("Asia/Tokyo")) == _at(FRIDAY, 18)
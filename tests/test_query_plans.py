@@ -0,0 +1,312 @@
+"""EXPLAIN regression suite for the hot queries issued by ``app/api/routes.py``.
+
+Each case drives one endpoint against a seeded database, records the statements it
+sends, and EXPLAINs them with sequential scans disabled. The planner then only falls
+back to a ``Seq Scan`` when no index can serve the predicate, so any such node means a
+hot query lost its index.
+"""
+from __future__ import annotations
+
+import random
+import uuid
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.engine import Engine
+
+from app.models import Followers, Operators, Users, Venues
+from app.models.followers import StatusEnum
+from app.models.operators import OperatorRole, operator_venues
+from tests.conftest import APITestContext
+
+USER_COUNT = 500
+FOLLOWS_PER_USER = 6
+VENUE_COUNT = 200
+OPERATOR_COUNT = 50
+
+
+@dataclass
+class SeededIds:
+    user_id: uuid.UUID
+    other_user_id: uuid.UUID
+    stranger_id: uuid.UUID
+    follow_id: uuid.UUID
+    venue_id: uuid.UUID
+    operator_id: uuid.UUID
+
+
+def _seed(engine: Engine) -> SeededIds:
+    rng = random.Random(42)
+    user_ids = [uuid.uuid4() for _ in range(USER_COUNT)]
+    venue_ids = [uuid.uuid4() for _ in range(VENUE_COUNT)]
+    operator_ids = [uuid.uuid4() for _ in range(OPERATOR_COUNT)]
+
+    pairs: set[tuple[uuid.UUID, uuid.UUID]] = set()
+    for follower_id in user_ids[1:]:
+        for followed_id in rng.sample(user_ids[1:], FOLLOWS_PER_USER):
+            if followed_id != follower_id:
+                pairs.add((follower_id, followed_id))
+    follows: list[dict[str, Any]] = [
+        {
+            "id": uuid.uuid4(),
+            "follower_id": follower_id,
+            "followed_id": followed_id,
+            "status": rng.choice(list(StatusEnum)),
+        }
+        for follower_id, followed_id in pairs
+    ]
+
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Users),
+            [
+                {
+                    "id": user_id,
+                    "email": f"plan-{index}@example.com",
+                    "full_name": f"Plan User {index}",
+                    "oauth_provider": "test",
+                    "oauth_provider_id": f"plan-{index}",
+                    "points": index,
+                }
+                for index, user_id in enumerate(user_ids)
+            ],
+        )
+        connection.execute(insert(Followers), follows)
+        connection.execute(
+            insert(Venues),
+            [
+                {
+                    "id": venue_id,
+                    "name": f"Plan Venue {index}",
+                    "owner_id": user_ids[index % USER_COUNT],
+                    "experience_points": index,
+                    "tags": [f"plan-tag-{index % 10}", "plan"],
+                }
+                for index, venue_id in enumerate(venue_ids)
+            ],
+        )
+        connection.execute(
+            insert(Operators),
+            [
+                {
+                    "id": operator_id,
+                    "role": OperatorRole.STAFF,
+                    "email": f"plan-operator-{index}@example.com",
+                    "full_name": f"Plan Operator {index}",
+                    "phone_number": "+15555550100",
+                }
+                for index, operator_id in enumerate(operator_ids)
+            ],
+        )
+        connection.execute(
+            insert(operator_venues),
+            [
+                {"operator_id": operator_id, "venue_id": venue_id}
+                for operator_id in operator_ids
+                for venue_id in rng.sample(venue_ids, 4)
+            ],
+        )
+        connection.execute(text("ANALYZE"))
+
+    return SeededIds(
+        user_id=user_ids[1],
+        other_user_id=user_ids[2],
+        stranger_id=user_ids[0],
+        follow_id=follows[0]["id"],
+        venue_id=venue_ids[0],
+        operator_id=operator_ids[0],
+    )
+
+
+Call = Callable[[Any, SeededIds], Any]
+
+HOT_ENDPOINTS: list[Any] = [
+    pytest.param(lambda c, s: c.get(f"/api/v1/users/{s.user_id}"), id="get_user"),
+    pytest.param(lambda c, s: c.get(f"/api/v1/users/{s.user_id}/counts"), id="get_user_counts"),
+    pytest.param(lambda c, s: c.get("/api/v1/users/influential"), id="list_influential_users"),
+    pytest.param(
+        lambda c, s: c.post(
+            "/api/v1/users",
+            json={
+                "email": "plan-1@example.com",
+                "full_name": "Duplicate",
+                "oauth_provider": "test",
+                "oauth_provider_id": "plan-new",
+            },
+        ),
+        id="create_user_conflict",
+    ),
+    pytest.param(
+        lambda c, s: c.put(
+            f"/api/v1/users/{s.user_id}",
+            json={"email": "plan-renamed@example.com", "oauth_provider_id": "plan-renamed"},
+        ),
+        id="update_user",
+    ),
+    pytest.param(lambda c, s: c.delete(f"/api/v1/users/{s.user_id}"), id="delete_user"),
+    pytest.param(
+        lambda c, s: c.get(f"/api/v1/users/{s.user_id}/followers"), id="list_user_followers"
+    ),
+    pytest.param(
+        lambda c, s: c.get(f"/api/v1/users/{s.user_id}/following"), id="list_user_following"
+    ),
+    pytest.param(
+        lambda c, s: c.get(f"/api/v1/users/{s.user_id}/leaderboard/friends"),
+        id="friends_leaderboard",
+    ),
+    pytest.param(
+        lambda c, s: c.post(
+            f"/api/v1/users/{s.user_id}/relationships:batch",
+            json={"target_ids": [str(s.other_user_id), str(s.stranger_id)]},
+        ),
+        id="batch_user_relationships",
+    ),
+    pytest.param(
+        lambda c, s: c.post(
+            f"/api/v1/users/{s.user_id}/follow-requests:batch", json={"status": "ACCEPTED"}
+        ),
+        id="accept_all_follow_requests",
+    ),
+    pytest.param(
+        lambda c, s: c.post(
+            f"/api/v1/users/{s.user_id}/following:unfollow",
+            json={"target_ids": [str(s.other_user_id)]},
+        ),
+        id="unfollow_users",
+    ),
+    pytest.param(
+        lambda c, s: c.get("/api/v1/venues/search", params={"q": "plan venue 7"}),
+        id="search_venues",
+    ),
+    pytest.param(
+        lambda c, s: c.get(
+            "/api/v1/venues/search",
+            params={"q": "venue", "latitude": 0, "longitude": 0, "radius_m": 1000},
+        ),
+        id="search_venues_nearby",
+    ),
+    pytest.param(
+        lambda c, s: c.get("/api/v1/venues", params={"tags_all": ["plan-tag-3", "plan"]}),
+        id="list_venues_tagged_all",
+    ),
+    pytest.param(
+        lambda c, s: c.get("/api/v1/venues", params={"tags_any": ["plan-tag-3", "plan-tag-4"]}),
+        id="list_venues_tagged_any",
+    ),
+    pytest.param(
+        lambda c, s: c.get("/api/v1/venues", params={"open_at": "2026-10-19T12:00:00Z"}),
+        id="list_venues_open_at",
+    ),
+    pytest.param(lambda c, s: c.get("/api/v1/venues/tags"), id="popular_venue_tags"),
+    pytest.param(lambda c, s: c.get(f"/api/v1/venues/{s.venue_id}"), id="get_venue"),
+    pytest.param(
+        lambda c, s: c.get(f"/api/v1/venues/{s.venue_id}/visitors"),
+        id="list_venue_daily_visitors",
+    ),
+    pytest.param(
+        lambda c, s: c.put(f"/api/v1/venues/{s.venue_id}", json={"capacity": 10}),
+        id="update_venue",
+    ),
+    pytest.param(lambda c, s: c.get(f"/api/v1/operators/{s.operator_id}"), id="get_operator"),
+    pytest.param(
+        lambda c, s: c.put(
+            f"/api/v1/operators/{s.operator_id}",
+            json={
+                "role": None,
+                "email": None,
+                "full_name": None,
+                "phone_number": None,
+                "venue_ids": [str(s.venue_id)],
+                "is_active": None,
+            },
+        ),
+        id="update_operator",
+    ),
+    pytest.param(
+        lambda c, s: c.post(
+            "/api/v1/followers",
+            json={"follower_id": str(s.stranger_id), "followed_id": str(s.user_id)},
+        ),
+        id="create_follow",
+    ),
+    pytest.param(
+        lambda c, s: c.get(f"/api/v1/followers?follower_id={s.user_id}"),
+        id="list_follows_by_follower",
+    ),
+    pytest.param(
+        lambda c, s: c.get(f"/api/v1/followers?followed_id={s.user_id}"),
+        id="list_follows_by_followed",
+    ),
+    pytest.param(
+        lambda c, s: c.get(f"/api/v1/followers?followed_id={s.user_id}&status_filter=PENDING"),
+        id="list_pending_follow_requests",
+    ),
+    pytest.param(
+        lambda c, s: c.get("/api/v1/followers?status_filter=ACCEPTED"),
+        id="list_follows_by_status",
+    ),
+    pytest.param(
+        lambda c, s: c.get(
+            f"/api/v1/followers?follower_id={s.user_id}&followed_id={s.other_user_id}"
+        ),
+        id="find_follow_pair",
+    ),
+    pytest.param(lambda c, s: c.get(f"/api/v1/followers/{s.follow_id}"), id="get_follow"),
+    pytest.param(
+        lambda c, s: c.put(f"/api/v1/followers/{s.follow_id}", json={"status": "ACCEPTED"}),
+        id="update_follow",
+    ),
+    pytest.param(lambda c, s: c.delete(f"/api/v1/followers/{s.follow_id}"), id="delete_follow"),
+]
+
+
+@pytest.fixture()
+def seeded(api_app: APITestContext) -> Iterator[tuple[APITestContext, Engine, SeededIds]]:
+    _, session_factory, _ = api_app
+    engine: Engine = session_factory.kw["bind"]
+    yield api_app, engine, _seed(engine)
+
+
+@pytest.mark.parametrize("call", HOT_ENDPOINTS)
+def test_hot_query_avoids_sequential_scan(
+    seeded: tuple[APITestContext, Engine, SeededIds], call: Call
+) -> None:
+    (client, _, _), engine, ids = seeded
+    captured: list[tuple[str, Any]] = []
+
+    def capture(
+        _conn: Any, _cursor: Any, statement: str, parameters: Any, _context: Any, many: bool
+    ) -> None:
+        if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            captured.append((statement, parameters[0] if many else parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = call(client, ids)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code < 500
+    assert captured
+
+    offenders = []
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in captured:
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            ).scalar_one()
+            scanned = sorted(set(_seq_scanned_relations(plan[0]["Plan"])))
+            if scanned:
+                offenders.append(f"{scanned}: {statement}")
+
+    assert not offenders, "sequential scans in hot queries:\n" + "\n".join(offenders)
+
+
+def _seq_scanned_relations(node: dict[str, Any]) -> Iterator[str]:
+    if node.get("Node Type") == "Seq Scan":
+        yield node.get("Relation Name", "?")
+    for child in node.get("Plans", []):
+        yield from _seq_scanned_relations(child)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import numpy as np
+from app.services import stay_points
+
+THRESHOLDS = {"radius": 50.0, "min_dwell": 600.0, "max_gap": 900.0}
+
+
+def _walk(start: float, steps: int, minute: int) -> tuple[list[float], list[float]]:
+    # About 68 m of longitude per step at this latitude, one footstep a minute.
+    xs = [start + 0.001 * step for step in range(steps)]
+    return xs, [60.0 * (minute + step) for step in range(steps)]
+
+
+def test_detect_finds_dwells_per_user() -> None:
+    walk_in, walk_in_times = _walk(13.40, 10, 0)
+    stay = list(13.41 + np.random.default_rng(4).normal(0, 0.00003, 20))
+    walk_out, walk_out_times = _walk(13.42, 10, 30)
+    xs = walk_in + stay + walk_out + [13.5] * 6
+    times = walk_in_times + [60.0 * (10 + minute) for minute in range(20)] + walk_out_times
+    times += [60.0 * minute for minute in range(6)]
+    users = np.array([0] * 40 + [1] * 6)
+
+    found = stay_points.detect(
+        users, np.array(xs), np.full(len(xs), 52.5), np.array(times), **THRESHOLDS
+    )
+    # The second user's five minutes in one place are too short to count.
+    assert (found.first.tolist(), found.last.tolist()) == ([10], [29])
+    assert abs(found.xs[0] - 13.41) < 0.0001
+    assert found.ys.tolist() == [52.5]
+
+
+def test_detect_splits_stays_at_silences() -> None:
+    times = np.array([0, 300, 600, 2400, 2700, 3000], dtype=np.float64)
+    xs = np.full(len(times), 13.4)
+    found = stay_points.detect(
+        np.zeros(len(times), dtype=int), xs, np.full(len(times), 52.5), times, **THRESHOLDS
+    )
+    assert (found.first.tolist(), found.last.tolist()) == ([0, 3], [2, 5])
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.services import trajectory
+
+# About 11 m of longitude per step at this latitude.
+STEP = 0.00016
+THRESHOLDS = {"min_distance": 10.0, "min_interval": 60.0, "tolerance": 5.0}
+
+
+def test_thin_keeps_one_point_per_interval_while_standing_still() -> None:
+    times = np.arange(0, 300, 5, dtype=np.float64)
+    xs = 13.4 + np.random.default_rng(1).normal(0, 0.00001, len(times))
+    ys = np.full(len(times), 52.5)
+    keep = trajectory.thin(["a"] * len(times), xs, ys, times, {}, **THRESHOLDS)
+    assert times[keep].tolist() == [0, 60, 120, 180, 240]
+
+    # A stored point from the previous batch counts as the last kept one.
+    stored = {"a": (13.4, 52.5, 0.0)}
+    keep = trajectory.thin(["a"] * 3, xs[:3], ys[:3], times[:3] + 50, stored, **THRESHOLDS)
+    assert keep.tolist() == [False, False, True]
+
+
+def test_thin_simplifies_moving_runs_per_user() -> None:
+    straight = 13.4 + STEP * np.arange(10)
+    bend = np.r_[straight, straight[-1] + np.zeros(5)]
+    xs = np.r_[straight, bend]
+    ys = np.r_[np.full(10, 52.5), np.full(10, 52.51), 52.51 + STEP * np.arange(1, 6)]
+    users = ["walker"] * 10 + ["turner"] * 15
+    times = np.r_[np.arange(10), np.arange(15)].astype(np.float64)
+
+    # Shuffled input order must not matter.
+    order = np.random.default_rng(2).permutation(len(xs))
+    keep = np.zeros(len(xs), dtype=bool)
+    keep[order] = trajectory.thin(
+        [users[index] for index in order], xs[order], ys[order], times[order], {}, **THRESHOLDS
+    )
+    assert np.flatnonzero(keep[:10]).tolist() == [0, 9]
+    assert np.flatnonzero(keep[10:]).tolist() == [0, 9, 14]
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
-from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
 
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import get_settings
 from app.models import Users
+from app.services import points_ledger
+from app.services.geofence import VenueFences
+from app.services.leaderboard import Leaderboard
+from app.services.presence import Presence
+from app.services.relationship_cache import RelationshipCache
 from tests.conftest import TestBase
 
 
@@ -115,8 +126,12 @@ class TestUsers(TestBase):
             "oauth_provider",
             "oauth_provider_id",
             "points",
+            "avatar_url",
             "created_at",
             "updated_at",
+            "followers_count",
+            "following_count",
+            "pending_requests_count",
         }
 
     def test_create_conflict(self):
@@ -166,3 +181,224 @@ class TestUsers(TestBase):
         assert len(data) == 2
         emails = [item["email"] for item in data]
         assert emails == [payload_two["email"], payload_one["email"]]
+
+    def test_leaderboard(self) -> None:
+        with self.session_factory() as session:
+            users = [
+                Users(
+                    email=f"leader-{index}@example.com",
+                    full_name=f"Leader {index}",
+                    oauth_provider="github",
+                    oauth_provider_id=f"oauth-leader-{index}",
+                    points=points,
+                )
+                for index, points in enumerate([50, 30, 10, 40])
+            ]
+            session.add_all(users)
+            session.commit()
+            ids = [str(user.id) for user in users]
+            # rebuild() renames over its key, so keep the test off the live board.
+            key = f"leaderboard-test-{uuid4().hex}"
+            app: Any = self.client.app
+            app.dependency_overrides[deps.get_leaderboard] = lambda: Leaderboard(
+                str(get_settings().redis_url), key=key
+            )
+            leaderboard = Leaderboard(str(get_settings().redis_url), key=key)
+            try:
+                assert leaderboard.rebuild(session) == 4
+            finally:
+                leaderboard.close()
+
+        top = self.client.get("/api/v1/users/leaderboard", params={"limit": 2}).json()
+        assert [(entry["user_id"], entry["rank"]) for entry in top] == [(ids[0], 1), (ids[3], 2)]
+
+        around = self.client.get(f"/api/v1/users/{ids[1]}/leaderboard", params={"radius": 1})
+        assert around.status_code == 200
+        assert [(entry["points"], entry["rank"]) for entry in around.json()] == [
+            (40, 2),
+            (30, 3),
+            (10, 4),
+        ]
+        unranked = self.client.get(f"/api/v1/users/{UUID(int=0)}/leaderboard")
+        assert unranked.status_code == 404
+        assert unranked.json()["detail"] == "user_not_ranked"
+
+        for followed, status in ((ids[0], "ACCEPTED"), (ids[3], "PENDING")):
+            response = self.client.post(
+                "/api/v1/followers",
+                json={"follower_id": ids[2], "followed_id": followed, "status": status},
+            )
+            assert response.status_code == 201
+        friends = self.client.get(f"/api/v1/users/{ids[2]}/leaderboard/friends").json()
+        assert [(entry["user_id"], entry["rank"]) for entry in friends] == [
+            (ids[0], 1),
+            (ids[2], 2),
+        ]
+
+    def test_points_increment(self) -> None:
+        created = self.client.post(
+            "/api/v1/users",
+            json={
+                "email": "points@example.com",
+                "full_name": "Points User",
+                "oauth_provider": "github",
+                "oauth_provider_id": "oauth-points",
+                "points": 10,
+            },
+        )
+        user_id = created.json()["id"]
+
+        for delta, expected in ((5, 15), (20, 35), (-3, 32)):
+            response = self.client.post(
+                f"/api/v1/users/{user_id}/points:increment",
+                json={"delta": delta, "reason": "checkin"},
+            )
+            assert response.status_code == 200
+            assert response.json() == {"user_id": user_id, "points": expected}
+        assert self.client.get(f"/api/v1/users/{user_id}").json()["points"] == 32
+
+        with self.session_factory() as session:
+            batches = list(points_ledger.compact(session, batch_size=2))
+            assert [batch.entries for batch in batches] == [2, 1]
+            user = session.get(Users, UUID(user_id))
+            assert user is not None
+            assert user.points == 32
+            assert points_ledger.pending(session, [UUID(user_id)]) == {}
+        assert self.client.get(f"/api/v1/users/{user_id}").json()["points"] == 32
+
+        self.client.post(f"/api/v1/users/{user_id}/points:increment", json={"delta": 8})
+        reset = self.client.put(f"/api/v1/users/{user_id}", json={"points": 100})
+        assert reset.json()["points"] == 100
+        assert self.client.get("/api/v1/users").json()[0]["points"] == 100
+
+        zero = self.client.post(f"/api/v1/users/{user_id}/points:increment", json={"delta": 0})
+        assert zero.status_code == 400
+        assert zero.json()["detail"] == "invalid_points_delta"
+        missing = self.client.post(
+            f"/api/v1/users/{UUID(int=0)}/points:increment", json={"delta": 1}
+        )
+        assert missing.status_code == 404
+        assert missing.json()["detail"] == "user_not_found"
+
+    def test_location_and_nearby(self) -> None:
+        with self.session_factory() as session:
+            users = [
+                Users(
+                    email=f"nearby-{index}@example.com",
+                    full_name=f"Nearby {index}",
+                    oauth_provider="github",
+                    oauth_provider_id=f"oauth-nearby-{index}",
+                )
+                for index in range(4)
+            ]
+            session.add_all(users)
+            session.commit()
+            viewer, friend, stranger, far = (str(user.id) for user in users)
+        self.client.post(
+            "/api/v1/followers",
+            json={"follower_id": viewer, "followed_id": friend, "status": "ACCEPTED"},
+        )
+
+        namespace = f"presence-test-{uuid4().hex}"
+        app: Any = self.client.app
+        app.dependency_overrides[deps.get_presence] = lambda: Presence(
+            str(get_settings().redis_url), namespace=namespace
+        )
+        fences = VenueFences(self.session_factory)
+        fences.load()
+        app.state.venue_fences = fences
+
+        now = datetime.now(timezone.utc)
+        pings = [
+            (viewer, "POINT(13.4000 52.5000)", now - timedelta(minutes=5)),
+            (viewer, "POINT(13.4050 52.5000)", now),
+            (friend, "POINT(13.4057 52.5000)", now),
+            (stranger, "POINT(13.4050 52.5003)", now),
+            (far, "POINT(13.5000 52.5000)", now),
+        ]
+        footsteps = [
+            {"user_id": user_id, "coordinates": coordinates, "created_at": at.isoformat()}
+            for user_id, coordinates, at in pings
+        ]
+        response = self.client.post("/api/v1/footsteps:batch", json={"footsteps": footsteps})
+        assert response.status_code == 200
+
+        location = self.client.get(f"/api/v1/users/{viewer}/location").json()
+        assert location["coordinates"] == "POINT(13.4050 52.5000)"
+        missing = self.client.get(f"/api/v1/users/{uuid4()}/location")
+        assert missing.status_code == 404
+        assert missing.json()["detail"] == "location_not_found"
+
+        nearby = self.client.get(f"/api/v1/users/{viewer}/nearby", params={"radius": 500})
+        assert nearby.status_code == 200
+        assert [entry["user_id"] for entry in nearby.json()] == [stranger, friend]
+        friends = self.client.get(
+            f"/api/v1/users/{viewer}/nearby", params={"radius": 500, "following": True}
+        ).json()
+        assert [entry["user_id"] for entry in friends] == [friend]
+        assert 40 < friends[0]["distance_m"] < 60
+
+        absent = self.client.get(f"/api/v1/users/{uuid4()}/nearby")
+        assert absent.status_code == 404
+        assert absent.json()["detail"] == "user_not_present"
+
+        class EvictedCache(RelationshipCache):
+            # Reports the set loaded, but it is gone again by the time it is read.
+            def load(self, db: Session, user_id: UUID) -> bool:
+                return True
+
+        app.dependency_overrides[deps.get_relationship_cache] = lambda: EvictedCache(
+            str(get_settings().redis_url), namespace=f"follows-test-{uuid4().hex}"
+        )
+        evicted = self.client.get(f"/api/v1/users/{viewer}/nearby", params={"following": True})
+        assert evicted.status_code == 404
+        assert evicted.json()["detail"] == "user_not_present"
+
+    def test_bulk_upsert(self) -> None:
+        existing = self.client.post(
+            "/api/v1/users",
+            json={
+                "email": "bulk-existing@example.com",
+                "full_name": "Before Bulk",
+                "oauth_provider": "github",
+                "oauth_provider_id": "oauth-bulk-existing",
+                "points": 7,
+            },
+        )
+        assert existing.status_code == 201
+        existing_id = existing.json()["id"]
+        self.events.clear()
+
+        lines = [
+            '{"email": "bulk-new@example.com", "full_name": "New", '
+            '"oauth_provider": "google", "oauth_provider_id": "oauth-bulk-new"}',
+            '{"email": "BULK-EXISTING@example.com", "full_name": "After Bulk", '
+            '"oauth_provider": "github", "oauth_provider_id": "oauth-bulk-existing"}',
+            "",
+            '{"email": "not-an-email"}',
+            '{"email": "bulk-stolen@example.com", "full_name": "Stolen", '
+            '"oauth_provider": "github", "oauth_provider_id": "oauth-bulk-existing"}',
+        ]
+        response = self.client.post(
+            "/api/v1/users:bulk",
+            content="\n".join(lines),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+
+        body = response.json()
+        assert (body["created"], body["updated"], body["failed"]) == (1, 1, 2)
+        rows = {row["line"]: row for row in body["rows"]}
+        assert rows[1]["status"] == "created"
+        assert rows[2] == {"line": 2, "status": "updated", "id": existing_id, "error": None}
+        assert rows[4]["error"] == "invalid_payload"
+        assert rows[5]["error"] == "duplicate_in_batch"
+        assert self.events == [
+            ("user.bulk_upserted", {"created": [rows[1]["id"]], "updated": [existing_id]})
+        ]
+
+        with self.session_factory() as session:
+            stored = session.get(Users, UUID(existing_id))
+            assert stored is not None
+            assert stored.full_name == "After Bulk"
+            assert stored.points == 7
@@ -1,9 +1,36 @@
 from __future__ import annotations
 
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
 from typing import Any
 from uuid import UUID, uuid4
+from zoneinfo import ZoneInfo
 
-from app.models import Venues
+import pytest
+import redis
+from sqlalchemy import func, select
+from starlette.websockets import WebSocketDisconnect
+
+from app.api import deps
+from app.core.config import get_settings
+from app.models import Footsteps, Users, Venues, Visits
+from app.schemas import FootstepsCreate, FootstepsStreamPing
+from app.services import (
+    TaskQueue,
+    footsteps_buffer,
+    footsteps_ingest,
+    geofence,
+    points_ledger,
+    visit_awards,
+)
+from app.services.amenity_facets import VenueFacets
+from app.services.autocomplete import VenueAutocomplete
+from app.services.footsteps_buffer import FootstepsBuffer
+from app.services.footsteps_stream import FootstepsBatcher
+from app.services.geofence import VenueFences
+from app.services.occupancy import VenueOccupancy, persist_daily
+from app.services.stay_points import infer_visits
 from tests.conftest import TestBase
 
 
@@ -109,6 +136,26 @@ class TestVenues(TestBase):
 
         assert self.events == [("venue.updated", {"id": str(venue_id)})]
 
+    def test_invalid_coordinates(self) -> None:
+        for coordinates in ("POINT(13.4)", "POINT(200 52.5)", "POINT(13.4 -91)"):
+            payload = {**self._venue_payload(name="Nowhere"), "coordinates": coordinates}
+            assert self.client.post("/api/v1/venues", json=payload).status_code == 422
+
+        created = self.client.post("/api/v1/venues", json=self._venue_payload(name="Somewhere"))
+        assert created.status_code == 201
+        response = self.client.put(
+            f"/api/v1/venues/{created.json()['id']}", json={"coordinates": "POINT(0 100)"}
+        )
+        assert response.status_code == 422
+
+        line = {"name": "Bulk Nowhere", "owner_id": str(uuid4()), "experience_points": 1}
+        response = self.client.post(
+            "/api/v1/venues:bulk",
+            content=json.dumps({**line, "coordinates": "POINT(181 0)"}) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.json()["rows"][0]["error"] == "invalid_payload"
+
     def test_read(self) -> None:
         self.events.clear()
 
@@ -143,3 +190,733 @@ class TestVenues(TestBase):
         assert len(data) == 2
         assert UUID(data[0]["id"]) == newer_id
         assert UUID(data[1]["id"]) == older_id
+
+    def test_amenity_filters_and_facets(self) -> None:
+        venues = [
+            {**self._venue_payload(name="Jazz Cellar"), "live_music": True, "indoor": True},
+            {**self._venue_payload(name="Beer Garden"), "live_music": False, "outdoor": True},
+            {**self._venue_payload(name="Unknown Bar"), "indoor": True},
+        ]
+        for venue in venues:
+            assert self.client.post("/api/v1/venues", json=venue).status_code == 201
+
+        listed = self.client.get("/api/v1/venues", params={"indoor": True}).json()
+        assert {venue["name"] for venue in listed} == {"Jazz Cellar", "Unknown Bar"}
+        listed = self.client.get("/api/v1/venues", params={"live_music": False}).json()
+        assert [venue["name"] for venue in listed] == ["Beer Garden"]
+
+        assert self.client.get("/api/v1/venues/facets").status_code == 503
+        facets = VenueFacets(self.session_factory)
+        facets.load()
+        self.client.app.state.venue_facets = facets  # type: ignore[attr-defined]
+
+        response = self.client.get("/api/v1/venues/facets", params={"indoor": True})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["amenities"]["live_music"] == 1
+        assert data["amenities"]["outdoor"] == 0
+
+    def test_tags(self) -> None:
+        venues = [
+            {**self._venue_payload(name="Roof Brewery"), "tags": ["Craft Beer", "rooftop"]},
+            {**self._venue_payload(name="Cellar Taps"), "tags": "craft beer, cellar"},
+            {**self._venue_payload(name="Sky Lounge"), "tags": ["rooftop", "Rooftop"]},
+        ]
+        created = []
+        for venue in venues:
+            response = self.client.post("/api/v1/venues", json=venue)
+            assert response.status_code == 201
+            created.append(response.json())
+        assert created[1]["tags"] == ["craft-beer", "cellar"]
+        assert created[2]["tags"] == ["rooftop"]
+
+        def names(**params: Any) -> set[str]:
+            response = self.client.get("/api/v1/venues", params=params)
+            assert response.status_code == 200
+            return {venue["name"] for venue in response.json()}
+
+        assert names(tags_all=["craft-beer", "rooftop"]) == {"Roof Brewery"}
+        assert names(tags_any=["cellar", "Rooftop"]) == {
+            "Cellar Taps",
+            "Sky Lounge",
+            "Roof Brewery",
+        }
+        assert names(tags_all=["craft-beer"], tags_any=["cellar"]) == {"Cellar Taps"}
+
+        def popular() -> dict[str, int]:
+            response = self.client.get("/api/v1/venues/tags")
+            assert response.status_code == 200
+            return {tag["name"]: tag["venue_count"] for tag in response.json()}
+
+        assert popular() == {"craft-beer": 2, "rooftop": 2, "cellar": 1}
+
+        update = self.client.put(
+            f"/api/v1/venues/{created[0]['id']}", json={"tags": ["rooftop", "cocktails"]}
+        )
+        assert update.status_code == 200
+        assert self.client.delete(f"/api/v1/venues/{created[1]['id']}").status_code == 204
+        assert popular() == {"rooftop": 2, "cocktails": 1}
+
+    def test_open_at(self) -> None:
+        venues = [
+            {**self._venue_payload(name="Late Bar"), "opening_hours": "Mo-Fr 16:00-02:00"},
+            {**self._venue_payload(name="Weekend Cafe"), "opening_hours": "Sa,Su 12:00-18:00"},
+            self._venue_payload(name="Unknown Hours"),
+        ]
+        for venue in venues:
+            assert self.client.post("/api/v1/venues", json=venue).status_code == 201
+
+        def open_at(moment: str) -> list[str]:
+            response = self.client.get("/api/v1/venues", params={"open_at": moment})
+            assert response.status_code == 200
+            return [venue["name"] for venue in response.json()]
+
+        assert open_at("2026-10-23T23:00:00Z") == ["Late Bar"]  # Friday night
+        assert open_at("2026-10-24T01:30:00Z") == ["Late Bar"]  # ...past midnight
+        assert open_at("2026-10-24T13:00:00Z") == ["Weekend Cafe"]
+        assert open_at("2026-10-21T09:00:00Z") == []
+
+        invalid = self.client.post(
+            "/api/v1/venues",
+            json={**self._venue_payload(name="Vague"), "opening_hours": "whenever"},
+        )
+        assert invalid.status_code == 400
+        assert invalid.json()["detail"] == "invalid_opening_hours"
+        both = self.client.get(
+            "/api/v1/venues", params={"open_now": True, "open_at": "2026-10-24T13:00:00Z"}
+        )
+        assert both.status_code == 400
+
+    def test_bulk_upsert(self) -> None:
+        with self.session_factory() as session:
+            venue = Venues(
+                **self._venue_payload(name="Bulk Existing", experience_points=5, for_api=False),
+                city="Calgary",
+                coordinates="POINT(-114.0719 51.0447)",
+                photo_url="https://example.com/bulk.jpg",
+            )
+            session.add(venue)
+            session.commit()
+            existing_id = venue.id
+        self.events.clear()
+
+        owner_id = str(uuid4())
+        lines = [
+            json.dumps({"name": "Bulk New", "owner_id": owner_id, "experience_points": 15}),
+            json.dumps({"name": "Bulk Existing", "owner_id": owner_id, "experience_points": 25}),
+            json.dumps({"name": "Bulk Incomplete"}),
+        ]
+        response = self.client.post(
+            "/api/v1/venues:bulk",
+            content="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200
+
+        body = response.json()
+        assert (body["created"], body["updated"], body["failed"]) == (1, 1, 1)
+        assert [row["status"] for row in body["rows"]] == ["created", "updated", "error"]
+        assert body["rows"][1]["id"] == str(existing_id)
+        assert body["rows"][2]["error"] == "missing_required_fields"
+        assert self.events == [
+            (
+                "venue.bulk_upserted",
+                {"created": [body["rows"][0]["id"]], "updated": [str(existing_id)]},
+            )
+        ]
+
+        with self.session_factory() as session:
+            stored = session.get(Venues, existing_id)
+            assert stored is not None
+            assert stored.experience_points == 25
+            assert stored.city == "Calgary"
+            # Omitted fields with column defaults are not reset by a re-import either.
+            assert stored.coordinates == "POINT(-114.0719 51.0447)"
+            assert stored.photo_url == "https://example.com/bulk.jpg"
+            created = session.get(Venues, UUID(body["rows"][0]["id"]))
+            assert created is not None
+            assert created.is_active is True
+            assert created.coordinates == "POINT(0 0)"
+
+    def test_bulk_upsert_keeps_tags(self) -> None:
+        owner_id = str(uuid4())
+        venue = {"name": "Bulk Tagged", "owner_id": owner_id, "experience_points": 5}
+
+        def upsert(payload: dict[str, Any]) -> dict[str, Any]:
+            response = self.client.post(
+                "/api/v1/venues:bulk",
+                content=json.dumps(payload) + "\n",
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+            assert response.status_code == 200
+            return response.json()["rows"][0]
+
+        created = upsert({**venue, "tags": ["Rooftop", "craft beer"]})
+        assert created["status"] == "created"
+        # A re-import without tags keeps them; an explicit empty list clears them.
+        assert upsert({**venue, "experience_points": 7})["status"] == "updated"
+        with self.session_factory() as session:
+            stored = session.get(Venues, UUID(created["id"]))
+            assert stored is not None
+            assert (stored.tags, stored.experience_points) == (["rooftop", "craft-beer"], 7)
+        upsert({**venue, "tags": []})
+        with self.session_factory() as session:
+            stored = session.get(Venues, UUID(created["id"]))
+            assert stored is not None
+            assert stored.tags == []
+
+    def test_search(self) -> None:
+        venues = [
+            {
+                **self._venue_payload(name="Blue Note Jazz Club"),
+                "description": "Late night jazz sessions with a full cocktail bar downstairs.",
+                "city": "Austin",
+                "coordinates": "POINT(-97.7431 30.2672)",
+                "live_music": True,
+            },
+            {
+                **self._venue_payload(name="Harbour Taproom"),
+                "description": "Craft beer and quiet jazz records on Sundays.",
+                "city": "Seattle",
+                "coordinates": "POINT(-122.3321 47.6062)",
+                "live_music": False,
+            },
+            {
+                **self._venue_payload(name="Closed Jazz Cellar"),
+                "description": "Jazz every night.",
+                "is_active": False,
+            },
+        ]
+        for venue in venues:
+            assert self.client.post("/api/v1/venues", json=venue).status_code == 201
+
+        response = self.client.get("/api/v1/venues/search", params={"q": "jazz"})
+        assert response.status_code == 200
+        hits = response.json()
+        assert [hit["name"] for hit in hits] == ["Blue Note Jazz Club", "Harbour Taproom"]
+        assert "<mark>" in hits[0]["snippet"]
+        assert hits[0]["score"] >= hits[1]["score"]
+        assert hits[0]["distance_m"] is None
+
+        typo = self.client.get("/api/v1/venues/search", params={"q": "blu note"}).json()
+        assert [hit["name"] for hit in typo] == ["Blue Note Jazz Club"]
+
+        filtered = self.client.get(
+            "/api/v1/venues/search", params={"q": "jazz", "live_music": "false"}
+        ).json()
+        assert [hit["name"] for hit in filtered] == ["Harbour Taproom"]
+
+        nearby = self.client.get(
+            "/api/v1/venues/search",
+            params={"q": "jazz", "latitude": 30.27, "longitude": -97.74, "radius_m": 5000},
+        ).json()
+        assert [hit["name"] for hit in nearby] == ["Blue Note Jazz Club"]
+        assert nearby[0]["distance_m"] < 5000
+
+        invalid = self.client.get(
+            "/api/v1/venues/search", params={"q": "jazz", "latitude": 30.27}
+        )
+        assert invalid.status_code == 400
+        assert invalid.json()["detail"] == "invalid_location"
+
+    def test_autocomplete(self) -> None:
+        unavailable = self.client.get("/api/v1/venues/autocomplete", params={"q": "bl"})
+        assert unavailable.status_code == 503
+
+        venues = [
+            {**self._venue_payload(name="Blue Note"), "city": "Austin", "number_of_reviews": 40},
+            {**self._venue_payload(name="The Blue Lagoon"), "number_of_reviews": 90},
+            {**self._venue_payload(name="Blue Hidden"), "is_active": False},
+        ]
+        for venue in venues:
+            assert self.client.post("/api/v1/venues", json=venue).status_code == 201
+        index = VenueAutocomplete(self.session_factory)
+        index.load()
+        self.client.app.state.venue_autocomplete = index  # type: ignore[attr-defined]
+
+        response = self.client.get("/api/v1/venues/autocomplete", params={"q": "BLU"})
+        assert response.status_code == 200
+        assert [hit["name"] for hit in response.json()] == ["The Blue Lagoon", "Blue Note"]
+
+        by_city = self.client.get("/api/v1/venues/autocomplete", params={"q": "aus"}).json()
+        assert [hit["city"] for hit in by_city] == ["Austin"]
+
+    def test_footsteps_record_visits(self) -> None:
+        inside, outside = "POINT(13.405 52.505)", "POINT(13.42 52.505)"
+        with self.session_factory() as session:
+            user = Users(
+                email="walker@example.com",
+                full_name="Walker",
+                oauth_provider="test",
+                oauth_provider_id="oauth-walker",
+            )
+            venue = Venues(
+                **self._venue_payload(name="Fenced Bar", for_api=False),
+                area="POLYGON((13.40 52.50, 13.41 52.50, 13.41 52.51, 13.40 52.51, 13.40 52.50))",
+            )
+            session.add_all([user, venue])
+            session.commit()
+            user_id, venue_id = str(user.id), str(venue.id)
+
+        def ingest(*pings: tuple[str, str], user: str = user_id) -> Any:
+            footsteps = [
+                {"user_id": user, "coordinates": coordinates, "created_at": at}
+                for coordinates, at in pings
+            ]
+            return self.client.post("/api/v1/footsteps:batch", json={"footsteps": footsteps})
+
+        assert ingest((inside, "2026-10-17T21:00:00Z")).status_code == 503
+        fences = VenueFences(self.session_factory)
+        fences.load()
+        self.client.app.state.venue_fences = fences  # type: ignore[attr-defined]
+        self.events.clear()
+
+        # The ping repeated seconds later in the same spot is thinned away.
+        response = ingest(
+            (outside, "2026-10-17T20:55:00Z"),
+            (inside, "2026-10-17T21:00:00Z"),
+            (inside, "2026-10-17T21:00:10Z"),
+            (inside, "2026-10-17T21:10:00Z"),
+        )
+        assert response.status_code == 200
+        assert response.json() == {"inserted": 3, "visits": 1, "buffered": 0}
+        [(name, payload)] = self.events
+        assert name == "venue.visited"
+        [visit] = payload["visits"]
+        assert (visit["venue_id"], visit["is_new"]) == (venue_id, True)
+
+        # Within the visit gap the same visit is extended; after a long gap a new one opens.
+        ingest((inside, "2026-10-17T21:20:00Z"))
+        extended = self.events[-1][1]["visits"][0]
+        assert (extended["id"], extended["is_new"]) == (visit["id"], False)
+        ingest((inside, "2026-10-18T01:00:00Z"))
+        assert self.events[-1][1]["visits"][0]["is_new"] is True
+
+        def at(value: str) -> datetime:
+            return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+        with self.session_factory() as session:
+            visits = session.scalars(select(Visits).order_by(Visits.entered_at)).all()
+            assert [(row.entered_at, row.exited_at) for row in visits] == [
+                (at("2026-10-17T21:00:00"), at("2026-10-17T21:20:00")),
+                (at("2026-10-18T01:00:00"), at("2026-10-18T01:00:00")),
+            ]
+            assert session.scalar(select(func.count()).select_from(Footsteps)) == 5
+
+        assert ingest(("not a point", "2026-10-17T21:00:00Z")).status_code == 422
+        missing = ingest((inside, "2026-10-17T21:00:00Z"), user=str(uuid4()))
+        assert missing.status_code == 404
+        assert missing.json()["detail"] == "user_not_found"
+
+    def test_merge_visits(self) -> None:
+        def at(value: str) -> datetime:
+            return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+        with self.session_factory() as session:
+            user = Users(
+                email="merger@example.com",
+                full_name="Merger",
+                oauth_provider="test",
+                oauth_provider_id="oauth-merger",
+            )
+            venue = Venues(**self._venue_payload(name="Merge Bar", for_api=False))
+            session.add_all([user, venue])
+            session.flush()
+            session.add_all(
+                [
+                    Visits(
+                        user_id=user.id,
+                        venue_id=venue.id,
+                        entered_at=at(entered),
+                        exited_at=at(exited),
+                        inferred=inferred,
+                    )
+                    for entered, exited, inferred in (
+                        ("2026-10-17T21:00:00", "2026-10-17T22:00:00", False),
+                        ("2026-10-17T23:00:00", "2026-10-17T23:10:00", False),
+                        ("2026-10-17T23:30:00", "2026-10-17T23:40:00", True),
+                    )
+                ]
+            )
+            session.commit()
+            user_id, venue_id = user.id, venue.id
+
+        gap = timedelta(minutes=15)
+        with self.session_factory() as session:
+            # Two segments in one batch both within the gap of the first visit, and one
+            # that bridges the other two.
+            rows = geofence.merge_visits(
+                session,
+                [
+                    (user_id, venue_id, at(moment), at(moment))
+                    for moment in (
+                        "2026-10-17T20:50:00",
+                        "2026-10-17T22:10:00",
+                        "2026-10-17T23:20:00",
+                    )
+                ],
+                gap=gap,
+            )
+            session.commit()
+        assert [row.is_new for row in rows] == [False, False]
+
+        with self.session_factory() as session:
+            visits = session.scalars(select(Visits).order_by(Visits.entered_at)).all()
+            assert [(row.entered_at, row.exited_at, row.inferred) for row in visits] == [
+                (at("2026-10-17T20:50:00"), at("2026-10-17T22:10:00"), False),
+                (at("2026-10-17T23:00:00"), at("2026-10-17T23:40:00"), False),
+            ]
+            assert {row.id for row in rows} == {row.id for row in visits}
+
+    def test_visit_awards(self) -> None:
+        with self.session_factory() as session:
+            user = Users(
+                email="visitor@example.com",
+                full_name="Visitor",
+                oauth_provider="test",
+                oauth_provider_id="oauth-visitor",
+            )
+            venue = Venues(**self._venue_payload(experience_points=25, for_api=False))
+            session.add_all([user, venue])
+            session.commit()
+            user_id, venue_id = str(user.id), str(venue.id)
+
+        def visit(entered_at: str) -> dict[str, Any]:
+            return {"user_id": user_id, "venue_id": venue_id, "entered_at": entered_at}
+
+        zone = ZoneInfo("America/New_York")
+        with self.session_factory() as session:
+            # 03:00Z on the 18th is still the 17th in New York.
+            first = [visit("2026-10-17T21:00:00+00:00"), visit("2026-10-18T03:00:00+00:00")]
+            assert visit_awards.award_visits(session, first, zone) == 25
+            again = [visit("2026-10-17T23:00:00+00:00"), visit("2026-10-18T20:00:00+00:00")]
+            assert visit_awards.award_visits(session, again, zone) == 25
+            session.commit()
+            assert points_ledger.pending(session, [UUID(user_id)]) == {UUID(user_id): 50}
+
+    def test_occupancy_and_daily_visitors(self) -> None:
+        with self.session_factory() as session:
+            venue = Venues(**self._venue_payload(for_api=False))
+            session.add(venue)
+            session.commit()
+            venue_id = str(venue.id)
+
+        now = datetime.now(timezone.utc)
+        seen = [now, now - timedelta(minutes=1), now - timedelta(minutes=20)]
+        visits = [
+            {
+                "user_id": str(uuid4()),
+                "venue_id": venue_id,
+                "entered_at": moment.isoformat(),
+                "exited_at": moment.isoformat(),
+            }
+            for moment in seen
+        ]
+        # Shortly after midnight the earliest visit belongs to yesterday's sketch.
+        today = sum(moment.date() == now.date() for moment in seen)
+        occupancy = VenueOccupancy(str(get_settings().redis_url), window=900)
+        try:
+            occupancy.record(visits)
+            occupancy.record(visits[:1])
+
+            response = self.client.get(f"/api/v1/venues/{venue_id}/occupancy")
+            assert response.status_code == 200
+            body = response.json()
+            # The visitor last seen 20 minutes ago has left but still counts for the day.
+            assert body["present"] == 2
+            assert body["unique_visitors"] == today
+
+            with self.session_factory() as session:
+                assert persist_daily(session, occupancy, now.date()) >= 1
+        finally:
+            occupancy.close()
+
+        response = self.client.get(f"/api/v1/venues/{venue_id}/visitors")
+        assert response.status_code == 200
+        assert response.json() == [{"day": now.date().isoformat(), "unique_visitors": today}]
+
+        response = self.client.get(f"/api/v1/venues/{uuid4()}/visitors")
+        assert response.status_code == 404
+
+    def test_footsteps_stream(self) -> None:
+        with self.session_factory() as session:
+            user = Users(
+                email="tracker@example.com",
+                full_name="Tracker",
+                oauth_provider="test",
+                oauth_provider_id="oauth-tracker",
+            )
+            session.add(user)
+            session.commit()
+            user_id = user.id
+
+        url = str(get_settings().redis_url)
+        stream = f"test-{uuid4()}"
+        path = f"/api/v1/footsteps/stream?user_id={user_id}&stream={stream}"
+        for expected_ack, last_seq in ((0, 3), (3, 4)):
+            fences = VenueFences(self.session_factory)
+            fences.load()
+            batcher = FootstepsBatcher(
+                url,
+                self.session_factory,
+                fences,
+                TaskQueue(url, namespace=stream),
+                max_batch=2,
+                flush_interval=0.05,
+            )
+            self.client.app.state.footsteps_batcher = batcher  # type: ignore[attr-defined]
+            with self.client.websocket_connect(path) as websocket:
+                assert websocket.receive_json() == {"ack": expected_ack}
+                # After a reconnect the client resends from the start; acked pings are skipped.
+                for seq in range(1, last_seq + 1):
+                    websocket.send_json({"seq": seq, "coordinates": f"POINT({seq} 1)"})
+                websocket.send_text('{"seq": 0}')
+                received = [websocket.receive_json()]
+                while received[-1].get("ack") != last_seq:
+                    received.append(websocket.receive_json())
+                assert {"error": "invalid_ping"} in received
+
+        with self.session_factory() as session:
+            stored = session.scalars(
+                select(Footsteps.coordinates)
+                .where(Footsteps.user_id == user_id)
+                .order_by(Footsteps.coordinates)
+            ).all()
+        assert stored == ["POINT(1 1)", "POINT(2 1)", "POINT(3 1)", "POINT(4 1)"]
+
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with self.client.websocket_connect(f"/api/v1/footsteps/stream?user_id={uuid4()}"):
+                pass
+        assert closed.value.code == 1008
+
+    def test_footsteps_stream_acks_despite_post_commit_failures(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        with self.session_factory() as session:
+            user = Users(
+                email="streamer@example.com",
+                full_name="Streamer",
+                oauth_provider="test",
+                oauth_provider_id="oauth-streamer",
+            )
+            venue = Venues(
+                **self._venue_payload(name="Streamed Bar", for_api=False),
+                area="POLYGON((13.40 52.50, 13.41 52.50, 13.41 52.51, 13.40 52.51, 13.40 52.50))",
+            )
+            session.add_all([user, venue])
+            session.commit()
+            user_id = user.id
+
+        class _Channel:
+            def __init__(self) -> None:
+                self.messages: list[dict[str, Any]] = []
+
+            async def send_json(self, data: Any, mode: str = "text") -> None:
+                self.messages.append(data)
+
+            async def close(self, code: int = 1000, reason: str | None = None) -> None:
+                self.messages.append({"closed": code})
+
+        class _DownQueue(TaskQueue):
+            def enqueue(self, task: str, payload: dict[str, Any] | None = None) -> None:
+                raise redis.ConnectionError("queue down")
+
+        def _down(*_args: Any, **_kwargs: Any) -> Any:
+            raise redis.ConnectionError("acks down")
+
+        url = str(get_settings().redis_url)
+        stream = f"test-{uuid4()}"
+        fences = VenueFences(self.session_factory)
+        fences.load()
+        batcher = FootstepsBatcher(url, self.session_factory, fences, _DownQueue(url))
+
+        async def run() -> None:
+            channel = _Channel()
+            session = await batcher.open(user_id, stream, channel)
+            assert session is not None
+            with monkeypatch.context() as patch:
+                patch.setattr(batcher._client, "pipeline", _down)
+                for seq, x in ((1, 13.404), (2, 13.406)):
+                    ping = FootstepsStreamPing(seq=seq, coordinates=f"POINT({x} 52.505)")
+                    await batcher.submit(session, ping)
+                await batcher.flush()
+            # Both the visit event and the ack key failed, but the rows are stored.
+            assert channel.messages == [{"ack": 2}]
+            batcher.close(session)
+
+            # A reconnect resumes after the stored pings, and the next flush saves the ack.
+            session = await batcher.open(user_id, stream, channel)
+            assert session is not None and session.received == 2
+            for seq, x in ((2, 13.406), (3, 13.5)):
+                ping = FootstepsStreamPing(seq=seq, coordinates=f"POINT({x} 52.505)")
+                await batcher.submit(session, ping)
+            await batcher.flush()
+            assert channel.messages[-1] == {"ack": 3}
+            assert batcher._client.get(session.key) == "3"
+            await batcher.stop()
+
+        asyncio.run(run())
+        with self.session_factory() as session:
+            stored = session.scalar(
+                select(func.count()).select_from(Footsteps).where(Footsteps.user_id == user_id)
+            )
+            visits = session.scalar(
+                select(func.count()).select_from(Visits).where(Visits.user_id == user_id)
+            )
+        # Failing the first flush would have had its pings resent and stored twice.
+        assert (stored, visits) == (3, 1)
+
+    def test_footsteps_write_behind(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        with self.session_factory() as session:
+            user = Users(
+                email="buffered@example.com",
+                full_name="Buffered",
+                oauth_provider="test",
+                oauth_provider_id="oauth-buffered",
+            )
+            venue = Venues(
+                **self._venue_payload(name="Buffered Bar", for_api=False),
+                area="POLYGON((13.40 52.50, 13.41 52.50, 13.41 52.51, 13.40 52.51, 13.40 52.50))",
+            )
+            session.add_all([user, venue])
+            session.commit()
+            user_id, venue_id = user.id, str(venue.id)
+
+        namespace = f"footsteps-buffer-test-{uuid4().hex}"
+        buffer = FootstepsBuffer(str(get_settings().redis_url), namespace=namespace)
+        app: Any = self.client.app
+        app.dependency_overrides[deps.get_footsteps_buffer] = lambda: FootstepsBuffer(
+            str(get_settings().redis_url), namespace=namespace
+        )
+        fences = VenueFences(self.session_factory)
+        fences.load()
+        app.state.venue_fences = fences
+        monkeypatch.setattr(get_settings(), "footsteps_write_behind", True)
+
+        footsteps = [
+            {"user_id": str(owner), "coordinates": coordinates}
+            for owner, coordinates in (
+                (user_id, "POINT(13.405 52.505)"),
+                (user_id, "POINT(13.5 52.5)"),
+                (uuid4(), "POINT(13.4 52.5)"),
+            )
+        ]
+        response = self.client.post("/api/v1/footsteps:batch", json={"footsteps": footsteps})
+        assert response.status_code == 202
+        assert response.json() == {"inserted": 0, "visits": 0, "buffered": 3}
+        stats = self.client.get("/api/v1/footsteps/buffer").json()
+        assert (stats["entries"], stats["pings"]) == (1, 3)
+
+        batch = buffer.read("test", 10, block_ms=10)
+        with self.session_factory() as session:
+            # The unknown user's ping is skipped.
+            written = footsteps_ingest.ingest_copied(session, batch.rows, fences)
+        assert written.inserted == 2
+        assert [visit["venue_id"] for visit in written.visits] == [venue_id]
+        with self.session_factory() as session:
+            # A redelivered batch inserts nothing but replays its visits.
+            replayed = footsteps_ingest.ingest_copied(session, batch.rows, fences)
+        assert replayed.inserted == 0
+        assert [visit["id"] for visit in replayed.visits] == [
+            visit["id"] for visit in written.visits
+        ]
+        # A claimed batch can mix that written entry with one never written; the latter
+        # is still stored.
+        later = batch.rows[0][3] + timedelta(minutes=5)
+        unwritten = (uuid4(), user_id, "POINT(13.406 52.506)", later)
+        with self.session_factory() as session:
+            mixed = footsteps_ingest.ingest_copied(session, [*batch.rows, unwritten], fences)
+        assert mixed.inserted == 1
+        assert [visit["venue_id"] for visit in mixed.visits] == [venue_id]
+        buffer.ack(batch)
+        buffer.close()
+
+        stats = self.client.get("/api/v1/footsteps/buffer").json()
+        assert stats == {"entries": 0, "pings": 0, "lag_seconds": 0.0}
+        with self.session_factory() as session:
+            stored = session.scalar(
+                select(func.count()).select_from(Footsteps).where(Footsteps.user_id == user_id)
+            )
+        assert stored == 3
+
+    def test_footsteps_buffer_dead_letters_poison_entries(self) -> None:
+        namespace = f"footsteps-buffer-test-{uuid4().hex}"
+        buffer = FootstepsBuffer(str(get_settings().redis_url), namespace=namespace)
+        ping = FootstepsCreate(user_id=uuid4(), coordinates="POINT(13.4 52.5)")
+        buffer.append([ping, ping])
+
+        # Never acknowledged: redelivered until it has been delivered too often.
+        deliveries = [
+            len(buffer.read("test", 10, block_ms=10).entry_ids)
+            for _ in range(footsteps_buffer.MAX_DELIVERIES + 1)
+        ]
+        assert deliveries == [1] * footsteps_buffer.MAX_DELIVERIES + [0]
+        assert buffer.stats() == footsteps_buffer.BufferStats(entries=0, pings=0, lag_seconds=0.0)
+        client = redis.from_url(str(get_settings().redis_url), decode_responses=True)
+        dead = client.xrange(f"{namespace}:dead")
+        client.delete(namespace, f"{namespace}:pings", f"{namespace}:dead")
+        client.close()
+        buffer.close()
+        assert len(dead) == 1
+        assert len(json.loads(dead[0][1]["rows"])) == 2
+
+    def test_infer_visits_from_stay_points(self) -> None:
+        with self.session_factory() as session:
+            user = Users(
+                email="lingerer@example.com",
+                full_name="Lingerer",
+                oauth_provider="test",
+                oauth_provider_id="oauth-lingerer",
+            )
+            venue = Venues(
+                **self._venue_payload(name="Unfenced Bar", for_api=False),
+                coordinates="POINT(13.4500 52.5200)",
+            )
+            session.add_all([user, venue])
+            session.commit()
+            user_id, venue_id = user.id, venue.id
+
+            # Twenty minutes a few metres from the bar, twenty more on its other side (two
+            # back-to-back stays), then walking off.
+            start = datetime(2026, 10, 18, 21, 0, tzinfo=timezone.utc)
+            pings = [("POINT(13.4502 52.5201)", start + timedelta(minutes=m)) for m in range(21)]
+            pings += [
+                ("POINT(13.4494 52.5199)", start + timedelta(minutes=m)) for m in range(21, 41)
+            ]
+            pings += [
+                (f"POINT({13.452 + 0.002 * step} 52.5201)", start + timedelta(minutes=41 + step))
+                for step in range(5)
+            ]
+            session.add_all(
+                Footsteps(user_id=user_id, coordinates=coordinates, created_at=at)
+                for coordinates, at in pings
+            )
+            session.commit()
+
+        def run() -> Any:
+            with self.session_factory() as read_session, self.session_factory() as write_session:
+                return infer_visits(
+                    read_session,
+                    write_session,
+                    datetime(2026, 10, 18, tzinfo=timezone.utc),
+                    datetime(2026, 10, 19, tzinfo=timezone.utc),
+                    radius=50,
+                    min_dwell=timedelta(minutes=10),
+                    snap=75,
+                    max_gap=timedelta(minutes=15),
+                    chunk_size=10,
+                )
+
+        stats = run()
+        # Both stays snap to the bar and are written as one visit.
+        assert (stats.footsteps, stats.users, stats.stay_points) == (46, 1, 2)
+        assert (stats.inserted, stats.extended) == (1, 0)
+        # A rerun over the same window lands on the visit it wrote.
+        again = run()
+        assert (again.inserted, again.extended) == (0, 1)
+
+        with self.session_factory() as session:
+            [visit] = session.scalars(select(Visits).where(Visits.user_id == user_id)).all()
+            assert (visit.venue_id, visit.inferred) == (venue_id, True)
+            assert (visit.entered_at, visit.exited_at) == (start, start + timedelta(minutes=40))
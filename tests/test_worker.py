@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from typing import Any
+from uuid import uuid4
+
+import pytest
+import redis
+
+from app.core.config import get_settings
+from app.services import TaskQueue
+from app.services.worker import MAX_DELIVERIES, TaskWorker
+
+
+class _Session:
+    def __init__(self, log: list[str]) -> None:
+        self._log = log
+
+    def __enter__(self) -> _Session:
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+    def commit(self) -> None:
+        self._log.append("commit")
+
+    def rollback(self) -> None:
+        self._log.append("rollback")
+
+
+def test_dispatch_runs_every_handler_and_reports_failures() -> None:
+    log: list[str] = []
+    worker = TaskWorker("redis://localhost:6379/0", lambda: _Session(log))  # type: ignore[arg-type]
+
+    def failing(_session: Any, _payload: dict[str, Any]) -> None:
+        raise RuntimeError("boom")
+
+    def recording(_session: Any, payload: dict[str, Any]) -> None:
+        log.append(f"handled {payload['id']}")
+
+    worker.register("follow.created", failing)
+    worker.register("follow.created", recording)
+    worker.register("follow.deleted", recording)
+    # The failure is reported so the message is not acknowledged.
+    assert not worker.dispatch("follow.created", {"id": "abc"})
+    assert worker.dispatch("follow.deleted", {"id": "def"})
+    assert worker.dispatch("user.created", {"id": "unhandled"})
+
+    assert log == ["rollback", "handled abc", "commit", "handled def", "commit"]
+
+
+def test_failed_messages_are_retried_then_dead_lettered() -> None:
+    url = str(get_settings().redis_url)
+    namespace = f"tasks-test-{uuid4().hex}"
+    queue = TaskQueue(url, namespace=namespace)
+    worker = TaskWorker(
+        url,
+        lambda: _Session([]),  # type: ignore[arg-type]
+        namespace=namespace,
+        consumer="one",
+        claim_idle_ms=0,
+    )
+    attempts: Counter[int] = Counter()
+    handled: list[int] = []
+
+    def flaky(_session: Any, payload: dict[str, Any]) -> None:
+        attempts[payload["n"]] += 1
+        # 2 recovers on its third delivery; 3 never does.
+        if payload["n"] == 3 or (payload["n"] == 2 and attempts[2] < 3):
+            raise RuntimeError("transient")
+        handled.append(payload["n"])
+
+    worker.register("follow.created", flaky)
+    try:
+        for n in (1, 2, 3):
+            queue.enqueue("follow.created", {"n": n})
+        while worker.run_once(timeout=1):
+            pass
+        assert handled == [1, 2]
+        assert attempts == {1: 1, 2: 3, 3: MAX_DELIVERIES}
+
+        client = redis.from_url(url, decode_responses=True)
+        try:
+            dead = client.xrange(f"{namespace}:dead")
+            assert [json.loads(fields["message"])["payload"] for _, fields in dead] == [{"n": 3}]
+            assert client.xlen(f"{namespace}:stream") == 0
+        finally:
+            client.delete(f"{namespace}:stream", f"{namespace}:dead")
+            client.close()
+    finally:
+        queue.close()
+        worker.close()
+
+
+def test_run_forever_backs_off_on_redis_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    worker = TaskWorker("redis://localhost:6379/0", lambda: _Session([]))  # type: ignore[arg-type]
+    outcomes: list[BaseException | bool] = [
+        redis.ConnectionError("down"),
+        redis.ConnectionError("down"),
+        True,
+        redis.ConnectionError("down"),
+        KeyboardInterrupt(),
+    ]
+    sleeps: list[float] = []
+
+    def run_once(timeout: int = 5) -> bool:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(worker, "run_once", run_once)
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    with pytest.raises(KeyboardInterrupt):
+        worker.run_forever()
+    # The delay doubles while Redis stays down and resets after a success.
+    assert sleeps == [1.0, 2.0, 1.0]